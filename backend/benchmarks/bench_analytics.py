@@ -0,0 +1,103 @@
+"""
+Analytics benchmark - run summaries from record dicts vs columnar arrays
+
+Stores one run with N results (three scores each) and times the result and
+score summaries three ways: looping over the stored dicts (the previous
+implementation), building the run's columns from storage, and summarizing
+columns that are already built (the live or cached case).
+
+Usage (from backend/):
+    python -m benchmarks.bench_analytics [--sizes 1000,10000,100000]
+"""
+import argparse
+import time
+from src.services.analytics_store import AnalyticsStore
+from src.services.storage import InMemoryStorage
+
+GRADERS = ("string-match", "length", "regex")
+STATUSES = ("success",) * 8 + ("error", "timeout")
+
+
+def fill(storage: InMemoryStorage, run_id: str, results: int) -> None:
+    """Add a completed run with results, three scores per result, and tagged test cases"""
+    storage.create_evaluation_run({"id": run_id, "status": "completed"})
+    for i in range(100):
+        storage.create_test_case({"id": f"tc-{i}", "tags": [f"tag-{i % 7}", f"set-{i % 3}"]})
+    storage.create_evaluation_results_many(
+        [
+            {
+                "id": f"result-{i}",
+                "run_id": run_id,
+                "test_case_id": f"tc-{i % 100}",
+                "response_status": STATUSES[i % len(STATUSES)],
+                "response_latency_ms": float(50 + i % 400),
+            }
+            for i in range(results)
+        ]
+    )
+    storage.create_scores_many(
+        [
+            {
+                "id": f"score-{i}-{grader_id}",
+                "result_id": f"result-{i}",
+                "grader_id": grader_id,
+                "passed": (i + g) % 3 != 0,
+                "score": ((i + g) % 10) / 10,
+            }
+            for i in range(results)
+            for g, grader_id in enumerate(GRADERS)
+        ]
+    )
+
+
+def loop_summaries(storage: InMemoryStorage, run_id: str) -> None:
+    """The per-record summaries the results and grading endpoints used to compute"""
+    results = storage.list_evaluation_results(run_id)
+    successful = sum(1 for r in results if r["response_status"] == "success")
+    sum(1 for r in results if r["response_status"] == "error")
+    sum(1 for r in results if r["response_status"] == "timeout")
+    sum(r["response_latency_ms"] for r in results if r["response_latency_ms"]) / successful
+
+    by_grader = {}
+    for score in storage.list_all_scores(run_id):
+        counts = by_grader.setdefault(score["grader_id"], {"total": 0, "passed": 0})
+        counts["total"] += 1
+        counts["passed"] += 1 if score["passed"] else 0
+
+
+def time_call(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'results':>8} {'loop':>10} {'build':>10} {'columnar':>10}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        storage = InMemoryStorage()
+        fill(storage, "run-0", size)
+        analytics = AnalyticsStore(storage)
+
+        def build():
+            analytics.invalidate("run-0")
+            analytics.get_run("run-0")
+
+        def summarize():
+            columns = analytics.get_run("run-0")
+            columns.result_summary()
+            columns.score_summary()
+
+        loop = time_call(lambda: loop_summaries(storage, "run-0"), args.repeats)
+        built = time_call(build, args.repeats)
+        columnar = time_call(summarize, args.repeats)
+        print(f"{size:>8} {loop * 1e3:>7.2f} ms {built * 1e3:>7.2f} ms {columnar * 1e3:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
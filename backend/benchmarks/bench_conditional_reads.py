@@ -0,0 +1,117 @@
+"""
+Conditional reads benchmark - repeat reads of a finished run's results
+
+Stores one completed run with N results (three scores each) in SQLite and
+times GET /api/evaluations/{id}/results through the app three ways: building
+and encoding the response every time (the cache cleared before each read),
+sending the cached encoded body, and answering a client that already has it
+with a 304. Reports latency and bytes sent per read.
+
+Usage (from backend/):
+    python -m benchmarks.bench_conditional_reads [--sizes 1000,10000] [--reads 20]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+import httpx
+from src.api import evaluations
+from src.api.http_cache import get_encoded_response_cache
+from src.services.evaluation_service import EvaluationService
+from src.services.sqlite_storage import SQLiteStorage
+from src.services.test_case_service import TestCaseService
+from main import app
+
+GRADERS = ("string-match", "length", "regex")
+
+
+def fill(storage: SQLiteStorage, run_id: str, results: int) -> None:
+    storage.create_evaluation_run(
+        {
+            "id": run_id,
+            "test_case_ids": ["tc-0"],
+            "agent_endpoint_url": "http://agent",
+            "grader_ids": list(GRADERS),
+            "status": "running",
+            "created_at": "2026-01-01T00:00:00",
+        }
+    )
+    batch = [
+        {
+            "id": f"result-{i}",
+            "run_id": run_id,
+            "test_case_id": f"tc-{i % 100}",
+            "agent_response": f"response {i}",
+            "response_status": "success",
+            "response_latency_ms": 50 + i % 400,
+        }
+        for i in range(results)
+    ]
+    storage.create_evaluation_results_many(batch)
+    storage.create_scores_many(
+        [
+            {
+                "id": f"{r['id']}-{grader}",
+                "result_id": r["id"],
+                "grader_id": grader,
+                "passed": i % 3 != 0,
+                "score": (i % 10) / 10,
+            }
+            for i, r in enumerate(batch)
+            for grader in GRADERS
+        ]
+    )
+    storage.update_evaluation_run(run_id, {"status": "completed", "result_count": results})
+    storage.flush()
+
+
+async def timed_reads(
+    client: httpx.AsyncClient, url: str, reads: int, headers=None, clear: bool = False
+):
+    """Median seconds per read and bytes of the last response"""
+    times = []
+    for _ in range(reads):
+        if clear:
+            get_encoded_response_cache().clear()
+        start = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2], len(response.content)
+
+
+async def run(sizes, reads: int) -> None:
+    print(f"{'results':>8} {'uncached':>20} {'cached':>20} {'304':>16}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(str(Path(tmp) / "bench.db"))
+            fill(storage, "run", size)
+            evaluations._evaluation_service = EvaluationService(storage, TestCaseService(storage))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                url = "/api/evaluations/run/results"
+                etag = (await client.get(url)).headers["etag"]
+                cells = [
+                    await timed_reads(client, url, reads, clear=True),
+                    await timed_reads(client, url, reads),
+                    await timed_reads(client, url, reads, headers={"If-None-Match": etag}),
+                ]
+            print(
+                f"{size:>8,} "
+                + " ".join(f"{t * 1e3:>8.2f} ms {n / 1024:>7.0f} KiB" for t, n in cells)
+            )
+            get_encoded_response_cache().clear()
+            storage.close()
+    evaluations._evaluation_service = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--reads", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run([int(n) for n in args.sizes.split(",")], args.reads))
+
+
+if __name__ == "__main__":
+    main()
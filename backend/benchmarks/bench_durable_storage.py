@@ -0,0 +1,133 @@
+"""
+Durable storage benchmark - write overhead and restart time
+
+1. Steady-state writes: the same results and scores are written to
+   InMemoryStorage and DurableInMemoryStorage, one record per call and in bulk
+   chunks, and the per-record cost of the calls is compared.
+2. Restart: a store of --scores scores is snapshotted, a tail of more writes
+   is logged on top of it, and the time to reopen it is measured.
+
+Usage (from backend/):
+    python -m benchmarks.bench_durable_storage [--scores 1000000] [--no-fsync]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from src.services.storage import InMemoryStorage
+from src.services.durable_storage import DurableInMemoryStorage
+
+# Records per bulk call, matching the default write buffer size
+CHUNK = 200
+GRADERS = 2
+
+
+def make_batch(start: int, count: int):
+    results, scores = [], []
+    for i in range(start, start + count):
+        result_id = f"result-{i}"
+        results.append(
+            {
+                "id": result_id,
+                "run_id": f"run-{i // 10000}",
+                "test_case_id": f"tc-{i % 10000}",
+                "agent_response": f"Answer number {i}",
+                "response_status": "success",
+                "latency_ms": 100,
+            }
+        )
+        for g in range(GRADERS):
+            scores.append(
+                {
+                    "id": f"{result_id}-score-{g}",
+                    "result_id": result_id,
+                    "grader_id": f"grader-{g}",
+                    "passed": i % 2 == 0,
+                    "score": 1.0 if i % 2 == 0 else 0.0,
+                }
+            )
+    return results, scores
+
+
+def write(storage, first_result: int, results_count: int, bulk: bool) -> None:
+    for start in range(first_result, first_result + results_count, CHUNK):
+        results, scores = make_batch(start, min(CHUNK, first_result + results_count - start))
+        if bulk:
+            storage.create_evaluation_results_many(results)
+            storage.create_scores_many(scores)
+        else:
+            for result in results:
+                storage.create_evaluation_result(result)
+            for score in scores:
+                storage.create_score(score)
+
+
+def bench_writes(records: int, fsync: bool) -> None:
+    results_count = records // (1 + GRADERS)
+    print(f"Steady-state writes ({results_count * (1 + GRADERS):,} records, fsync={fsync})")
+    for bulk in (False, True):
+        mode = "bulk" if bulk else "single"
+        start = time.perf_counter()
+        write(InMemoryStorage(), 0, results_count, bulk)
+        baseline = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = DurableInMemoryStorage(tmp, fsync=fsync)
+            start = time.perf_counter()
+            write(storage, 0, results_count, bulk)
+            calls = time.perf_counter() - start
+            storage.flush()
+            committed = time.perf_counter() - start
+            storage.close()
+
+        per_record = 1e6 / (results_count * (1 + GRADERS))
+        print(
+            f"  {mode:<6} memory {baseline * per_record:6.2f} us/rec   "
+            f"durable {calls * per_record:6.2f} us/rec "
+            f"(+{(calls - baseline) * per_record:.2f}), all committed after {committed:.2f}s"
+        )
+
+
+def bench_restart(scores: int, fsync: bool) -> None:
+    results_count = scores // GRADERS
+    tail = max(results_count // 10, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = str(Path(tmp) / "wal")
+        storage = DurableInMemoryStorage(log_dir, fsync=fsync)
+        write(storage, 0, results_count, bulk=True)
+        start = time.perf_counter()
+        storage.snapshot()
+        snapshot_seconds = time.perf_counter() - start
+        write(storage, results_count, tail, bulk=True)
+        storage.close()
+        del storage
+
+        start = time.perf_counter()
+        reopened = DurableInMemoryStorage(log_dir, fsync=fsync)
+        restart = time.perf_counter() - start
+        stored = len(reopened.scores_by_id)
+        stats = reopened.recovery_stats
+        reopened.close()
+
+    print(f"Restart with {stored:,} scores")
+    print(f"  snapshot written in {snapshot_seconds:.2f}s")
+    print(
+        f"  reopened in {restart:.2f}s "
+        f"(replayed {stats['records_replayed']:,} log records from "
+        f"{stats['segments_replayed']} segments after the snapshot)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writes", type=int, default=300000)
+    parser.add_argument("--scores", type=int, default=1000000)
+    parser.add_argument("--no-fsync", action="store_true")
+    args = parser.parse_args()
+
+    bench_writes(args.writes, not args.no_fsync)
+    bench_restart(args.scores, not args.no_fsync)
+
+
+if __name__ == "__main__":
+    main()
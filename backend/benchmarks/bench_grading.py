@@ -0,0 +1,83 @@
+"""
+Grading benchmark - per-score overhead of single vs batch grading
+
+Grades the same synthetic run through GradingService one result at a time
+(grade_result) and in chunks (grade_results / grade_batch), and reports the
+wall time per stored score for each executor backend.
+
+Usage (from backend/):
+    python -m benchmarks.bench_grading [--results 5000] [--backends thread,process]
+"""
+import argparse
+import asyncio
+import time
+from src.services.grader_executor import create_grader_executor
+from src.services.grading_service import GradingService
+from src.services.storage import InMemoryStorage
+from src.config import GRADING_BATCH_SIZE
+
+
+def make_items(count: int):
+    """Synthetic (result, expected_output) pairs, half of them matching"""
+    items = []
+    for i in range(count):
+        expected = f"Answer number {i}"
+        response = expected.upper() if i % 2 == 0 else f"Wrong answer {i}"
+        result = {
+            "id": f"result-{i}",
+            "response_status": "success",
+            "agent_response": response,
+        }
+        items.append((result, expected))
+    return items
+
+
+async def grade_single(service: GradingService, items, grader_ids, metrics) -> None:
+    for result, expected in items:
+        await service.grade_result(result, grader_ids, expected, metrics)
+
+
+async def grade_batched(service: GradingService, items, grader_ids, metrics, batch_size) -> None:
+    for start in range(0, len(items), batch_size):
+        await service.grade_results(items[start : start + batch_size], grader_ids, metrics)
+
+
+async def run_backend(backend: str, count: int, batch_size: int) -> None:
+    executor = create_grader_executor(backend)
+    grader_ids = ["string-match"]
+    items = make_items(count)
+    try:
+        # Warm up workers so process start-up isn't measured
+        await executor.grade("string-match", "a", "a", timeout=30)
+
+        for mode in ("single", "batch"):
+            service = GradingService(InMemoryStorage(), executor=executor)
+            metrics = service.new_grading_metrics(count)
+            start = time.perf_counter()
+            if mode == "single":
+                await grade_single(service, items, grader_ids, metrics)
+            else:
+                await grade_batched(service, items, grader_ids, metrics, batch_size)
+            elapsed = time.perf_counter() - start
+            scores = metrics["successful_scores"]
+            print(
+                f"{backend:<10} {mode:<6} {scores:>7} scores  {elapsed:8.3f}s  "
+                f"{elapsed / max(scores, 1) * 1e6:9.1f} us/score"
+            )
+    finally:
+        executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=GRADING_BATCH_SIZE)
+    parser.add_argument("--backends", default="thread,process,subprocess")
+    args = parser.parse_args()
+
+    for backend in args.backends.split(","):
+        asyncio.run(run_backend(backend, args.results, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
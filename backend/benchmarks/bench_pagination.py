@@ -0,0 +1,78 @@
+"""
+Pagination benchmark - offset (skip/limit) vs keyset (cursor) pages
+
+Fills each backend with N test cases and times reading one page at
+increasing depths. Offset pages cost O(skip) to reach; keyset pages seek
+straight to the cursor's key in an index.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pagination [--test-cases 100000]
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from src.services.pagination import SortKey
+from src.services.sqlite_storage import SQLiteStorage
+from src.services.storage import InMemoryStorage, StorageAbstraction
+
+PAGE = 50
+
+
+def fill(storage: StorageAbstraction, count: int) -> None:
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        storage.create_test_case(
+            {
+                "id": f"tc-{i:08d}",
+                "input": "q",
+                "expected_output": "a",
+                "created_at": (start + timedelta(seconds=i)).isoformat(),
+            }
+        )
+
+
+def time_call(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def bench(name: str, storage: StorageAbstraction, count: int, repeats: int) -> None:
+    fill(storage, count)
+    storage.list_test_cases(0, 1)  # wait for write-behind backends
+    print(f"{name}")
+    depth = PAGE
+    while depth < count:
+        after: SortKey = (
+            (datetime(2026, 1, 1) + timedelta(seconds=depth - 1)).isoformat(),
+            f"tc-{depth - 1:08d}",
+        )
+        offset = time_call(lambda: storage.list_test_cases(depth, PAGE), repeats)
+        keyset = time_call(lambda: storage.list_test_cases_page("created_at", after, PAGE), repeats)
+        print(
+            f"  page at {depth:>8}: offset {offset * 1e3:8.3f} ms"
+            f"   keyset {keyset * 1e3:8.3f} ms"
+        )
+        depth *= 10
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--test-cases", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    bench("memory", InMemoryStorage(), args.test_cases, args.repeats)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(str(Path(tmp) / "bench.db"))
+        try:
+            bench("sqlite", storage, args.test_cases, args.repeats)
+        finally:
+            storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Results stream benchmark - one JSON document vs streamed NDJSON
+
+Stores one completed run with N results (two scores each) in SQLite and
+produces the full response body both ways: the /results endpoint (one list
+then one JSON document) and the /results/stream body (NDJSON chunks). Reports
+the time to the first byte, the total time and the peak memory allocated
+while producing the body (tracemalloc).
+
+Usage (from backend/):
+    python -m benchmarks.bench_results_stream [--results 100000]
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from src.api import evaluations
+from src.api.utils import ndjson_chunks
+from src.services.evaluation_service import EvaluationService
+from src.services.sqlite_storage import SQLiteStorage
+from src.services.test_case_service import TestCaseService
+
+RUN_ID = "run-bench"
+
+
+def fill(storage: SQLiteStorage, results: int) -> None:
+    storage.create_evaluation_run(
+        {
+            "id": RUN_ID,
+            "test_case_ids": ["tc-0"],
+            "agent_endpoint_url": "http://agent",
+            "grader_ids": ["string-match", "length"],
+            "status": "completed",
+            "created_at": "2026-01-01T00:00:00",
+        }
+    )
+    for start in range(0, results, 1000):
+        batch = [
+            {
+                "id": f"result-{i}",
+                "run_id": RUN_ID,
+                "test_case_id": f"tc-{i % 100}",
+                "agent_response": f"The answer to question {i} is {i * 7}.",
+                "response_latency_ms": 50 + i % 400,
+                "response_status": "success",
+                "created_at": "2026-01-01T00:00:01",
+            }
+            for i in range(start, min(start + 1000, results))
+        ]
+        storage.create_evaluation_results_many(batch)
+        storage.create_scores_many(
+            [
+                {
+                    "id": f"{r['id']}-{grader}",
+                    "result_id": r["id"],
+                    "grader_id": grader,
+                    "passed": True,
+                    "score": 1.0,
+                    "details": {"expected": "42"},
+                    "created_at": "2026-01-01T00:00:02",
+                }
+                for r in batch
+                for grader in ("string-match", "length")
+            ]
+        )
+    storage.flush()
+
+
+def measure(produce) -> tuple:
+    """(first byte s, total s, peak MiB) for a generator of body chunks"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in produce():
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak / 2**20, size / 2**20
+
+
+def document_body(service: EvaluationService):
+    def produce():
+        payload = evaluations._build_evaluation_results(service, RUN_ID)
+        yield JSONResponse(content=jsonable_encoder(payload)).body
+
+    return produce
+
+
+def stream_body(service: EvaluationService):
+    return lambda: ndjson_chunks(service.stream_evaluation_results(RUN_ID))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(str(Path(tmp) / "bench.db"))
+        fill(storage, args.results)
+        service = EvaluationService(storage, TestCaseService(storage))
+
+        print(f"{args.results:,} results, 2 scores each")
+        for name, produce in (
+            ("document", document_body(service)),
+            ("ndjson", stream_body(service)),
+        ):
+            first, total, peak, size = measure(produce)
+            print(
+                f"  {name:<9} first byte {first:7.2f} s  total {total:7.2f} s  "
+                f"peak {peak:8.1f} MiB  body {size:6.1f} MiB"
+            )
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
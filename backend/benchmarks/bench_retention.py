@@ -0,0 +1,110 @@
+"""
+Retention benchmark - memory released by archiving runs, and archived reads
+
+Fills InMemoryStorage with --runs finished runs of --results results (two
+scores each), archives all but the newest --keep, and reports the memory
+still allocated (tracemalloc), the archive size on disk, and how long reading
+a run's results and scores takes hot, archived (first load) and archived
+(cached).
+
+Usage (from backend/):
+    python -m benchmarks.bench_retention [--runs 50] [--results 1000] [--keep 5]
+"""
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from src.services.retention import RetentionPolicy, RetentionWorker
+from src.services.run_archive import RunArchive
+from src.services.storage import InMemoryStorage
+
+
+def fill(storage: InMemoryStorage, runs: int, results: int) -> None:
+    for r in range(runs):
+        run_id = f"run-{r:04d}"
+        storage.create_evaluation_run(
+            {
+                "id": run_id,
+                "status": "completed",
+                "created_at": f"2026-01-01T00:{r // 60:02d}:{r % 60:02d}",
+            }
+        )
+        batch = [
+            {
+                "id": f"{run_id}-{i}",
+                "run_id": run_id,
+                "test_case_id": f"tc-{i}",
+                "agent_response": f"The answer to question {i} is {i * 7}. " * 4,
+                "response_status": "success",
+                "latency_ms": 120 + i % 50,
+            }
+            for i in range(results)
+        ]
+        storage.create_evaluation_results_many(batch)
+        storage.create_scores_many(
+            [
+                {
+                    "id": f"{result['id']}-{g}",
+                    "result_id": result["id"],
+                    "grader_id": grader,
+                    "passed": True,
+                    "score": 1.0,
+                    "details": {"actual": result["agent_response"], "expected": "42"},
+                }
+                for result in batch
+                for g, grader in enumerate(("string-match", "exact"))
+            ]
+        )
+
+
+def allocated() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def time_read(storage: InMemoryStorage, run_id: str) -> float:
+    start = time.perf_counter()
+    storage.list_evaluation_results(run_id)
+    storage.list_all_scores(run_id)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--results", type=int, default=1000)
+    parser.add_argument("--keep", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = RunArchive(str(Path(tmp) / "archive"))
+        tracemalloc.start()
+        storage = InMemoryStorage(archive=archive)
+        fill(storage, args.runs, args.results)
+        before = allocated()
+
+        worker = RetentionWorker(storage, RetentionPolicy(max_runs=args.keep), interval=0)
+        start = time.perf_counter()
+        archived = worker.run_once()
+        elapsed = time.perf_counter() - start
+        after = allocated()
+        tracemalloc.stop()
+
+        disk = sum(p.stat().st_size for p in archive.directory.iterdir())
+        print(f"{args.runs} runs x {args.results} results, keeping {args.keep} hot")
+        print(f"  archived {archived} runs in {elapsed:.2f}s")
+        print(f"  memory   {before / 2**20:8.1f} MiB -> {after / 2**20:8.1f} MiB")
+        print(f"  on disk  {disk / 2**20:8.1f} MiB")
+        hot = time_read(storage, f"run-{args.runs - 1:04d}")
+        cold = time_read(storage, "run-0000")
+        cached = time_read(storage, "run-0000")
+        print(
+            f"  read one run: hot {hot * 1e3:.1f} ms, archived {cold * 1e3:.1f} ms "
+            f"(cached {cached * 1e3:.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Run events benchmark - dashboards polling vs subscribed to run events
+
+Executes one run of --results test cases against a stub agent while --clients
+dashboards follow it, first the way the frontend used to (list runs and fetch
+the selected run's results every --interval seconds), then subscribed to the
+run's event stream, with a run nobody follows as the baseline. Reports the
+run's duration, the process CPU time, the requests served and the bytes sent.
+
+The run is short, so --interval is scaled down with it (0.2 s here stands for
+the 2 s poll of a run that takes ten times as long).
+
+Usage (from backend/):
+    python -m benchmarks.bench_run_events [--results 1000] [--clients 12] [--interval 0.2]
+        [--agent-ms 50]
+"""
+import argparse
+import asyncio
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from src.api import evaluations
+from src.api.utils import sse_messages
+from src.services.evaluation_service import EvaluationService
+from src.services.storage import InMemoryStorage
+from src.services.test_case_service import TestCaseService
+
+
+class StubAgentClient:
+    def __init__(self, latency_ms: int):
+        self.latency_ms = latency_ms
+
+    async def call_agent(self, endpoint_url: str, input_text: str):
+        await asyncio.sleep(self.latency_ms / 1000)
+        return {"status": "success", "response": input_text.upper(), "latency_ms": self.latency_ms}
+
+
+class Served:
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+
+
+async def poll(run_id: str, interval: float, served: Served, done: asyncio.Event) -> None:
+    while not done.is_set():
+        for payload in (
+            await evaluations.list_evaluations(skip=0, limit=50, cursor=None, sort=None),
+            evaluations._build_evaluation_results(evaluations.get_evaluation_service(), run_id),
+        ):
+            served.bytes += len(JSONResponse(content=jsonable_encoder(payload)).body)
+            served.requests += 1
+        await asyncio.sleep(interval)
+
+
+async def subscribe(service: EvaluationService, run_id: str, served: Served) -> None:
+    served.requests += 1
+    async for message in sse_messages(service.watch_run(run_id)):
+        served.bytes += len(message)
+
+
+async def follow(mode: str, args: argparse.Namespace) -> tuple:
+    storage = InMemoryStorage()
+    test_cases = TestCaseService(storage)
+    service = EvaluationService(storage, test_cases)
+    service.agent_client = StubAgentClient(args.agent_ms)
+    evaluations._evaluation_service = service
+    ids = [
+        test_cases.create_test_case(f"question {i}", f"QUESTION {i}").id
+        for i in range(args.results)
+    ]
+    run = service.create_evaluation_run(ids, "http://agent", ["string-match"], max_concurrency=20)
+
+    served = Served()
+    done = asyncio.Event()
+    if mode == "poll":
+        followers = [poll(run.id, args.interval, served, done) for _ in range(args.clients)]
+    elif mode == "events":
+        followers = [subscribe(service, run.id, served) for _ in range(args.clients)]
+    else:
+        followers = []
+    tasks = [asyncio.create_task(f) for f in followers]
+    await asyncio.sleep(0)
+
+    start, cpu_start = time.perf_counter(), time.process_time()
+    await service.execute_evaluation(run.id)
+    done.set()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start, time.process_time() - cpu_start, served
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=12)
+    parser.add_argument("--interval", type=float, default=0.2)
+    parser.add_argument("--agent-ms", type=int, default=50, help="stub agent latency")
+    args = parser.parse_args()
+
+    print(f"{args.results:,} results, {args.clients} dashboards")
+    for mode in ("none", "poll", "events"):
+        elapsed, cpu, served = asyncio.run(follow(mode, args))
+        print(
+            f"  {mode:<7} run {elapsed:6.2f} s  CPU {cpu:6.2f} s  "
+            f"requests {served.requests:5,}  sent {served.bytes / 2**20:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Run stats benchmark - reading a run's aggregates vs recomputing them
+
+Stores one completed run with N results (three scores each) in SQLite and
+times getting its counts, latency and per-grader aggregates three ways:
+recomputing them from the stored records, building the run's analytics columns
+from storage (what an uncached summary costs), and reading the running stats
+kept on the run record. Also reports what keeping the stats costs while the
+run is written, per 200-record batch, saving them after every batch (the
+RUN_STATS_SAVE_INTERVAL_S=0 worst case).
+
+Usage (from backend/):
+    python -m benchmarks.bench_run_stats [--sizes 1000,10000,100000]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from src.models.evaluation import EvaluationRun
+from src.services.analytics_store import AnalyticsStore
+from src.services.evaluation_service import EvaluationService
+from src.services.run_stats import RunStats
+from src.services.sqlite_storage import SQLiteStorage
+from src.services.test_case_service import TestCaseService
+
+GRADERS = ("string-match", "length", "regex")
+STATUSES = ("success",) * 8 + ("error", "timeout")
+BATCH = 200
+
+
+def fill(storage: SQLiteStorage, run_id: str, results: int) -> float:
+    """Store the run batch by batch, keeping its stats; returns seconds spent on stats"""
+    storage.create_evaluation_run(
+        {
+            "id": run_id,
+            "test_case_ids": ["tc-0"],
+            "agent_endpoint_url": "http://agent",
+            "grader_ids": list(GRADERS),
+            "status": "running",
+            "created_at": "2026-01-01T00:00:00",
+        }
+    )
+    stats = RunStats()
+    spent = 0.0
+    for start in range(0, results, BATCH):
+        batch = [
+            {
+                "id": f"result-{i}",
+                "run_id": run_id,
+                "test_case_id": f"tc-{i % 100}",
+                "response_status": STATUSES[i % len(STATUSES)],
+                "response_latency_ms": 50 + i % 400,
+            }
+            for i in range(start, min(start + BATCH, results))
+        ]
+        scores = [
+            {
+                "id": f"{r['id']}-{grader}",
+                "result_id": r["id"],
+                "grader_id": grader,
+                "passed": (i + g) % 3 != 0,
+                "score": ((i + g) % 10) / 10,
+            }
+            for i, r in enumerate(batch)
+            for g, grader in enumerate(GRADERS)
+        ]
+        storage.create_evaluation_results_many(batch)
+        storage.create_scores_many(scores)
+        storage.flush()  # so the batch's own commit isn't counted as upkeep
+        began = time.perf_counter()
+        stats.add_results(batch)
+        stats.add_scores(scores)
+        storage.update_evaluation_run(
+            run_id, {"result_count": stats.results, "stats": stats.to_dict()}
+        )
+        spent += time.perf_counter() - began
+    storage.update_evaluation_run(run_id, {"status": "completed"})
+    storage.flush()
+    return spent
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    print(
+        f"{'results':>8} {'recompute':>12} {'columns':>12} {'read stats':>12} "
+        f"{'upkeep/batch':>13}"
+    )
+    for size in (int(n) for n in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(str(Path(tmp) / "bench.db"))
+            upkeep = fill(storage, "run", size)
+            service = EvaluationService(storage, TestCaseService(storage))
+
+            recompute = timed(
+                lambda: RunStats.compute(
+                    storage.list_evaluation_results("run"), storage.list_all_scores("run")
+                )
+            )
+            columns = timed(lambda: AnalyticsStore(storage).get_run("run").result_summary())
+            read = timed(
+                lambda: service.get_run_stats(EvaluationRun(**storage.get_evaluation_run("run")))
+            )
+            batches = -(-size // BATCH)
+            print(
+                f"{size:>8,} {recompute * 1e3:>9.1f} ms {columns * 1e3:>9.1f} ms "
+                f"{read * 1e3:>9.2f} ms {upkeep / batches * 1e3:>10.2f} ms"
+            )
+            storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Score memory benchmark - bytes held per stored score
+
+Stores N results with a response of the given length, grades each with three
+string-match configurations and measures (with tracemalloc) the memory added
+by storing the scores. The "dicts" row keeps every Score.to_dict() as is, as
+InMemoryStorage did before scores were stored as compact records.
+
+Usage (from backend/):
+    python -m benchmarks.bench_score_memory [--results 2000] [--response-chars 2000]
+"""
+import argparse
+import gc
+import tracemalloc
+from src.graders.string_match import StringMatchGrader
+from src.models.score import Score
+from src.services.storage import InMemoryStorage
+
+GRADER_CONFIGS = (
+    {},
+    {"case_sensitive": True},
+    {"normalize_whitespace": True},
+)
+
+
+def make_results(count: int, response_chars: int):
+    words = ("Paris is the capital of France " * (response_chars // 31 + 1))[:response_chars]
+    return [
+        {
+            "id": f"result-{i}",
+            "run_id": "run-0",
+            "test_case_id": f"tc-{i}",
+            "agent_response": f"{i} {words}",
+            "response_status": "success",
+        }
+        for i in range(count)
+    ]
+
+
+def make_scores(results):
+    graders = [StringMatchGrader(config=config) for config in GRADER_CONFIGS]
+    return [
+        Score(
+            result_id=result["id"],
+            grader_id="string-match",
+            **grader.grade(result["agent_response"], "Paris"),
+        ).to_dict()
+        for result in results
+        for grader in graders
+    ]
+
+
+def measure(store) -> int:
+    """Bytes still allocated after running store()"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = store()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=2000)
+    parser.add_argument("--response-chars", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = make_results(args.results, args.response_chars)
+
+    def store_dicts():
+        # Scores arrive as fresh dicts from the grading service
+        scores_by_id, by_result = {}, {}
+        for score in make_scores(results):
+            scores_by_id[score["id"]] = score
+            by_result.setdefault(score["result_id"], []).append(score)
+        return scores_by_id, by_result
+
+    storage = InMemoryStorage()
+    storage.create_evaluation_results_many(results)
+
+    def store_records():
+        storage.create_scores_many(make_scores(results))
+        return storage
+
+    scores = args.results * len(GRADER_CONFIGS)
+    print(f"{scores:,} scores, {args.response_chars:,}-char responses")
+    for name, store in (("dicts", store_dicts), ("records", store_records)):
+        used = measure(store)
+        print(f"  {name:<8} {used / 1024 / 1024:8.2f} MiB  {used / scores:10.1f} bytes/score")
+
+
+if __name__ == "__main__":
+    main()
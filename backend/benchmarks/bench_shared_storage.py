@@ -0,0 +1,79 @@
+"""
+Shared storage benchmark - storage daemon throughput from several processes
+
+Starts a storage daemon, fills it with test cases and runs, then has N worker
+processes issue the reads an API worker makes while polling (get a run, list a
+page of test cases) for a fixed time. Prints aggregate calls per second and
+the mean round trip per call for each number of processes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_shared_storage [--processes 1,2,4,8] [--seconds 2]
+"""
+import argparse
+import multiprocessing
+import shutil
+import tempfile
+import time
+from src.services.remote_storage import RemoteStorage
+from src.services.storage_daemon import ensure_daemon
+
+RECORDS = 1000
+
+
+def worker(socket_path: str, seconds: float, calls) -> None:
+    storage = RemoteStorage(socket_path)
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        storage.get_evaluation_run(f"run-{count % RECORDS}")
+        storage.list_test_cases_page(limit=20)
+        count += 2
+    storage.close()
+    calls.put(count)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", default="1,2,4,8")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--backend", default="memory")
+    args = parser.parse_args()
+
+    socket_dir = tempfile.mkdtemp(prefix="eg-")
+    socket_path = f"{socket_dir}/storage.sock"
+    daemon = ensure_daemon(socket_path, args.backend)
+    try:
+        storage = RemoteStorage(socket_path)
+        for i in range(RECORDS):
+            created_at = f"2026-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}"
+            storage.create_test_case(
+                {"id": f"tc-{i}", "input": "q", "expected_output": "a", "created_at": created_at}
+            )
+            storage.create_evaluation_run(
+                {"id": f"run-{i}", "status": "running", "created_at": created_at}
+            )
+        storage.close()
+
+        context = multiprocessing.get_context("spawn")
+        print(f"{'processes':>9} {'calls/s':>12} {'round trip':>12}")
+        for processes in (int(n) for n in args.processes.split(",")):
+            calls = context.Queue()
+            workers = [
+                context.Process(target=worker, args=(socket_path, args.seconds, calls))
+                for _ in range(processes)
+            ]
+            for w in workers:
+                w.start()
+            total = sum(calls.get() for _ in workers)
+            for w in workers:
+                w.join()
+            rate = total / args.seconds
+            print(f"{processes:>9} {rate:>12,.0f} {processes / rate * 1e6:>9.1f} us")
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        shutil.rmtree(socket_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Storage throughput benchmark - InMemoryStorage vs SQLiteStorage
+
+Writes a run's results and scores one create call per record ("single") and
+through the bulk methods in chunks ("bulk"), then reads them back through the
+per-run listings.
+
+Usage (from backend/):
+    python -m benchmarks.bench_storage [--results 20000] [--graders 2]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from src.services.storage import InMemoryStorage, StorageAbstraction
+from src.services.sqlite_storage import SQLiteStorage
+
+
+# Records per bulk call in "bulk" mode
+CHUNK = 200
+
+
+def make_records(run_id: str, results: int, graders: int):
+    result_records, score_records = [], []
+    for i in range(results):
+        result_id = f"{run_id}-result-{i}"
+        result_records.append(
+            {
+                "id": result_id,
+                "run_id": run_id,
+                "test_case_id": f"tc-{i}",
+                "agent_response": f"Answer number {i}",
+                "response_status": "success",
+                "latency_ms": 100,
+            }
+        )
+        for g in range(graders):
+            score_records.append(
+                {
+                    "id": f"{result_id}-score-{g}",
+                    "result_id": result_id,
+                    "grader_id": f"grader-{g}",
+                    "passed": i % 2 == 0,
+                    "score": 1.0 if i % 2 == 0 else 0.0,
+                }
+            )
+    return result_records, score_records
+
+
+def write_run(storage: StorageAbstraction, run_id: str, results, scores, bulk: bool) -> None:
+    storage.create_evaluation_run({"id": run_id, "status": "running"})
+    if bulk:
+        for start in range(0, len(results), CHUNK):
+            storage.create_evaluation_results_many(results[start : start + CHUNK])
+        for start in range(0, len(scores), CHUNK):
+            storage.create_scores_many(scores[start : start + CHUNK])
+    else:
+        for result in results:
+            storage.create_evaluation_result(result)
+        for score in scores:
+            storage.create_score(score)
+
+
+def bench(name: str, storage: StorageAbstraction, results: int, graders: int, bulk: bool) -> None:
+    records = results * (1 + graders)
+    result_records, score_records = make_records("run-0", results, graders)
+    name = f"{name} {'bulk' if bulk else 'single'}"
+
+    start = time.perf_counter()
+    write_run(storage, "run-0", result_records, score_records, bulk)
+    queued = time.perf_counter() - start
+    # SQLiteStorage writes are write-behind; wait for them to commit
+    flush = getattr(storage, "flush", None)
+    if flush is not None:
+        flush()
+    written = time.perf_counter() - start
+
+    start = time.perf_counter()
+    storage.list_evaluation_results("run-0")
+    storage.list_all_scores("run-0")
+    read = time.perf_counter() - start
+
+    print(
+        f"{name:<14} write {records / written:>10,.0f} rec/s "
+        f"(calls return after {queued:.2f}s, committed after {written:.2f}s)  "
+        f"read {records / read:>10,.0f} rec/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=20000)
+    parser.add_argument("--graders", type=int, default=2)
+    args = parser.parse_args()
+
+    for bulk in (False, True):
+        bench("memory", InMemoryStorage(), args.results, args.graders, bulk)
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(str(Path(tmp) / "bench.db"))
+            try:
+                bench("sqlite", storage, args.results, args.graders, bulk)
+            finally:
+                storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Storage concurrency benchmark - locked vs unlocked InMemoryStorage
+
+Writes results and scores for several runs from a number of threads and
+reports records per second with thread_safe on (lock-striped) and off. The
+unlocked variant is only here as a baseline: it can lose updates.
+
+Usage (from backend/):
+    python -m benchmarks.bench_storage_concurrency [--threads 1,4,16] [--results 20000]
+"""
+import argparse
+import threading
+import time
+from src.services.storage import InMemoryStorage
+
+
+def write_run(storage: InMemoryStorage, run_id: str, results: int, bulk: int) -> None:
+    for start in range(0, results, bulk):
+        batch = [
+            {
+                "id": f"{run_id}-r{i}",
+                "run_id": run_id,
+                "test_case_id": f"tc-{i % 100}",
+                "agent_response": "Paris",
+                "response_status": "success",
+            }
+            for i in range(start, min(start + bulk, results))
+        ]
+        storage.create_evaluation_results_many(batch)
+        storage.create_scores_many(
+            [
+                {
+                    "id": f"{result['id']}-s",
+                    "result_id": result["id"],
+                    "grader_id": "string-match",
+                    "passed": True,
+                    "score": 1.0,
+                }
+                for result in batch
+            ]
+        )
+
+
+def run(thread_safe: bool, threads: int, results: int, bulk: int) -> float:
+    storage = InMemoryStorage(thread_safe=thread_safe)
+    per_thread = results // threads
+    workers = [
+        threading.Thread(target=write_run, args=(storage, f"run-{t}", per_thread, bulk))
+        for t in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return 2 * per_thread * threads / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", default="1,4,16")
+    parser.add_argument("--results", type=int, default=20000)
+    parser.add_argument("--bulk", type=int, default=1, help="records per bulk call")
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'unlocked':>14} {'locked':>14}")
+    for threads in (int(n) for n in args.threads.split(",")):
+        unlocked = run(False, threads, args.results, args.bulk)
+        locked = run(True, threads, args.results, args.bulk)
+        print(
+            f"{threads:>7} {unlocked:>10,.0f} r/s {locked:>10,.0f} r/s "
+            f"({locked / unlocked:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
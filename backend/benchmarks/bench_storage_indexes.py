@@ -0,0 +1,68 @@
+"""
+Storage index benchmark - per-run lookups as history grows
+
+Fills InMemoryStorage with an increasing number of past runs and times the
+lookups behind the status and results endpoints for a single run. With the
+secondary indexes the per-lookup cost should stay flat as history grows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_storage_indexes [--results-per-run 50]
+"""
+import argparse
+import time
+from src.services.storage import InMemoryStorage
+
+
+def fill(storage: InMemoryStorage, first_run: int, runs: int, results_per_run: int) -> None:
+    """Add runs, each with results_per_run results and one score per result"""
+    for run_index in range(first_run, first_run + runs):
+        run_id = f"run-{run_index}"
+        storage.create_evaluation_run({"id": run_id, "status": "completed"})
+        for i in range(results_per_run):
+            result_id = f"{run_id}-result-{i}"
+            storage.create_evaluation_result(
+                {
+                    "id": result_id,
+                    "run_id": run_id,
+                    "test_case_id": f"tc-{i}",
+                    "response_status": "success",
+                }
+            )
+            storage.create_score(
+                {
+                    "id": f"{result_id}-score",
+                    "result_id": result_id,
+                    "grader_id": "string-match",
+                    "passed": i % 2 == 0,
+                }
+            )
+
+
+def time_lookups(storage: InMemoryStorage, run_id: str, repeats: int) -> float:
+    """Mean seconds for one list_evaluation_results + list_all_scores pair"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        storage.list_evaluation_results(run_id)
+        storage.list_all_scores(run_id)
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results-per-run", type=int, default=50)
+    parser.add_argument("--history", default="10,100,1000,5000")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    storage = InMemoryStorage()
+    stored_runs = 0
+    print(f"{'runs':>6} {'results':>9} {'lookup':>12}")
+    for runs in (int(n) for n in args.history.split(",")):
+        fill(storage, stored_runs, runs - stored_runs, args.results_per_run)
+        stored_runs = runs
+        elapsed = time_lookups(storage, "run-0", args.repeats)
+        print(f"{runs:>6} {len(storage.evaluation_results):>9} {elapsed * 1e6:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Test case import benchmark - one POST per test case vs a streamed bulk import
+
+Loads N generated test cases through the app into in-memory or SQLite storage:
+one POST /api/test-cases per case (timed on a sample of --sample cases), and a
+single POST /api/test-cases/import of the whole suite as JSONL and as CSV,
+uploaded in 64 KiB pieces. Reports test cases per second; the import rate
+includes parsing, validation and the storage writes being committed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_test_case_import [--cases 50000] [--sample 2000]
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+import httpx
+from src.api import test_cases
+from src.services.storage import InMemoryStorage
+from src.services.sqlite_storage import SQLiteStorage
+from src.services.test_case_service import TestCaseService
+from main import app
+
+PIECE = 64 * 1024
+
+
+def generate(cases: int):
+    return [
+        {
+            "input": f"What is {i} + {i}? Answer with the number only.",
+            "expected_output": str(2 * i),
+            "description": f"Arithmetic case {i}",
+            "tags": ["arithmetic", f"group-{i % 20}"],
+        }
+        for i in range(cases)
+    ]
+
+
+def jsonl_body(rows) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def csv_body(rows) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["input", "expected_output", "description", "tags"])
+    for row in rows:
+        writer.writerow(
+            [row["input"], row["expected_output"], row["description"], ";".join(row["tags"])]
+        )
+    return out.getvalue().encode()
+
+
+async def pieces(body: bytes):
+    for start in range(0, len(body), PIECE):
+        yield body[start : start + PIECE]
+
+
+async def per_request(client: httpx.AsyncClient, rows) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        await client.post("/api/test-cases", json=row)
+    return len(rows) / (time.perf_counter() - start)
+
+
+async def bulk(
+    client: httpx.AsyncClient, storage, body: bytes, content_type: str, cases: int
+) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/test-cases/import", content=pieces(body), headers={"Content-Type": content_type}
+    )
+    if hasattr(storage, "flush"):
+        storage.flush()  # count the SQLite commits too
+    elapsed = time.perf_counter() - start
+    assert response.json()["data"]["imported"] == cases, response.text
+    return cases / elapsed
+
+
+async def run(cases: int, sample: int) -> None:
+    rows = generate(cases)
+    bodies = {"jsonl": jsonl_body(rows), "csv": csv_body(rows)}
+    print(f"{'storage':>8} {'per request':>14} {'import jsonl':>14} {'import csv':>14}  (cases/s)")
+    for backend in ("memory", "sqlite"):
+        rates = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for step in ("single", "jsonl", "csv"):
+                if backend == "memory":
+                    storage = InMemoryStorage()
+                else:
+                    storage = SQLiteStorage(str(Path(tmp) / f"{step}.db"))
+                test_cases._test_case_service = TestCaseService(storage)
+                transport = httpx.ASGITransport(app=app)
+                client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+                async with client:
+                    if step == "single":
+                        rates.append(await per_request(client, rows[:sample]))
+                    else:
+                        content_type = "text/csv" if step == "csv" else "application/x-ndjson"
+                        rates.append(await bulk(client, storage, bodies[step], content_type, cases))
+                storage.close()
+        print(f"{backend:>8} " + " ".join(f"{rate:>14,.0f}" for rate in rates))
+    test_cases._test_case_service = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=50000)
+    parser.add_argument("--sample", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.cases, args.sample))
+
+
+if __name__ == "__main__":
+    main()
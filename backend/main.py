@@ -1,23 +1,43 @@
 """
 FastAPI application entry point with middleware and error handling
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.test_cases import router as test_cases_router
-from src.api.evaluations import router as evaluations_router
+from src.api.evaluations import router as evaluations_router, close_evaluation_service
 from src.api.graders import router as graders_router
+from src.services.grader_executor import shutdown_grader_executor
+from src.services.grader_service import get_grader_registry
+from src.services.storage_service import StorageService
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown hooks"""
+    # Build every declared grader before the first run needs it
+    warmup_ms = get_grader_registry().warm()
+    logger.info(f"Warmed grader registry in {warmup_ms:.2f}ms")
+    yield
+    # Close pooled agent connections and stop grader workers
+    await close_evaluation_service()
+    shutdown_grader_executor()
+    # Commit queued writes and close storage connections
+    StorageService.close_storage()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Agent Evaluation Service",
     description="Evaluate agent responses with pluggable graders",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -22,23 +22,35 @@ async def evaluate(request: Request):
     try:
         body = await request.json()
         input_text = body.get("input", "")
-        
+
         # Simulate processing time
         await asyncio.sleep(0.1)
-        
+
         # Return mock response
         response = MOCK_RESPONSES.get(input_text, f"Response to: {input_text}")
-        
-        return {
-            "status": "success",
-            "response": response,
-            "model": "mock-model-v1"
-        }
+
+        return {"status": "success", "response": response, "model": "mock-model-v1"}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+@mock_app.post("/evaluate/batch")
+async def evaluate_batch(request: Request):
+    """Simulate a batch-capable agent: {"inputs": [...]} -> {"responses": [...]}"""
+    try:
+        body = await request.json()
+        inputs = body.get("inputs", [])
+
+        # Simulate processing time once for the whole batch
+        await asyncio.sleep(0.1)
+
+        responses = [
+            MOCK_RESPONSES.get(input_text, f"Response to: {input_text}") for input_text in inputs
+        ]
+
+        return {"status": "success", "responses": responses, "model": "mock-model-v1"}
     except Exception as e:
-        return {
-            "status": "error",
-            "error": str(e)
-        }
+        return {"status": "error", "error": str(e)}
 
 
 @mock_app.get("/health")
@@ -1,13 +1,34 @@
 """
 Evaluation API endpoints - run management and execution
+
+Routes that only read or write storage are plain functions, so FastAPI runs them
+in its threadpool: with shared storage each call is a socket round trip, which
+must not hold up the event loop. Streams and the WebSocket stay async and do
+their storage reads in threads.
 """
-from fastapi import APIRouter, Query, BackgroundTasks, status
+from fastapi import (
+    APIRouter, Query, BackgroundTasks, Request, WebSocket, WebSocketDisconnect, status
+)
+from fastapi.responses import StreamingResponse
 from src.api.schemas import EvaluationRunCreate, EvaluationRunResponse, EvaluationResultResponse
-from src.api.utils import success_response, raise_not_found
+from src.api.utils import (
+    success_response,
+    paginated_response,
+    ndjson_chunks,
+    sse_messages,
+    json_line,
+    raise_not_found,
+    raise_bad_request,
+)
+from src.api.http_cache import cached_response, run_etag
+from src.models.evaluation import EvaluationRun
+from src.services.analytics_store import FINISHED_STATUSES
 from src.services.storage_service import StorageService
 from src.services.test_case_service import TestCaseService
 from src.services.evaluation_service import EvaluationService
 from src.services.grader_service import GraderService
+from src.config import RESULTS_STREAM_CHUNK
+from typing import Any, Dict, List, Optional
 import asyncio
 import logging
 
@@ -30,8 +51,14 @@ def get_evaluation_service() -> EvaluationService:
     return _evaluation_service
 
 
+async def close_evaluation_service() -> None:
+    """Release resources held by the evaluation service (called on app shutdown)"""
+    if _evaluation_service is not None:
+        await _evaluation_service.agent_client.aclose()
+
+
 @router.post("", status_code=status.HTTP_201_CREATED)
-async def create_evaluation(run: EvaluationRunCreate, background_tasks: BackgroundTasks):
+def create_evaluation(run: EvaluationRunCreate, background_tasks: BackgroundTasks):
     """Create and start a new evaluation run"""
     service = get_evaluation_service()
     
@@ -43,7 +70,14 @@ async def create_evaluation(run: EvaluationRunCreate, background_tasks: Backgrou
     created_run = service.create_evaluation_run(
         test_case_ids=run.test_case_ids,
         agent_endpoint_url=str(run.agent_endpoint_url),
-        grader_ids=run.grader_ids
+        grader_ids=run.grader_ids,
+        max_concurrency=run.max_concurrency,
+        batch_size=run.batch_size,
+        batch_max_wait_ms=run.batch_max_wait_ms,
+        agent_batch_endpoint_url=(
+            str(run.agent_batch_endpoint_url) if run.agent_batch_endpoint_url else None
+        ),
+        agent_version=run.agent_version
     )
 
     # Start execution in background
@@ -55,20 +89,99 @@ async def create_evaluation(run: EvaluationRunCreate, background_tasks: Backgrou
     )
 
 
+def _event_stream(events) -> StreamingResponse:
+    """Server-Sent Events response, not cached or buffered by proxies"""
+    return StreamingResponse(
+        sse_messages(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/events")
+async def all_evaluation_events():
+    """
+    Stream run and progress events of every run as Server-Sent Events
+
+    Lets run lists follow runs being created, changing status and making progress
+    without polling. The stream stays open until the client disconnects.
+    """
+    return _event_stream(get_evaluation_service().watch_runs())
+
+
+def _get_run_record(service: EvaluationService, run_id: str) -> dict:
+    """A run's stored record, or 404"""
+    data = service.storage.get_evaluation_run(run_id)
+    if not data:
+        raise_not_found("EvaluationRun", run_id)
+    return data
+
+
+def _finished_run_response(request: Request, kind: str, data: dict, build):
+    """
+    Serve a read of a run: finished runs get an ETag and a cached encoded body
+    (see http_cache), unfinished ones are built every time
+    """
+    if data.get("status") in FINISHED_STATUSES:
+        return cached_response(request, (kind, data["id"]), run_etag(data), build)
+    return build()
+
+
 @router.get("/{run_id}")
-async def get_evaluation_status(run_id: str):
-    """Get evaluation run status"""
+def get_evaluation_status(run_id: str, request: Request):
+    """
+    Get evaluation run status
+
+    A finished run's agent_concurrency is left out: it is the endpoint's live
+    limiter state, not part of the run, and would keep the response from being
+    cached.
+    """
     service = get_evaluation_service()
-    run = service.get_evaluation_run(run_id)
-    if not run:
-        raise_not_found("EvaluationRun", run_id)
-    return success_response(EvaluationRunResponse(**run.to_dict()).__dict__)
+    data = _get_run_record(service, run_id)
+    if data.get("status") in FINISHED_STATUSES and data.get("stats") is None:
+        # Saving the backfilled stats bumps the version: tag the saved record
+        service.get_run_stats(EvaluationRun(**data))
+        data = _get_run_record(service, run_id)
+
+    def build() -> dict:
+        run = EvaluationRun(**data)
+        limiter = None
+        if run.status not in FINISHED_STATUSES:
+            limiter = service.get_agent_limiter(run.agent_endpoint_url, create=False)
+        return success_response(EvaluationRunResponse(
+            **{**run.to_dict(), "stats": service.get_run_stats(run)},
+            agent_concurrency=limiter.snapshot() if limiter else None
+        ).__dict__)
+
+    return _finished_run_response(request, "run", data, build)
 
 
 @router.get("")
-async def list_evaluations(skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100)):
-    """List evaluation runs with pagination"""
+def list_evaluations(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    sort: Optional[str] = Query(None, description="created_at, -created_at, id or -id")
+):
+    """
+    List evaluation runs with pagination
+
+    Passing sort or cursor switches from skip/limit to keyset pagination: the
+    response carries a next_cursor (null on the last page) for the next request.
+    """
     service = get_evaluation_service()
+    if cursor is not None or sort is not None:
+        if skip:
+            raise_bad_request("skip cannot be combined with cursor or sort")
+        try:
+            runs, next_cursor = service.list_evaluation_runs_page(limit, cursor, sort)
+        except ValueError as e:
+            raise_bad_request(str(e))
+        return paginated_response(
+            [EvaluationRunResponse(**r.to_dict()).__dict__ for r in runs],
+            next_cursor
+        )
+
     runs = service.list_evaluation_runs(skip, limit)
     return success_response(
         [EvaluationRunResponse(**r.to_dict()).__dict__ for r in runs]
@@ -76,45 +189,105 @@ async def list_evaluations(skip: int = Query(0, ge=0), limit: int = Query(10, ge
 
 
 @router.get("/{run_id}/results")
-async def get_evaluation_results(run_id: str):
+def get_evaluation_results(run_id: str, request: Request):
     """Get all results for an evaluation run"""
     service = get_evaluation_service()
-    
+
     # Verify run exists
-    run = service.get_evaluation_run(run_id)
-    if not run:
-        raise_not_found("EvaluationRun", run_id)
+    data = _get_run_record(service, run_id)
+    return _finished_run_response(
+        request, "results", data, lambda: _build_evaluation_results(service, run_id)
+    )
+
 
+def _build_evaluation_results(service: EvaluationService, run_id: str) -> dict:
+    """A run's results with their scores, and its summary"""
     # Get results
     results = service.get_evaluation_results(run_id)
-    
-    # Calculate summary stats
-    total_results = len(results)
-    successful_results = sum(1 for r in results if r.response_status == "success")
-    failed_results = sum(1 for r in results if r.response_status == "error")
-    timeout_results = sum(1 for r in results if r.response_status == "timeout")
-    
-    avg_latency = (
-        sum(r.response_latency_ms for r in results if r.response_latency_ms) / successful_results
-        if successful_results > 0 else 0
-    )
 
-    # Get grading results with scores
+    # Summary stats come from the run's columnar analytics
+    summary = service.analytics.get_run(run_id).result_summary()
+
+    # Get grading results with scores, read run-wide (archived runs have no per-result lookup)
+    scores_by_result: Dict[str, List[Dict[str, Any]]] = {}
+    for score in service.storage.list_all_scores(run_id):
+        scores_by_result.setdefault(score["result_id"], []).append(score)
     results_with_scores = []
     for result in results:
         result_dict = EvaluationResultResponse(**result.to_dict()).__dict__
-        # Get scores for this result
-        scores = service.storage.list_scores(result.id)
-        result_dict["scores"] = scores
+        result_dict["scores"] = scores_by_result.get(result.id, [])
         results_with_scores.append(result_dict)
 
     return success_response({
         "results": results_with_scores,
-        "summary": {
-            "total": total_results,
-            "successful": successful_results,
-            "failed": failed_results,
-            "timeout": timeout_results,
-            "avg_latency_ms": round(avg_latency, 2)
-        }
+        "summary": summary
     })
+
+
+@router.get("/{run_id}/results/stream")
+def stream_evaluation_results(run_id: str):
+    """
+    Stream all results for an evaluation run as NDJSON
+
+    One {"type": "result", "data": ...} line per result (with its scores), in
+    creation order, then a {"type": "summary", "data": ...} trailer line. Results
+    are read and sent in chunks, so memory use doesn't grow with the run.
+    """
+    service = get_evaluation_service()
+    if not service.get_evaluation_run(run_id):
+        raise_not_found("EvaluationRun", run_id)
+
+    return StreamingResponse(
+        ndjson_chunks(service.stream_evaluation_results(run_id), RESULTS_STREAM_CHUNK),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/{run_id}/events")
+def evaluation_events(run_id: str):
+    """
+    Stream an evaluation run's events as Server-Sent Events
+
+    Starts with the run's current record, then sends results and scores as they
+    are stored, progress counters and status changes. The stream ends once the
+    run has completed or failed.
+    """
+    service = get_evaluation_service()
+    if not service.get_evaluation_run(run_id):
+        raise_not_found("EvaluationRun", run_id)
+    return _event_stream(service.watch_run(run_id))
+
+
+@router.websocket("/{run_id}/events")
+async def evaluation_events_websocket(websocket: WebSocket, run_id: str):
+    """The same events as GET /{run_id}/events, one JSON message each, over a WebSocket"""
+    service = get_evaluation_service()
+    if not await asyncio.to_thread(service.storage.get_evaluation_run, run_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    events = service.watch_run(run_id)
+    try:
+        async for event in events:
+            await websocket.send_text(json_line(event or {"type": "keepalive"}))
+    except WebSocketDisconnect:
+        return
+    finally:
+        await events.aclose()
+    await websocket.close()
+
+
+@router.get("/{run_id}/analytics")
+def get_evaluation_analytics(run_id: str, request: Request):
+    """Get result and score aggregates for an evaluation run"""
+    service = get_evaluation_service()
+    data = _get_run_record(service, run_id)
+
+    def build() -> dict:
+        columns = service.analytics.get_run(run_id)
+        return success_response({
+            "results": columns.result_summary(),
+            "scores": columns.score_summary()
+        })
+
+    return _finished_run_response(request, "analytics", data, build)
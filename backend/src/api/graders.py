@@ -4,7 +4,8 @@ Graders API endpoints - list available graders
 from fastapi import APIRouter
 from src.api.schemas import GraderResponse
 from src.api.utils import success_response, raise_not_found
-from src.services.grader_service import GraderService
+from src.services.grader_service import GraderService, get_grader_registry
+from src.services.grader_executor import get_grader_executor
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,18 @@ async def list_graders():
     )
 
 
+@router.get("/executor")
+async def get_grader_executor_stats():
+    """Get the grader executor backend and per-grader CPU time"""
+    return success_response(get_grader_executor().snapshot())
+
+
+@router.get("/registry")
+async def get_grader_registry_stats():
+    """Get built grader instances with their build and warmup cost"""
+    return success_response(get_grader_registry().snapshot())
+
+
 @router.get("/{grader_id}")
 async def get_grader(grader_id: str):
     """Get grader details by ID"""
@@ -0,0 +1,112 @@
+"""
+Conditional GETs and a cache of encoded responses for finished runs
+
+A finished run only changes through an update of its record (archiving,
+re-grading), and every update bumps the run's version. So the version is a
+strong ETag for everything read about a finished run, and an encoded response
+can be kept until the version moves on: a repeat read is one dict lookup and
+sends the cached bytes, and a client that already has them gets a 304.
+
+Unfinished runs change with every stored result, so they are not cached.
+
+The cache is per worker process, but the version is read from storage on every
+request, so with several workers an entry built for an older version is never
+served: the worker rebuilds it.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import threading
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from src.config import RESPONSE_CACHE_MAX_MB
+
+CacheKey = Tuple[str, str]
+
+
+def run_etag(run: Dict[str, Any]) -> str:
+    """Strong ETag of a run's current version"""
+    return f'"{run["id"]}.{run.get("version", 0)}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names this ETag (weak comparison, as for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+class EncodedResponseCache:
+    """LRU of encoded JSON bodies, each stored with the ETag it was built for"""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Tuple[str, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey, etag: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: CacheKey, etag: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[key] = (etag, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Process-wide cache of encoded responses
+_response_cache: Optional[EncodedResponseCache] = None
+
+
+def get_encoded_response_cache() -> EncodedResponseCache:
+    """Get the process-wide encoded response cache"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = EncodedResponseCache()
+    return _response_cache
+
+
+def cached_response(
+    request: Request, key: CacheKey, etag: str, build: Callable[[], Any]
+) -> Response:
+    """
+    Respond for a finished run: 304 if the client has this ETag, else the cached
+    body, else build(), encode it the way FastAPI would and cache it
+
+    Cache-Control: no-cache makes clients revalidate, since archiving or
+    re-grading a run changes its ETag.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    cache = get_encoded_response_cache()
+    body = cache.get(key, etag)
+    if body is None:
+        body = JSONResponse(content=jsonable_encoder(build())).body
+        cache.put(key, etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -52,13 +52,19 @@ class EvaluationRunCreate(BaseModel):
     test_case_ids: List[str] = Field(..., min_items=1)
     agent_endpoint_url: HttpUrl
     grader_ids: List[str] = Field(..., min_items=1)
+    max_concurrency: Optional[int] = Field(None, ge=1, le=1000)
+    batch_size: Optional[int] = Field(None, ge=1, le=1000)
+    batch_max_wait_ms: Optional[int] = Field(None, ge=0, le=10000)
+    agent_batch_endpoint_url: Optional[HttpUrl] = None
+    agent_version: Optional[str] = Field(None, max_length=200)
 
     class Config:
         json_schema_extra = {
             "example": {
                 "test_case_ids": ["test-1", "test-2"],
                 "agent_endpoint_url": "https://api.agent.example.com/evaluate",
-                "grader_ids": ["string-match"]
+                "grader_ids": ["string-match"],
+                "max_concurrency": 10
             }
         }
 
@@ -74,6 +80,16 @@ class EvaluationRunResponse(BaseModel):
     completed_at: Optional[datetime]
     result_count: int
     error_message: Optional[str]
+    max_concurrency: Optional[int] = None
+    batch_size: Optional[int] = None
+    batch_max_wait_ms: Optional[int] = None
+    agent_batch_endpoint_url: Optional[str] = None
+    agent_version: Optional[str] = None
+    created_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None  # set once results/scores are in cold storage
+    stats: Optional[dict] = None  # running result/score aggregates
+    version: int = 0  # bumped on every update; the run's ETag once it has finished
+    agent_concurrency: Optional[dict] = None  # adaptive limiter state for the agent endpoint
 
 
 # ============= Evaluation Result Schemas =============
@@ -87,6 +103,9 @@ class EvaluationResultResponse(BaseModel):
     response_latency_ms: Optional[int]
     response_status: str  # success, timeout, error
     error_message: Optional[str]
+    attempt_count: int = 1
+    attempt_latencies_ms: Optional[List[int]] = None
+    cached: bool = False
     created_at: datetime
 
 
@@ -98,6 +117,7 @@ class GraderResponse(BaseModel):
     name: str
     description: str
     type: str
+    config: Optional[dict] = None
 
 
 class ScoreResponse(BaseModel):
@@ -1,11 +1,22 @@
 """
 Test Cases API endpoints - CRUD operations
+
+The CRUD routes are plain functions, so FastAPI runs their storage calls in its
+threadpool instead of on the event loop; the streamed import hands each chunk
+to the threadpool.
 """
-from fastapi import APIRouter, Query, status
+from fastapi import APIRouter, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from src.api.schemas import TestCaseCreate, TestCaseUpdate, TestCaseResponse
-from src.api.utils import success_response, raise_not_found
+from src.api.utils import (
+    success_response,
+    paginated_response,
+    raise_not_found,
+    raise_bad_request,
+)
 from src.services.storage_service import StorageService
 from src.services.test_case_service import TestCaseService
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,7 +37,7 @@ def get_test_case_service() -> TestCaseService:
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
-async def create_test_case(test_case: TestCaseCreate):
+def create_test_case(test_case: TestCaseCreate):
     """Create a new test case"""
     service = get_test_case_service()
     created = service.create_test_case(
@@ -41,8 +52,38 @@ async def create_test_case(test_case: TestCaseCreate):
     )
 
 
+@router.post("/import")
+async def import_test_cases(
+    request: Request,
+    fmt: Optional[str] = Query(
+        None, alias="format", description="jsonl or csv (default: from Content-Type)"
+    )
+):
+    """
+    Create test cases in bulk from a JSONL or CSV upload
+
+    The request body is parsed as it streams in and written in batches. JSONL
+    has one test case object per line; CSV has a header row naming the columns
+    (input and expected_output required, tags separated by ";"). Rows that
+    can't be parsed or validated are skipped and reported by line number.
+    """
+    service = get_test_case_service()
+    if fmt is None:
+        fmt = "csv" if "csv" in request.headers.get("content-type", "") else "jsonl"
+    try:
+        importer = service.start_import(fmt)
+        # Parsing and the batched storage writes run in the threadpool
+        async for chunk in request.stream():
+            await run_in_threadpool(importer.feed, chunk)
+        report = await run_in_threadpool(importer.finish)
+    except ValueError as e:
+        raise_bad_request(str(e))
+    logger.info(f"Imported {report['imported']} test cases ({report['failed']} rows failed)")
+    return success_response(report, f"Imported {report['imported']} test cases")
+
+
 @router.get("/{test_case_id}")
-async def get_test_case(test_case_id: str):
+def get_test_case(test_case_id: str):
     """Get a test case by ID"""
     service = get_test_case_service()
     test_case = service.get_test_case(test_case_id)
@@ -52,9 +93,31 @@ async def get_test_case(test_case_id: str):
 
 
 @router.get("")
-async def list_test_cases(skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100)):
-    """List test cases with pagination"""
+def list_test_cases(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    sort: Optional[str] = Query(None, description="created_at, -created_at, id or -id")
+):
+    """
+    List test cases with pagination
+
+    Passing sort or cursor switches from skip/limit to keyset pagination: the
+    response carries a next_cursor (null on the last page) for the next request.
+    """
     service = get_test_case_service()
+    if cursor is not None or sort is not None:
+        if skip:
+            raise_bad_request("skip cannot be combined with cursor or sort")
+        try:
+            test_cases, next_cursor = service.list_test_cases_page(limit, cursor, sort)
+        except ValueError as e:
+            raise_bad_request(str(e))
+        return paginated_response(
+            [TestCaseResponse(**tc.to_dict()).__dict__ for tc in test_cases],
+            next_cursor
+        )
+
     test_cases = service.list_test_cases(skip, limit)
     return success_response(
         [TestCaseResponse(**tc.to_dict()).__dict__ for tc in test_cases]
@@ -62,7 +125,7 @@ async def list_test_cases(skip: int = Query(0, ge=0), limit: int = Query(10, ge=
 
 
 @router.put("/{test_case_id}")
-async def update_test_case(test_case_id: str, updates: TestCaseUpdate):
+def update_test_case(test_case_id: str, updates: TestCaseUpdate):
     """Update a test case"""
     service = get_test_case_service()
     updated = service.update_test_case(
@@ -81,7 +144,7 @@ async def update_test_case(test_case_id: str, updates: TestCaseUpdate):
 
 
 @router.delete("/{test_case_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_test_case(test_case_id: str):
+def delete_test_case(test_case_id: str):
     """Delete a test case"""
     service = get_test_case_service()
     if not service.delete_test_case(test_case_id):
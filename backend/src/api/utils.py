@@ -1,8 +1,10 @@
 """
 API response utilities and common patterns
 """
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Iterable, Iterator, NoReturn, Optional
+from datetime import date, datetime
 from fastapi import HTTPException, status
+import json
 
 
 def success_response(data: Any, message: str = "Success") -> dict:
@@ -14,6 +16,57 @@ def success_response(data: Any, message: str = "Success") -> dict:
     }
 
 
+def paginated_response(data: list, next_cursor: Optional[str]) -> dict:
+    """Success response for a keyset-paginated listing"""
+    response = success_response(data)
+    response["next_cursor"] = next_cursor
+    return response
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def json_line(record: Any) -> str:
+    """Encode a record as one line of JSON (dates in ISO format)"""
+    return json.dumps(record, default=_json_default)
+
+
+def ndjson_chunks(records: Iterable[Any], lines_per_chunk: int = 500) -> Iterator[str]:
+    """
+    Encode records as newline-delimited JSON, a chunk of lines at a time
+
+    Meant as a StreamingResponse body: each chunk is one write to the client,
+    so a sync record generator costs one threadpool hop per chunk, not per line.
+    """
+    lines = []
+    for record in records:
+        lines.append(json_line(record))
+        if len(lines) >= lines_per_chunk:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def sse_messages(events: AsyncIterator[Optional[dict]]) -> AsyncIterator[str]:
+    """
+    Encode events as Server-Sent Events messages, for a StreamingResponse body
+
+    Each event is a "data:" line holding the event as JSON, preceded by an "id:"
+    line when the event has an ID. None becomes a keepalive comment.
+    """
+    async for event in events:
+        if event is None:
+            yield ": keepalive\n\n"
+        elif event.get("id"):
+            yield f"id: {event['id']}\ndata: {json_line(event)}\n\n"
+        else:
+            yield f"data: {json_line(event)}\n\n"
+
+
 def error_response(
     message: str, 
     code: str = "INTERNAL_ERROR", 
@@ -30,7 +83,7 @@ def error_response(
     return response
 
 
-def raise_not_found(resource_type: str, resource_id: str):
+def raise_not_found(resource_type: str, resource_id: str) -> NoReturn:
     """Raise 404 Not Found error"""
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -38,7 +91,7 @@ def raise_not_found(resource_type: str, resource_id: str):
     )
 
 
-def raise_bad_request(message: str, details: Optional[dict] = None):
+def raise_bad_request(message: str, details: Optional[dict] = None) -> NoReturn:
     """Raise 400 Bad Request error"""
     detail = {"message": message}
     if details:
@@ -49,7 +102,7 @@ def raise_bad_request(message: str, details: Optional[dict] = None):
     )
 
 
-def raise_conflict(message: str):
+def raise_conflict(message: str) -> NoReturn:
     """Raise 409 Conflict error"""
     raise HTTPException(
         status_code=status.HTTP_409_CONFLICT,
@@ -12,9 +12,124 @@ PORT = int(os.getenv("BACKEND_PORT", "8000"))
 
 # Agent configuration
 AGENT_TIMEOUT = int(os.getenv("AGENT_TIMEOUT", "30"))
+# Bound on one test case's agent call, including retries, backoff and hedges (seconds)
+AGENT_TOTAL_TIMEOUT = float(os.getenv("AGENT_TOTAL_TIMEOUT", "60"))
+AGENT_MAX_CONNECTIONS = int(os.getenv("AGENT_MAX_CONNECTIONS", "100"))
+AGENT_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AGENT_MAX_KEEPALIVE_CONNECTIONS", "20"))
+AGENT_KEEPALIVE_EXPIRY = float(os.getenv("AGENT_KEEPALIVE_EXPIRY", "30"))
+AGENT_HTTP2 = os.getenv("AGENT_HTTP2", "false").lower() == "true"
+
+# Agent retries (backoff in seconds) and hedged requests for tail latency
+AGENT_MAX_RETRIES = int(os.getenv("AGENT_MAX_RETRIES", "2"))
+AGENT_RETRY_BACKOFF_BASE = float(os.getenv("AGENT_RETRY_BACKOFF_BASE", "0.1"))
+AGENT_RETRY_BACKOFF_MAX = float(os.getenv("AGENT_RETRY_BACKOFF_MAX", "5"))
+AGENT_HEDGING = os.getenv("AGENT_HEDGING", "false").lower() == "true"
+AGENT_HEDGE_PERCENTILE = float(os.getenv("AGENT_HEDGE_PERCENTILE", "0.95"))
+AGENT_HEDGE_MIN_SAMPLES = int(os.getenv("AGENT_HEDGE_MIN_SAMPLES", "20"))
+
+# Batch mode: default time a micro-batch waits to fill before it is sent
+AGENT_BATCH_MAX_WAIT_MS = int(os.getenv("AGENT_BATCH_MAX_WAIT_MS", "20"))
+
+# Agent response cache (only used for runs that set agent_version)
+AGENT_CACHE_ENABLED = os.getenv("AGENT_CACHE_ENABLED", "false").lower() == "true"
+AGENT_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "10000"))
+AGENT_CACHE_TTL = int(os.getenv("AGENT_CACHE_TTL", "86400"))
+AGENT_CACHE_DIR = os.getenv("AGENT_CACHE_DIR", "")  # empty disables the disk tier
+AGENT_CACHE_DISK_MAX_MB = int(os.getenv("AGENT_CACHE_DISK_MAX_MB", "512"))
+
+# Adaptive (AIMD) per-endpoint concurrency for agent calls, off by default. The
+# limit starts at the per-run default (EVALUATION_MAX_CONCURRENCY) unless set
+AGENT_ADAPTIVE_CONCURRENCY = os.getenv("AGENT_ADAPTIVE_CONCURRENCY", "false").lower() == "true"
+AGENT_CONCURRENCY_INITIAL = int(
+    os.getenv("AGENT_CONCURRENCY_INITIAL", os.getenv("EVALUATION_MAX_CONCURRENCY", "10"))
+)
+AGENT_CONCURRENCY_MIN = int(os.getenv("AGENT_CONCURRENCY_MIN", "1"))
+AGENT_CONCURRENCY_MAX = int(os.getenv("AGENT_CONCURRENCY_MAX", "64"))
+
+# Evaluation execution configuration
+# Max in-flight agent calls per run (a run may override it) and across all runs
+EVALUATION_MAX_CONCURRENCY = int(os.getenv("EVALUATION_MAX_CONCURRENCY", "10"))
+EVALUATION_GLOBAL_MAX_CONCURRENCY = int(os.getenv("EVALUATION_GLOBAL_MAX_CONCURRENCY", "100"))
 
 # Grader configuration
 GRADER_TIMEOUT = int(os.getenv("GRADER_TIMEOUT", "5"))
+# Where graders run: "thread", "process" (process pool) or "subprocess" (warm workers)
+GRADER_EXECUTOR = os.getenv("GRADER_EXECUTOR", "thread")
+# Worker processes for the process/subprocess executors (0 = one per CPU)
+GRADER_WORKERS = int(os.getenv("GRADER_WORKERS", "0"))
+# Results buffered between the agent stage and the grading stage of a run
+GRADING_QUEUE_SIZE = int(os.getenv("GRADING_QUEUE_SIZE", "100"))
+# Results sent to a grader's grade_batch() at a time
+GRADING_BATCH_SIZE = int(os.getenv("GRADING_BATCH_SIZE", "50"))
+
+# Storage configuration
+# Backend: "memory" (lost on restart), "durable" (memory + write-ahead log), "sqlite"
+# or "shared" (a storage daemon shared by every worker process)
+STORAGE_TYPE = os.getenv("STORAGE_TYPE", "memory")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/eval_grader.db")
+# "shared" storage: the daemon's Unix socket, the backend it serves ("memory",
+# "durable" or "sqlite") and whether the first worker starts it when needed
+STORAGE_SOCKET = os.getenv("STORAGE_SOCKET", "data/storage.sock")
+STORAGE_DAEMON_BACKEND = os.getenv("STORAGE_DAEMON_BACKEND", "memory")
+STORAGE_DAEMON_AUTOSTART = os.getenv("STORAGE_DAEMON_AUTOSTART", "true").lower() == "true"
+# In-memory backends: lock writes so worker threads can share the storage, and
+# how many lock stripes runs are spread over
+STORAGE_THREAD_SAFE = os.getenv("STORAGE_THREAD_SAFE", "true").lower() == "true"
+STORAGE_LOCK_STRIPES = int(os.getenv("STORAGE_LOCK_STRIPES", "64"))
+# Write-ahead log for the "durable" backend: group commit interval, whether
+# each commit is fsynced, and the segment size that triggers a snapshot.
+# WAL_SYNC_COMMIT=false returns from writes before they are committed: faster,
+# but a crash loses the writes of the last commit interval
+WAL_DIR = os.getenv("WAL_DIR", "data/wal")
+WAL_COMMIT_INTERVAL_MS = int(os.getenv("WAL_COMMIT_INTERVAL_MS", "10"))
+WAL_FSYNC = os.getenv("WAL_FSYNC", "true").lower() == "true"
+WAL_SYNC_COMMIT = os.getenv("WAL_SYNC_COMMIT", "true").lower() == "true"
+WAL_SEGMENT_MAX_MB = int(os.getenv("WAL_SEGMENT_MAX_MB", "64"))
+# Retention for the "memory" and "durable" backends: finished runs beyond the
+# newest RETENTION_MAX_RUNS, or finished more than RETENTION_MAX_AGE_DAYS ago,
+# have their results and scores moved to compressed files in ARCHIVE_DIR
+# (0 disables a limit). Checked every RETENTION_INTERVAL_S seconds; the most
+# recently read ARCHIVE_CACHE_RUNS archived runs stay loaded
+RETENTION_MAX_RUNS = int(os.getenv("RETENTION_MAX_RUNS", "0"))
+RETENTION_MAX_AGE_DAYS = float(os.getenv("RETENTION_MAX_AGE_DAYS", "0"))
+RETENTION_INTERVAL_S = float(os.getenv("RETENTION_INTERVAL_S", "60"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/archive")
+ARCHIVE_CACHE_RUNS = int(os.getenv("ARCHIVE_CACHE_RUNS", "8"))
+# Run results/scores are written in bulk once this many are buffered or the
+# oldest has waited this long (0 ms writes every record immediately)
+WRITE_BUFFER_SIZE = int(os.getenv("WRITE_BUFFER_SIZE", "200"))
+WRITE_BUFFER_MAX_WAIT_MS = int(os.getenv("WRITE_BUFFER_MAX_WAIT_MS", "50"))
+# Results are stored in test-case order: an agent call only starts once its test
+# case is within this many positions of the oldest one not yet stored, so a slow
+# call holds back at most this many finished results (0 disables the limit)
+RESULTS_REORDER_WINDOW = int(os.getenv("RESULTS_REORDER_WINDOW", "200"))
+
+# Analytics - number of runs whose columnar results and scores are kept in memory
+ANALYTICS_MAX_RUNS = int(os.getenv("ANALYTICS_MAX_RUNS", "64"))
+
+# Results read from storage at a time by the streaming results endpoint
+RESULTS_STREAM_CHUNK = int(os.getenv("RESULTS_STREAM_CHUNK", "500"))
+
+# Bulk test case import - rows validated and written per batch, and how many
+# row errors an import reports (all are counted)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+# Megabytes of encoded responses kept for finished runs (served with ETags)
+RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "64"))
+
+# Run events (SSE/WebSocket) - events buffered per subscriber before a slow one
+# is told to resync, and seconds between keepalives on an idle stream
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "1000"))
+EVENTS_KEEPALIVE_S = float(os.getenv("EVENTS_KEEPALIVE_S", "15"))
+# Runs executing in another worker are followed by reading storage every
+# EVENTS_POLL_S seconds; the all-runs stream checks the newest EVENTS_POLL_RUNS runs
+EVENTS_POLL_S = float(os.getenv("EVENTS_POLL_S", "1"))
+EVENTS_POLL_RUNS = int(os.getenv("EVENTS_POLL_RUNS", "100"))
+
+# Seconds between saves of a running run's stats and result count to its record
+# (GET /api/evaluations/{id} on the executing worker always reads them live)
+RUN_STATS_SAVE_INTERVAL_S = float(os.getenv("RUN_STATS_SAVE_INTERVAL_S", "1"))
 
 # Testing
 TESTING = os.getenv("TESTING", "false").lower() == "true"
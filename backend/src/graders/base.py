@@ -2,7 +2,7 @@
 Grader base interface - extensible grading system
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,6 +29,21 @@ class GraderInterface(ABC):
         """
         pass
 
+    def grade_batch(
+        self, agent_responses: List[str], expected_outputs: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Grade a chunk of responses against their expected outputs
+
+        Returns one grade() shaped result per response, in input order.
+        The default calls grade() for each pair; graders that can vectorize
+        (compiled patterns, batched similarity, NumPy) should override it.
+        """
+        return [
+            self.grade(agent_response, expected_output)
+            for agent_response, expected_output in zip(agent_responses, expected_outputs)
+        ]
+
     @abstractmethod
     def validate_config(self) -> bool:
         """Validate grader configuration"""
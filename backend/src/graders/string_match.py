@@ -2,12 +2,33 @@
 String-Match grader - MVP implementation
 """
 from .base import GraderInterface
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _keep(text: str) -> str:
+    return text
+
+
+def _collapse_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _collapse_whitespace_lower(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+# (case_sensitive, normalize_whitespace) -> normalization function
+NORMALIZERS: Dict[Tuple[bool, bool], Callable[[str], str]] = {
+    (True, False): _keep,
+    (False, False): str.lower,
+    (True, True): _collapse_whitespace,
+    (False, True): _collapse_whitespace_lower,
+}
+
+
 class StringMatchGrader(GraderInterface):
     """
     String-match grader for MVP
@@ -23,6 +44,8 @@ class StringMatchGrader(GraderInterface):
         super().__init__(grader_id, config)
         self.case_sensitive = self.config.get("case_sensitive", False)
         self.normalize_whitespace = self.config.get("normalize_whitespace", False)
+        # Resolve the normalization rules once per instance
+        self._normalize_text = self._build_normalizer()
 
     def validate_config(self) -> bool:
         """Validate configuration"""
@@ -31,15 +54,13 @@ class StringMatchGrader(GraderInterface):
                 logger.warning(f"Unknown config key: {key}")
         return True
 
+    def _build_normalizer(self) -> Callable[[str], str]:
+        """Pick the normalization function for this configuration"""
+        return NORMALIZERS[(bool(self.case_sensitive), bool(self.normalize_whitespace))]
+
     def _normalize(self, text: str) -> str:
         """Apply normalization rules to text"""
-        if self.normalize_whitespace:
-            text = " ".join(text.split())
-
-        if not self.case_sensitive:
-            text = text.lower()
-
-        return text
+        return self._normalize_text(text)
 
     def grade(self, agent_response: str, expected_output: str) -> Dict[str, Any]:
         """
@@ -49,12 +70,11 @@ class StringMatchGrader(GraderInterface):
             {
                 "passed": bool,
                 "score": 1.0 if passed else 0.0,
-                "details": {
-                    "expected": normalized_expected,
-                    "actual": normalized_actual,
-                    "match": "exact" or "mismatch"
-                }
+                "details": {"match": "exact" or "mismatch"}
             }
+
+        The compared texts are not copied into details: they are the result's
+        agent_response and expected_output.
         """
         # Normalize both strings
         normalized_expected = self._normalize(expected_output)
@@ -67,9 +87,35 @@ class StringMatchGrader(GraderInterface):
         return {
             "passed": passed,
             "score": score,
-            "details": {
-                "expected": normalized_expected,
-                "actual": normalized_actual,
-                "match": "exact" if passed else "mismatch"
-            }
+            "details": {"match": "exact" if passed else "mismatch"}
         }
+
+    def grade_batch(
+        self,
+        agent_responses: List[str],
+        expected_outputs: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Grade a chunk of responses
+
+        This is the same per-pair loop as grade(), not vectorized matching; it
+        only saves normalizing an expected output again when it repeats within
+        the chunk. The gain from batching string-match comes from the executor
+        handing over the whole chunk in one call.
+        """
+        normalize = self._normalize_text
+        normalized_expected_by_text: Dict[str, str] = {}
+        results = []
+        for agent_response, expected_output in zip(agent_responses, expected_outputs):
+            normalized_expected = normalized_expected_by_text.get(expected_output)
+            if normalized_expected is None:
+                normalized_expected = normalize(expected_output)
+                normalized_expected_by_text[expected_output] = normalized_expected
+            normalized_actual = normalize(agent_response)
+            passed = normalized_expected == normalized_actual
+            results.append({
+                "passed": passed,
+                "score": 1.0 if passed else 0.0,
+                "details": {"match": "exact" if passed else "mismatch"}
+            })
+        return results
@@ -3,7 +3,7 @@ EvaluationRun and EvaluationResult models
 """
 from pydantic import BaseModel, Field, HttpUrl
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 import uuid
 
 
@@ -18,6 +18,15 @@ class EvaluationRun(BaseModel):
     completed_at: Optional[datetime] = None
     result_count: int = Field(default=0)
     error_message: Optional[str] = Field(None, max_length=500)
+    max_concurrency: Optional[int] = Field(None, ge=1)
+    batch_size: Optional[int] = Field(None, ge=1)  # None disables batch mode
+    batch_max_wait_ms: Optional[int] = Field(None, ge=0)
+    agent_batch_endpoint_url: Optional[str] = None  # defaults to agent_endpoint_url
+    agent_version: Optional[str] = None  # build tag; enables response caching
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    archived_at: Optional[datetime] = None  # results and scores moved to the run archive
+    stats: Optional[Dict[str, Any]] = None  # running aggregates (RunStats.to_dict)
+    version: int = Field(default=0)  # bumped by storage on every update
 
     class Config:
         json_schema_extra = {
@@ -30,7 +39,13 @@ class EvaluationRun(BaseModel):
                 "started_at": "2026-01-15T10:35:00Z",
                 "completed_at": "2026-01-15T10:35:15Z",
                 "result_count": 2,
-                "error_message": None
+                "error_message": None,
+                "max_concurrency": 10,
+                "batch_size": None,
+                "batch_max_wait_ms": None,
+                "agent_batch_endpoint_url": None,
+                "agent_version": None,
+                "created_at": "2026-01-15T10:34:58Z"
             }
         }
 
@@ -45,7 +60,16 @@ class EvaluationRun(BaseModel):
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
             "result_count": self.result_count,
-            "error_message": self.error_message
+            "error_message": self.error_message,
+            "max_concurrency": self.max_concurrency,
+            "batch_size": self.batch_size,
+            "batch_max_wait_ms": self.batch_max_wait_ms,
+            "agent_batch_endpoint_url": self.agent_batch_endpoint_url,
+            "agent_version": self.agent_version,
+            "created_at": self.created_at.isoformat(),
+            "archived_at": self.archived_at.isoformat() if self.archived_at else None,
+            "stats": self.stats,
+            "version": self.version
         }
 
 
@@ -58,6 +82,9 @@ class EvaluationResult(BaseModel):
     response_latency_ms: Optional[int] = Field(None, ge=0)
     response_status: str = Field(default="success")  # success, timeout, error
     error_message: Optional[str] = Field(None, max_length=500)
+    attempt_count: int = Field(default=1, ge=0)  # 0 when served from the cache
+    attempt_latencies_ms: Optional[List[int]] = None
+    cached: bool = Field(default=False)  # served from the agent response cache
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
@@ -70,6 +97,9 @@ class EvaluationResult(BaseModel):
                 "response_latency_ms": 245,
                 "response_status": "success",
                 "error_message": None,
+                "attempt_count": 1,
+                "attempt_latencies_ms": [245],
+                "cached": False,
                 "created_at": "2026-01-15T10:35:01Z"
             }
         }
@@ -84,5 +114,8 @@ class EvaluationResult(BaseModel):
             "response_latency_ms": self.response_latency_ms,
             "response_status": self.response_status,
             "error_message": self.error_message,
+            "attempt_count": self.attempt_count,
+            "attempt_latencies_ms": self.attempt_latencies_ms,
+            "cached": self.cached,
             "created_at": self.created_at.isoformat()
         }
@@ -26,8 +26,6 @@ class Score(BaseModel):
                 "passed": True,
                 "score": 1.0,
                 "details": {
-                    "expected": "Paris",
-                    "actual": "Paris",
                     "match": "exact"
                 },
                 "created_at": "2026-01-15T10:35:02Z"
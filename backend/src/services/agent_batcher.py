@@ -0,0 +1,108 @@
+"""
+Agent micro-batcher - groups single agent calls into batch requests
+"""
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+BatchSender = Callable[[List[str]], Awaitable[Dict[str, Any]]]
+SingleSender = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+class AgentBatcher:
+    """
+    Collects inputs into micro-batches for a batch-capable agent
+
+    A batch is sent once it holds batch_size inputs or max_wait seconds after
+    its first input arrived, whichever comes first. Each submitter gets back a
+    single-call shaped result. If a batch request fails, its inputs fall back
+    to individual calls.
+    """
+
+    def __init__(
+        self, send_batch: BatchSender, send_single: SingleSender, batch_size: int, max_wait: float
+    ):
+        self.send_batch = send_batch
+        self.send_single = send_single
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def submit(self, input_text: str) -> Dict[str, Any]:
+        """Queue an input and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((input_text, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything pending as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Send a batch and resolve each submitter's future"""
+        inputs = [input_text for input_text, _ in batch]
+        try:
+            outcome = await self.send_batch(inputs)
+        except Exception as e:
+            outcome = {"status": "error", "error": str(e)}
+
+        if outcome["status"] == "success":
+            for (_, future), response in zip(batch, outcome["responses"]):
+                if not future.done():
+                    future.set_result(
+                        {
+                            "status": "success",
+                            "response": response,
+                            "latency_ms": outcome.get("latency_ms"),
+                            "attempts": outcome.get("attempts", 1),
+                            "attempt_latencies_ms": outcome.get("attempt_latencies_ms"),
+                        }
+                    )
+            return
+
+        logger.warning(
+            f"Batch of {len(batch)} failed ({outcome.get('error')}); falling back to single calls"
+        )
+        await asyncio.gather(
+            *(self._send_single(input_text, future) for input_text, future in batch)
+        )
+
+    async def _send_single(self, input_text: str, future: asyncio.Future) -> None:
+        """Fallback: call the agent for one input"""
+        if future.done():
+            return
+        try:
+            result = await self.send_single(input_text)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Cancel batches still in flight"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
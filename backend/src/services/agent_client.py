@@ -2,8 +2,12 @@
 Agent HTTP client - calls external agent endpoints
 """
 import httpx
+import asyncio
+import importlib.util
 import logging
-from typing import Optional, Dict, Any
+import random
+from collections import deque
+from typing import Optional, Dict, Any, Deque, List, Tuple
 from datetime import datetime
 import time
 
@@ -12,12 +16,144 @@ logger = logging.getLogger(__name__)
 # Default timeout for agent calls (30 seconds)
 DEFAULT_AGENT_TIMEOUT = 30
 
+# Default bound on one call including retries, backoff and hedges (seconds)
+DEFAULT_AGENT_TOTAL_TIMEOUT = 60.0
+
+# Default connection pool settings
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# Default retry settings (backoff in seconds)
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_BACKOFF_BASE = 0.1
+DEFAULT_RETRY_BACKOFF_MAX = 5.0
+
+# Default hedging settings
+DEFAULT_HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+
+# Successful call latencies kept per endpoint for percentile estimates
+LATENCY_WINDOW = 200
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
 
 class AgentClient:
-    """HTTP client for calling agent endpoints"""
+    """
+    HTTP client for calling agent endpoints
+
+    Owns one long-lived httpx.AsyncClient per agent endpoint (scheme, host, port)
+    so connections are kept alive and reused across test cases and runs.
+    Call aclose() on shutdown to release pooled connections.
+
+    Transient failures (timeouts, connection errors, 429/502/503/504) are
+    retried with jittered exponential backoff. With hedging enabled, a second
+    request is sent once a call runs past the endpoint's observed latency
+    percentile, and whichever succeeds first is used. A call never takes
+    longer than total_timeout overall: requests are cut short and no retry is
+    started once it would run past it.
+    """
 
-    def __init__(self, timeout: int = DEFAULT_AGENT_TIMEOUT):
+    def __init__(
+        self,
+        timeout: int = DEFAULT_AGENT_TIMEOUT,
+        total_timeout: float = DEFAULT_AGENT_TOTAL_TIMEOUT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff_base: float = DEFAULT_RETRY_BACKOFF_BASE,
+        retry_backoff_max: float = DEFAULT_RETRY_BACKOFF_MAX,
+        hedging: bool = False,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        hedge_min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         self.timeout = timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.retry_backoff_base = retry_backoff_base
+        self.retry_backoff_max = retry_backoff_max
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._latencies: Dict[str, Deque[int]] = {}
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.transport = transport
+        # endpoint key -> (client, event loop the client's connections belong to)
+        self._clients: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _endpoint_key(endpoint_url: str) -> str:
+        """Pool key for an endpoint URL"""
+        url = httpx.URL(endpoint_url)
+        return f"{url.scheme}://{url.host}:{url.port or ''}"
+
+    def _get_client(self, endpoint_url: str) -> httpx.AsyncClient:
+        """Get (or create) the shared client for an endpoint"""
+        key = self._endpoint_key(endpoint_url)
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(key)
+        # Pooled connections can't be reused from another event loop
+        if entry is None or entry[1] is not loop or entry[0].is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self.transport
+            )
+            self._clients[key] = (client, loop)
+            logger.debug(f"Created pooled agent client for {key}")
+            return client
+        return entry[0]
+
+    async def aclose(self) -> None:
+        """Close all pooled clients"""
+        clients, self._clients = self._clients, {}
+        loop = asyncio.get_running_loop()
+        for key, (client, client_loop) in clients.items():
+            if client_loop is loop:
+                await client.aclose()
+        logger.info(f"Closed {len(clients)} pooled agent client(s)")
+
+    def get_latency_percentile(self, endpoint_url: str, percentile: float) -> Optional[int]:
+        """Observed latency percentile (ms) of recent successful calls to an endpoint"""
+        samples = self._latencies.get(endpoint_url)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+    def _hedge_delay(self, endpoint_url: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging doesn't apply"""
+        if not self.hedging:
+            return None
+        samples = self._latencies.get(endpoint_url)
+        if not samples or len(samples) < self.hedge_min_samples:
+            return None
+        percentile = self.get_latency_percentile(endpoint_url, self.hedge_percentile)
+        return None if percentile is None else percentile / 1000
+
+    def _backoff_delay(self, retry_number: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        cap = min(self.retry_backoff_max, self.retry_backoff_base * (2 ** retry_number))
+        delay = random.uniform(0, cap)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_backoff_max))
+        return delay
 
     async def call_agent(
         self, 
@@ -25,54 +161,222 @@ class AgentClient:
         input_text: str
     ) -> Dict[str, Any]:
         """
-        Call an agent endpoint with input
+        Call an agent endpoint with input, retrying transient failures
 
         Returns:
             {
                 "status": "success" | "timeout" | "error",
                 "response": str (if success),
-                "latency_ms": int,
-                "error": str (if error)
+                "latency_ms": int (of the attempt that produced the outcome),
+                "error": str (if error),
+                "attempts": int (HTTP requests sent, including retries and hedges),
+                "attempt_latencies_ms": [int] (per completed request)
             }
         """
-        start_time = time.time()
-        
+        outcome = await self._call_with_retries(endpoint_url, {"input": input_text}, hedge=True)
+        if outcome["status"] == "success":
+            data = outcome.pop("data")
+            outcome["response"] = data.get("response", "") if isinstance(data, dict) else ""
+        return outcome
+
+    async def call_agent_batch(
+        self,
+        endpoint_url: str,
+        inputs: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Call a batch-capable agent endpoint with several inputs in one request
+
+        Sends {"inputs": [...]} and expects {"responses": [...]} in the same order,
+        where each item is a string or an object with a "response" key.
+        Batches are retried like single calls but never hedged.
+
+        Returns the same shape as call_agent, with "responses": [str] instead
+        of "response" on success
+        """
+        outcome = await self._call_with_retries(endpoint_url, {"inputs": inputs}, hedge=False)
+        if outcome["status"] != "success":
+            return outcome
+
+        data = outcome.pop("data")
+        responses = data.get("responses") if isinstance(data, dict) else None
+        if not isinstance(responses, list) or len(responses) != len(inputs):
+            outcome["status"] = "error"
+            outcome["error"] = f"Batch response did not contain {len(inputs)} responses"
+            return outcome
+
+        outcome["responses"] = [
+            item.get("response", "") if isinstance(item, dict) else str(item)
+            for item in responses
+        ]
+        return outcome
+
+    async def _call_with_retries(
+        self,
+        endpoint_url: str,
+        body: Dict[str, Any],
+        hedge: bool
+    ) -> Dict[str, Any]:
+        """Send a request body, retrying retryable failures with backoff until the deadline"""
+        attempt_latencies: List[int] = []
+        attempts = 0
+        deadline = time.monotonic() + self.total_timeout
+
+        for retry_number in range(self.max_retries + 1):
+            if hedge:
+                outcome, sent = await self._call_with_hedge(
+                    endpoint_url, body, attempt_latencies, deadline
+                )
+            else:
+                outcome = await self._attempt(endpoint_url, body, deadline, track_latency=False)
+                attempt_latencies.append(outcome["latency_ms"])
+                sent = 1
+            attempts += sent
+
+            if outcome["status"] == "success" or not outcome.get("retryable"):
+                break
+            if retry_number == self.max_retries:
+                break
+
+            delay = self._backoff_delay(retry_number, outcome.get("retry_after"))
+            if time.monotonic() + delay >= deadline:
+                logger.info(
+                    f"Not retrying agent call to {endpoint_url}: "
+                    f"{self.total_timeout}s total timeout reached"
+                )
+                break
+            logger.info(
+                f"Retrying agent call to {endpoint_url} in {delay:.2f}s "
+                f"after {outcome['status']}: {outcome.get('error')}"
+            )
+            await asyncio.sleep(delay)
+
+        outcome.pop("retryable", None)
+        outcome.pop("retry_after", None)
+        outcome["attempts"] = attempts
+        outcome["attempt_latencies_ms"] = attempt_latencies
+        return outcome
+
+    async def _call_with_hedge(
+        self,
+        endpoint_url: str,
+        body: Dict[str, Any],
+        attempt_latencies: List[int],
+        deadline: float
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Make one logical attempt, hedged with a second request if it runs slow
+
+        Returns (outcome, number of requests sent)
+        """
+        hedge_delay = self._hedge_delay(endpoint_url)
+        if hedge_delay is None:
+            single = await self._attempt(endpoint_url, body, deadline)
+            attempt_latencies.append(single["latency_ms"])
+            return single, 1
+
+        pending = {asyncio.create_task(self._attempt(endpoint_url, body, deadline))}
+        sent = 1
+        outcome: Optional[Dict[str, Any]] = None
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    endpoint_url,
-                    json={"input": input_text}
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if not done:
+                logger.debug(
+                    f"Hedging agent call to {endpoint_url} after {hedge_delay * 1000:.0f}ms"
                 )
+                pending.add(asyncio.create_task(self._attempt(endpoint_url, body, deadline)))
+                sent = 2
+
+            # First success wins; otherwise report the first failure
+            while True:
+                for task in done:
+                    result = task.result()
+                    attempt_latencies.append(result["latency_ms"])
+                    if outcome is None or (
+                        result["status"] == "success" and outcome["status"] != "success"
+                    ):
+                        outcome = result
+                if (outcome is not None and outcome["status"] == "success") or not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # The losing request is cancelled and awaited, which releases its connection
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        assert outcome is not None
+        return outcome, sent
+
+    async def _attempt(
+        self,
+        endpoint_url: str,
+        body: Dict[str, Any],
+        deadline: float,
+        track_latency: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Send a single request to the agent, timing out at timeout or the deadline
+
+        Never raises; the parsed JSON body is returned as "data" on success and
+        failures are returned with a "retryable" flag
+        """
+        start_time = time.time()
+        timeout = max(0.0, min(self.timeout, deadline - time.monotonic()))
+
+        try:
+            client = self._get_client(endpoint_url)
+            # httpx timeouts apply per connect/read; this bounds the whole request
+            async with asyncio.timeout(timeout):
+                response = await client.post(endpoint_url, json=body)
                 response.raise_for_status()
-                
                 data = response.json()
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                logger.debug(f"Agent call successful to {endpoint_url} in {latency_ms}ms")
-                
-                return {
-                    "status": "success",
-                    "response": data.get("response", ""),
-                    "latency_ms": latency_ms
-                }
+            latency_ms = int((time.time() - start_time) * 1000)
+
+            logger.debug(f"Agent call successful to {endpoint_url} in {latency_ms}ms")
+            if track_latency:
+                samples = self._latencies.setdefault(
+                    endpoint_url, deque(maxlen=LATENCY_WINDOW)
+                )
+                samples.append(latency_ms)
+
+            return {
+                "status": "success",
+                "data": data,
+                "latency_ms": latency_ms
+            }
         
-        except httpx.TimeoutException:
+        except (httpx.TimeoutException, TimeoutError):
             latency_ms = int((time.time() - start_time) * 1000)
             logger.warning(f"Agent timeout after {latency_ms}ms")
             return {
                 "status": "timeout",
                 "latency_ms": latency_ms,
-                "error": f"Agent did not respond within {self.timeout} seconds"
+                "error": f"Agent did not respond within {timeout:g} seconds",
+                "retryable": True
             }
-        
+
+        except httpx.HTTPStatusError as e:
+            latency_ms = int((time.time() - start_time) * 1000)
+            error_msg = str(e)
+            logger.error(f"Agent HTTP error: {error_msg}")
+            return {
+                "status": "error",
+                "latency_ms": latency_ms,
+                "error": error_msg,
+                "retryable": e.response.status_code in RETRYABLE_STATUS_CODES,
+                "retry_after": _parse_retry_after(e.response)
+            }
+
         except httpx.HTTPError as e:
+            # Connection-level failures (refused, reset, protocol errors) are transient
             latency_ms = int((time.time() - start_time) * 1000)
             error_msg = str(e)
             logger.error(f"Agent HTTP error: {error_msg}")
             return {
                 "status": "error",
                 "latency_ms": latency_ms,
-                "error": error_msg
+                "error": error_msg,
+                "retryable": isinstance(e, httpx.TransportError)
             }
         
         except Exception as e:
@@ -84,3 +388,14 @@ class AgentClient:
                 "latency_ms": latency_ms,
                 "error": error_msg
             }
+
+
+def _parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """Retry-After header in seconds (only the delta-seconds form is supported)"""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
@@ -0,0 +1,364 @@
+"""
+Analytics store - columnar, NumPy-backed copies of run results and scores
+
+Each run gets a RunColumns: append-only arrays of per-result metrics (status,
+latency, tags) and per-score metrics (result row, grader, passed, score).
+Strings are dictionary-encoded into small integer codes. Summaries, group-bys
+(by status, grader, tag) and percentiles are then vectorized NumPy operations
+instead of loops over record dicts.
+
+Runs executed by this process are fed live from their write buffer. Any other
+run is built from storage on first use, and is cached only once it has
+finished, so a cached copy can't miss later writes.
+
+API requests read summaries from threadpool threads while the event loop
+appends to a live run. Each RunColumns has a lock held across an append and
+across building a summary, so a summary never sees one column ahead of its
+siblings; the store's run cache has its own lock.
+"""
+from src.services.storage import StorageAbstraction
+from src.config import ANALYTICS_MAX_RUNS
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Iterable, List, Optional
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed")
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+
+class _Column:
+    """Growable NumPy array"""
+
+    def __init__(self, dtype, capacity: int = 64):
+        self._data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values: Iterable) -> None:
+        if not isinstance(values, np.ndarray):
+            values = np.fromiter(values, dtype=self._data.dtype)
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, len(self._data) * 2), dtype=self._data.dtype)
+            grown[: self.size] = self._data[: self.size]
+            self._data = grown
+        self._data[self.size : needed] = values
+        self.size = needed
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[: self.size]
+
+
+class _Vocabulary:
+    """Dictionary encoding of strings to dense integer codes"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def encode(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.codes[name] = code
+            self.names.append(name)
+        return code
+
+
+class RunColumns:
+    """Columnar results and scores of one evaluation run"""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        # Run version the columns were built for (None while fed live)
+        self.version: Optional[int] = None
+        # Held across an append and across a summary (re-entrant: summaries nest)
+        self._lock = threading.RLock()
+        # Results
+        self.result_rows: Dict[str, int] = {}
+        self.statuses = _Vocabulary()
+        self.result_status = _Column(np.int16)
+        self.result_latency = _Column(np.float64)
+        # (result row, tag) pairs
+        self.tags = _Vocabulary()
+        self.tag_result_row = _Column(np.int32)
+        self.tag_code = _Column(np.int32)
+        # Scores
+        self.graders = _Vocabulary()
+        self.score_result_row = _Column(np.int32)
+        self.score_grader = _Column(np.int32)
+        self.score_passed = _Column(np.bool_)
+        self.score_value = _Column(np.float64)
+
+    def append_results(
+        self, results: List[Dict[str, Any]], tags_for: Optional[Callable[[str], List[str]]] = None
+    ) -> None:
+        """Append results (tags_for maps a test case ID to its tags)"""
+        with self._lock:
+            rows: List[Dict[str, Any]] = []
+            tag_rows: List[int] = []
+            tag_codes: List[int] = []
+            for result in results:
+                row = len(self.result_rows) + len(rows)
+                rows.append(result)
+                if tags_for is not None:
+                    for tag in tags_for(result.get("test_case_id") or ""):
+                        tag_rows.append(row)
+                        tag_codes.append(self.tags.encode(tag))
+            for result in rows:
+                self.result_rows[result["id"]] = len(self.result_rows)
+            self.result_status.extend(self.statuses.encode(r["response_status"]) for r in rows)
+            self.result_latency.extend(
+                np.nan if r.get("response_latency_ms") is None else r["response_latency_ms"]
+                for r in rows
+            )
+            self.tag_result_row.extend(tag_rows)
+            self.tag_code.extend(tag_codes)
+
+    def append_scores(self, scores: List[Dict[str, Any]]) -> None:
+        """Append scores for results already in this run"""
+        with self._lock:
+            rows = []
+            for score in scores:
+                row = self.result_rows.get(score["result_id"])
+                if row is None:
+                    logger.debug(f"Score {score.get('id')} has no result in run {self.run_id}")
+                    continue
+                rows.append((row, score))
+            self.score_result_row.extend(row for row, _ in rows)
+            self.score_grader.extend(self.graders.encode(s["grader_id"]) for _, s in rows)
+            self.score_passed.extend(bool(s.get("passed")) for _, s in rows)
+            self.score_value.extend(
+                np.nan if s.get("score") is None else s["score"] for _, s in rows
+            )
+
+    # ----- summaries -----
+
+    def _status_count(self, status: str) -> int:
+        code = self.statuses.codes.get(status)
+        if code is None:
+            return 0
+        return int(np.count_nonzero(self.result_status.values == code))
+
+    def result_summary(self) -> Dict[str, Any]:
+        """Result counts by status, latency average and percentiles"""
+        with self._lock:
+            statuses = self.result_status.values
+            latency = self.result_latency.values
+            successful = self._status_count("success")
+
+            # Average over successful results of every recorded (non-zero) latency
+            recorded = latency[~np.isnan(latency)]
+            avg_latency = float(recorded.sum()) / successful if successful > 0 else 0
+
+            success_code = self.statuses.codes.get("success")
+            success_latency = (
+                latency[(statuses == success_code) & ~np.isnan(latency)]
+                if success_code is not None
+                else latency[:0]
+            )
+            percentiles = (
+                np.percentile(success_latency, LATENCY_PERCENTILES)
+                if len(success_latency)
+                else [None] * len(LATENCY_PERCENTILES)
+            )
+
+            return {
+                "total": int(len(statuses)),
+                "successful": successful,
+                "failed": self._status_count("error"),
+                "timeout": self._status_count("timeout"),
+                "avg_latency_ms": round(avg_latency, 2),
+                "latency_percentiles_ms": {
+                    f"p{p}": round(float(v), 2) if v is not None else None
+                    for p, v in zip(LATENCY_PERCENTILES, percentiles)
+                },
+                "by_status": self._by_status(statuses, latency),
+            }
+
+    def _by_status(self, statuses: np.ndarray, latency: np.ndarray) -> Dict[str, Any]:
+        count = len(self.statuses.names)
+        totals = np.bincount(statuses, minlength=count)
+        has_latency = ~np.isnan(latency)
+        latency_counts = np.bincount(statuses[has_latency], minlength=count)
+        latency_sums = np.bincount(
+            statuses[has_latency], weights=latency[has_latency], minlength=count
+        )
+        return {
+            name: {
+                "total": int(totals[code]),
+                "avg_latency_ms": (
+                    round(float(latency_sums[code] / latency_counts[code]), 2)
+                    if latency_counts[code]
+                    else None
+                ),
+            }
+            for code, name in enumerate(self.statuses.names)
+        }
+
+    def score_summary(self) -> Dict[str, Any]:
+        """Score counts overall, by grader and by test case tag"""
+        with self._lock:
+            passed = self.score_passed.values
+            graders = self.score_grader.values
+            values = self.score_value.values
+            has_value = ~np.isnan(values)
+
+            count = len(self.graders.names)
+            totals = np.bincount(graders, minlength=count)
+            passed_counts = np.bincount(graders, weights=passed, minlength=count)
+            value_counts = np.bincount(graders[has_value], minlength=count)
+            value_sums = np.bincount(graders[has_value], weights=values[has_value], minlength=count)
+
+            by_grader = {
+                name: {
+                    "total": int(totals[code]),
+                    "passed": int(passed_counts[code]),
+                    "failed": int(totals[code] - passed_counts[code]),
+                    "mean_score": (
+                        round(float(value_sums[code] / value_counts[code]), 4)
+                        if value_counts[code]
+                        else None
+                    ),
+                }
+                for code, name in enumerate(self.graders.names)
+            }
+
+            total_passed = int(np.count_nonzero(passed))
+            return {
+                "total_scores": int(len(passed)),
+                "passed": total_passed,
+                "failed": int(len(passed) - total_passed),
+                "by_grader": by_grader,
+                "by_tag": self._by_tag(passed),
+            }
+
+    def _by_tag(self, passed: np.ndarray) -> Dict[str, Any]:
+        # Per-result score and pass counts, then summed over each tag's results
+        result_count = len(self.result_rows)
+        score_rows = self.score_result_row.values
+        per_result_total = np.bincount(score_rows, minlength=result_count)
+        per_result_passed = np.bincount(score_rows, weights=passed, minlength=result_count)
+
+        tag_rows = self.tag_result_row.values
+        tag_codes = self.tag_code.values
+        count = len(self.tags.names)
+        results = np.bincount(tag_codes, minlength=count)
+        totals = np.bincount(tag_codes, weights=per_result_total[tag_rows], minlength=count)
+        passed_counts = np.bincount(tag_codes, weights=per_result_passed[tag_rows], minlength=count)
+        return {
+            name: {
+                "results": int(results[code]),
+                "total": int(totals[code]),
+                "passed": int(passed_counts[code]),
+                "failed": int(totals[code] - passed_counts[code]),
+            }
+            for code, name in enumerate(self.tags.names)
+        }
+
+
+class AnalyticsStore:
+    """Per-run RunColumns, fed live or built from storage on demand"""
+
+    def __init__(self, storage: StorageAbstraction, max_runs: int = ANALYTICS_MAX_RUNS):
+        self.storage = storage
+        self.max_runs = max_runs
+        self._runs: "OrderedDict[str, RunColumns]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start_run(self, run_id: str) -> RunColumns:
+        """Register empty columns for a run about to be executed (fed live)"""
+        columns = RunColumns(run_id)
+        with self._lock:
+            self._cache(columns)
+        return columns
+
+    @staticmethod
+    def tags_in(test_cases: Dict[str, Dict[str, Any]]) -> Callable[[str], List[str]]:
+        """Tags of test cases looked up in already fetched records, keyed by ID"""
+        return lambda test_case_id: (test_cases.get(test_case_id) or {}).get("tags") or []
+
+    def tags_lookup(self, results: List[Dict[str, Any]]) -> Callable[[str], List[str]]:
+        """Tags of the test cases behind results, fetched in one bulk read"""
+        return self.tags_in(
+            self.storage.get_test_cases_many(
+                list({r["test_case_id"] for r in results if r.get("test_case_id")})
+            )
+        )
+
+    def append(
+        self,
+        columns: RunColumns,
+        results: List[Dict[str, Any]],
+        scores: List[Dict[str, Any]],
+        tags_for: Optional[Callable[[str], List[str]]] = None,
+    ) -> None:
+        """
+        Feed freshly written results and scores into a live run's columns
+
+        tags_for maps a test case ID to its tags; the executing run passes one
+        over the test cases it already holds, otherwise they are read from storage.
+        """
+        if results:
+            columns.append_results(results, tags_for or self.tags_lookup(results))
+        if scores:
+            columns.append_scores(scores)
+
+    def finish_run(self, run_id: str, version: int) -> None:
+        """Mark a live run's columns as complete as of the run's final version"""
+        with self._lock:
+            columns = self._runs.get(run_id)
+            if columns is not None:
+                columns.version = version
+
+    def get_run(self, run_id: str) -> RunColumns:
+        """
+        Columns for a run, building them from storage if they aren't cached
+
+        Cached columns of a finished run are checked against the run's stored
+        version, so a re-grade in another worker process is picked up too.
+        Storage is read without holding the cache lock.
+        """
+        with self._lock:
+            cached = self._runs.get(run_id)
+            if cached is not None and cached.version is None:
+                self._runs.move_to_end(run_id)
+                return cached
+        if cached is not None:
+            run = self.storage.get_evaluation_run(run_id)
+            if run is not None and run.get("version", 0) == cached.version:
+                with self._lock:
+                    if self._runs.get(run_id) is cached:
+                        self._runs.move_to_end(run_id)
+                return cached
+
+        # Read the record first, so the columns are at least as new as its version
+        run = self.storage.get_evaluation_run(run_id)
+        results = self.storage.list_evaluation_results(run_id)
+        columns = RunColumns(run_id)
+        columns.append_results(results, self.tags_lookup(results))
+        columns.append_scores(self.storage.list_all_scores(run_id))
+
+        with self._lock:
+            if run is not None and run.get("status") in FINISHED_STATUSES:
+                columns.version = run.get("version", 0)
+                self._cache(columns)
+            elif cached is not None and self._runs.get(run_id) is cached:
+                del self._runs[run_id]
+        return columns
+
+    def invalidate(self, run_id: str) -> None:
+        """Drop a run's columns (after its records changed outside the live feed)"""
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def _cache(self, columns: RunColumns) -> None:
+        """Cache columns as the most recently used (the caller holds the lock)"""
+        self._runs[columns.run_id] = columns
+        self._runs.move_to_end(columns.run_id)
+        while len(self._runs) > self.max_runs:
+            self._runs.popitem(last=False)
@@ -0,0 +1,160 @@
+"""
+Compact records - slotted in-memory layout for stored scores
+
+A score dict carries a uuid string, an ISO timestamp string and a details dict
+which, for graders that quote what they graded, holds a copy of the whole agent
+response. ScoreRecord keeps the same data in a fraction of the memory:
+
+- __slots__ instead of a per-score dict
+- uuid ids as 16 raw bytes, the result id shared with the stored result
+- interned grader ids, short details strings and shared details key tuples
+- created_at as integer microseconds since the epoch
+- details strings equal to the result's response stored as a reference to it
+  instead of a copy (graders' normalized variants are kept as they are, so
+  storage needs no grader code and reads never recompute them)
+
+Records are turned back into the usual score dicts when read.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+import uuid
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+# Details strings up to this length are interned (grader verdicts, short answers)
+INTERN_MAX_CHARS = 64
+
+
+class ResponseText:
+    """Stands for the result's agent response inside packed details"""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Unpickle to the shared instance
+        return (response_text, ())
+
+
+_RESPONSE_TEXT = ResponseText()
+
+
+def response_text() -> ResponseText:
+    """The shared reference to the response"""
+    return _RESPONSE_TEXT
+
+
+def pack_id(value: Any) -> Any:
+    """Canonical uuid strings become 16 bytes; anything else is kept as is"""
+    if isinstance(value, str) and len(value) == 36:
+        try:
+            packed = uuid.UUID(value)
+        except ValueError:
+            return value
+        if str(packed) == value:
+            return packed.bytes
+    return value
+
+
+def unpack_id(value: Any) -> Any:
+    """Inverse of pack_id"""
+    if isinstance(value, bytes):
+        return str(uuid.UUID(bytes=value))
+    return value
+
+
+def pack_timestamp(value: Any) -> Any:
+    """Naive ISO timestamps (as written by the models) become integer microseconds"""
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if parsed.tzinfo is not None or parsed.isoformat() != value:
+            return value
+        value = parsed
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return (value - EPOCH) // MICROSECOND
+    return value
+
+
+def unpack_timestamp(value: Any) -> Any:
+    """Inverse of pack_timestamp"""
+    if isinstance(value, int):
+        return (EPOCH + value * MICROSECOND).isoformat()
+    return value
+
+
+PackedDetails = Tuple[Tuple[Any, ...], Tuple[Any, ...]]
+
+# One shared tuple per distinct set of details keys
+_details_keys: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+
+
+def pack_details(
+    details: Optional[Dict[str, Any]], response: Optional[str]
+) -> Optional[PackedDetails]:
+    """Details as (keys, values), with copies of the response replaced by references"""
+    if details is None:
+        return None
+    values = []
+    for value in details.values():
+        if isinstance(value, str):
+            if response is not None and (value is response or value == response):
+                value = _RESPONSE_TEXT
+            elif len(value) <= INTERN_MAX_CHARS:
+                value = sys.intern(value)
+        values.append(value)
+    keys = tuple(details)
+    return _details_keys.setdefault(keys, keys), tuple(values)
+
+
+def unpack_details(
+    details: Optional[PackedDetails], response: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """Inverse of pack_details, given the same response"""
+    if details is None:
+        return None
+    keys, values = details
+    return {
+        key: response if isinstance(value, ResponseText) else value
+        for key, value in zip(keys, values)
+    }
+
+
+class ScoreRecord:
+    """One stored score (see the module docstring for the layout)"""
+
+    __slots__ = ("id", "result_id", "grader_id", "passed", "score", "details", "created_at")
+
+    def __init__(self, score: Dict[str, Any], result_id: str, response: Optional[str]):
+        grader_id = score.get("grader_id")
+        self.id = pack_id(score["id"])
+        self.result_id = result_id
+        self.grader_id = sys.intern(grader_id) if isinstance(grader_id, str) else grader_id
+        self.passed = score.get("passed")
+        self.score = score.get("score")
+        self.details = pack_details(score.get("details"), response)
+        self.created_at = pack_timestamp(score.get("created_at"))
+
+    def to_dict(self, response: Optional[str]) -> Dict[str, Any]:
+        """The score as a dict, given its result's current agent response"""
+        return {
+            "id": unpack_id(self.id),
+            "result_id": self.result_id,
+            "grader_id": self.grader_id,
+            "passed": self.passed,
+            "score": self.score,
+            "details": unpack_details(self.details, response),
+            "created_at": unpack_timestamp(self.created_at),
+        }
+
+    def detach(self, response: Optional[str]) -> None:
+        """Replace response references with copies (before the response changes)"""
+        if self.details is not None:
+            self.details = pack_details(unpack_details(self.details, response), None)
+
+
+def unpack_scores(records: List[ScoreRecord], response: Optional[str]) -> List[Dict[str, Any]]:
+    """Score dicts for records of one result"""
+    return [record.to_dict(response) for record in records]
@@ -0,0 +1,176 @@
+"""
+Adaptive concurrency control for agent endpoints
+
+Each agent endpoint gets an AIMD (additive increase, multiplicative decrease)
+limiter: the concurrency limit grows by roughly one slot per round trip while
+calls succeed with healthy latency, and is cut multiplicatively when calls
+time out or fail.
+
+Limiters live in the process that makes the calls. With several workers each
+worker adapts its own limit to what it observes, so an endpoint can see up to
+one limit per worker; set AGENT_CONCURRENCY_MAX with the worker count in mind.
+"""
+from collections import deque
+from typing import Deque, Dict, Optional, Any
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Default limiter settings (the initial limit matches the per-run default)
+DEFAULT_INITIAL_LIMIT = 10
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 64
+DEFAULT_BACKOFF_RATIO = 0.5
+DEFAULT_LATENCY_TOLERANCE = 2.0
+
+# EWMA weight of the newest latency / error sample
+SMOOTHING = 0.2
+# How quickly the no-load latency baseline drifts up towards observed latency
+BASELINE_DRIFT = 0.01
+
+FAILURE_STATUSES = ("timeout", "error")
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter for a single agent endpoint"""
+
+    def __init__(
+        self,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        backoff_ratio: float = DEFAULT_BACKOFF_RATIO,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.latency_ms: Optional[float] = None
+        self.baseline_latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def current_limit(self) -> int:
+        """Whole number of calls currently allowed in flight"""
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self) -> None:
+        """Wait for a free slot"""
+        if self.in_flight < self.current_limit and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just before cancellation; give it back
+                self.in_flight -= 1
+                self._wake_waiters()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, status: Optional[str] = None, latency_ms: Optional[int] = None) -> None:
+        """
+        Free a slot and feed the call outcome into the controller
+
+        status is the agent result status ("success", "timeout", "error");
+        None releases the slot without adjusting the limit (e.g. cancelled calls)
+        """
+        limit_was_reached = self.in_flight >= self.current_limit
+        self.in_flight -= 1
+
+        if status is not None:
+            self._record(status, latency_ms, limit_was_reached)
+
+        self._wake_waiters()
+
+    def _record(self, status: str, latency_ms: Optional[int], limit_was_reached: bool) -> None:
+        """Update latency/error estimates and adjust the limit"""
+        failed = status in FAILURE_STATUSES
+        self.error_rate += SMOOTHING * ((1.0 if failed else 0.0) - self.error_rate)
+
+        if failed:
+            # Back off at most once per round trip so one burst of failures
+            # from the same window doesn't collapse the limit to the floor
+            now = time.monotonic()
+            window = (self.latency_ms or 0.0) / 1000
+            if now - self._last_decrease >= window:
+                previous = self.current_limit
+                self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+                self._last_decrease = now
+                logger.info(f"Agent {status}: concurrency limit {previous} -> {self.current_limit}")
+            return
+
+        if latency_ms is not None:
+            if self.latency_ms is None or self.baseline_latency_ms is None:
+                self.latency_ms = float(latency_ms)
+                self.baseline_latency_ms = float(latency_ms)
+            else:
+                self.latency_ms += SMOOTHING * (latency_ms - self.latency_ms)
+                self.baseline_latency_ms = min(
+                    float(latency_ms),
+                    self.baseline_latency_ms
+                    + BASELINE_DRIFT * (latency_ms - self.baseline_latency_ms),
+                )
+
+        healthy = (
+            self.latency_ms is None
+            or self.baseline_latency_ms is None
+            or self.latency_ms <= self.baseline_latency_ms * self.latency_tolerance
+        )
+        # Only grow when the limit was actually the bottleneck
+        if healthy and limit_was_reached:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to waiting callers in FIFO order"""
+        while self._waiters and self.in_flight < self.current_limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limiter state for status reporting"""
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "latency_ms": round(self.latency_ms, 2) if self.latency_ms is not None else None,
+            "baseline_latency_ms": (
+                round(self.baseline_latency_ms, 2) if self.baseline_latency_ms is not None else None
+            ),
+            "error_rate": round(self.error_rate, 4),
+        }
+
+
+# Limiters shared by every run that targets the same agent endpoint
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+
+def get_concurrency_limiter(
+    endpoint_url: str, create: bool = True, **settings: Any
+) -> Optional[AdaptiveConcurrencyLimiter]:
+    """Get the limiter for an agent endpoint, creating it on first use"""
+    limiter = _limiters.get(endpoint_url)
+    if limiter is None and create:
+        limiter = AdaptiveConcurrencyLimiter(**settings)
+        _limiters[endpoint_url] = limiter
+    return limiter
+
+
+def reset_concurrency_limiters() -> None:
+    """Drop all limiters (for testing)"""
+    _limiters.clear()
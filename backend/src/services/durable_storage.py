@@ -0,0 +1,522 @@
+"""
+Durable in-memory storage - InMemoryStorage backed by a write-ahead log
+
+Every mutation is applied in memory and then appended to a binary log as a
+framed pickle record. A writer thread group-commits the pending records: one
+write and one fsync covers every record appended while the previous commit was
+running. With sync_commit (the default) a mutation returns only once its record
+is committed, so an acknowledged write survives a crash. Without it mutations
+return straight away, the writer commits once per commit interval, and a crash
+loses the writes acknowledged in the last interval.
+
+Waiting for a commit blocks the calling thread for up to a commit interval plus
+an fsync, so async code must mutate from a worker thread (the evaluation
+service's WriteBuffer writes there), never on the event loop.
+
+Mutations of different runs don't wait on each other: records are ordered in
+the log per lock stripe (the runs whose results and scores a mutation touches),
+and test case and run records by one table lock, matching InMemoryStorage.
+
+The log is split into numbered segments. Once the active segment grows past
+its size limit it is closed and a new one is started. A background compaction
+then builds a new snapshot from the previous snapshot plus the closed
+segments, without touching the live store, and deletes the files that the
+snapshot now covers. On startup the latest snapshot is loaded and only the
+segments written after it are replayed.
+
+Files in the log directory:
+    snapshot-NNNNNNNN.pkl   state covering every segment before NNNNNNNN
+    wal-NNNNNNNN.log        log segment NNNNNNNN
+
+Snapshots and log records are pickles, so the log directory must only be
+writable by the service itself.
+"""
+from src.services.storage import InMemoryStorage, DEFAULT_LOCK_STRIPES, _StripeLocks
+from src.services.run_archive import RunArchive
+from typing import BinaryIO, Iterable, List, Optional, Dict, Any, Tuple
+from pathlib import Path
+import gc
+import logging
+import os
+import pickle
+import re
+import struct
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Frame header: payload length and CRC32 of the payload
+FRAME_HEADER = struct.Struct(">II")
+
+# Default durability settings
+DEFAULT_COMMIT_INTERVAL = 0.01
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+SEGMENT_PATTERN = re.compile(r"wal-(\d{8})\.log$")
+SNAPSHOT_PATTERN = re.compile(r"snapshot-(\d{8})\.pkl$")
+
+
+def _segment_name(number: int) -> str:
+    return f"wal-{number:08d}.log"
+
+
+def _snapshot_name(number: int) -> str:
+    return f"snapshot-{number:08d}.pkl"
+
+
+def _encode_frame(op: str, args: tuple) -> bytes:
+    payload = pickle.dumps((op, args), protocol=pickle.HIGHEST_PROTOCOL)
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_frames(path: Path) -> Tuple[List[Tuple[str, tuple]], int]:
+    """
+    Read the complete frames in a log segment
+
+    Returns (records, offset just after the last complete frame); a torn or
+    corrupt frame at the tail ends the read
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    records = []
+    offset = 0
+    while offset + FRAME_HEADER.size <= len(data):
+        length, crc = FRAME_HEADER.unpack_from(data, offset)
+        start = offset + FRAME_HEADER.size
+        payload = data[start : start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        records.append(pickle.loads(payload))
+        offset = start + length
+    return records, offset
+
+
+class DurableInMemoryStorage(InMemoryStorage):
+    """InMemoryStorage with a group-committed write-ahead log and snapshots"""
+
+    def __init__(
+        self,
+        log_dir: str,
+        commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+        fsync: bool = True,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+        thread_safe: bool = True,
+        lock_stripes: int = DEFAULT_LOCK_STRIPES,
+        archive: Optional[RunArchive] = None,
+        sync_commit: bool = True,
+    ):
+        super().__init__(thread_safe=thread_safe, lock_stripes=lock_stripes, archive=archive)
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+        self.segment_max_bytes = segment_max_bytes
+        self.sync_commit = sync_commit
+
+        self.recovery_stats = self._recover()
+
+        # Held across applying a mutation and logging it, so writers to the same
+        # records append to the log in the order their changes were applied. The
+        # table lock orders test cases and runs, one lock per stripe the results
+        # and scores of runs; they are taken before InMemoryStorage's own locks
+        self._log_table_lock = self._new_lock()
+        self._log_stripes = [self._new_lock() for _ in self._stripes]
+
+        # Group commit state: frames waiting for the writer thread
+        self._pending: List[bytes] = []
+        self._commit_cond = threading.Condition()
+        self._appended = 0
+        self._committed = 0
+        self._closed = False
+        self._commit_error: Optional[OSError] = None
+
+        # The active segment; the lock covers writes to it and rotation
+        self._segment_lock = threading.Lock()
+        self._segment: BinaryIO
+        self._segment_bytes = 0
+        self._segment_number = self.recovery_stats["next_segment"] - 1
+        self._open_next_segment()
+
+        self._compaction: Optional[threading.Thread] = None
+        self._compaction_lock = threading.Lock()
+        # Held while a compaction runs so two never prune files concurrently
+        self._compact_mutex = threading.Lock()
+        self.compactions = 0
+
+        self._writer = threading.Thread(target=self._writer_loop, name="wal-writer", daemon=True)
+        self._writer.start()
+        if self.recovery_stats["segments_replayed"]:
+            # Fold the replayed segments into a snapshot so the next start is fast
+            self._start_compaction(self._segment_number)
+
+    # ----- recovery -----
+
+    def _numbered(self, pattern: re.Pattern) -> List[Tuple[int, Path]]:
+        found = []
+        for path in self.log_dir.iterdir():
+            match = pattern.match(path.name)
+            if match:
+                found.append((int(match.group(1)), path))
+        return sorted(found)
+
+    def _recover(self) -> Dict[str, Any]:
+        """Load the latest snapshot and replay the log segments written after it"""
+        start = time.perf_counter()
+        snapshot_number = 0
+        snapshots = self._numbered(SNAPSHOT_PATTERN)
+        if snapshots:
+            snapshot_number, snapshot_path = snapshots[-1]
+            self._load_state(self, snapshot_path)
+
+        segments = [(n, p) for n, p in self._numbered(SEGMENT_PATTERN) if n >= snapshot_number]
+        records = 0
+        for number, path in segments:
+            frames, good_offset = read_frames(path)
+            if good_offset < path.stat().st_size:
+                logger.warning(f"Truncating torn tail of {path.name} at byte {good_offset}")
+                with open(path, "r+b") as f:
+                    f.truncate(good_offset)
+            self._replay(self, frames)
+            records += len(frames)
+
+        last_segment = segments[-1][0] if segments else snapshot_number - 1
+        stats = {
+            "snapshot": snapshot_number if snapshots else None,
+            "segments_replayed": len(segments),
+            "records_replayed": records,
+            "recovery_ms": round((time.perf_counter() - start) * 1000, 3),
+            "next_segment": max(last_segment + 1, snapshot_number),
+        }
+        logger.info(f"DurableInMemoryStorage recovered from {self.log_dir}: {stats}")
+        return stats
+
+    @staticmethod
+    def _load_state(storage: InMemoryStorage, path: Path) -> None:
+        # The snapshot is millions of small containers; pausing the cyclic GC
+        # while they are created avoids repeated full collections
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        for name, value in zip(InMemoryStorage.STATE_ATTRIBUTES, state):
+            setattr(storage, name, value)
+
+    @staticmethod
+    def _replay(storage: InMemoryStorage, frames: List[Tuple[str, tuple]]) -> None:
+        """Apply logged mutations with the plain in-memory methods (no re-logging)"""
+        for op, args in frames:
+            getattr(InMemoryStorage, op)(storage, *args)
+
+    # ----- logging and group commit -----
+
+    def _log(self, op: str, *args: Any) -> int:
+        """
+        Append a mutation to the log (serialized now, committed by the writer)
+
+        Returns the record's position, for _acknowledge()
+        """
+        if self._closed:
+            raise RuntimeError("DurableInMemoryStorage is closed")
+        frame = _encode_frame(op, args)
+        with self._commit_cond:
+            self._pending.append(frame)
+            self._appended += 1
+            if self.sync_commit:
+                self._commit_cond.notify_all()
+            return self._appended
+
+    def _acknowledge(self, position: Optional[int]) -> None:
+        """With sync_commit, wait until the record at position is committed"""
+        if position is not None and self.sync_commit:
+            self._wait_committed(position)
+
+    def _wait_committed(self, target: int) -> None:
+        with self._commit_cond:
+            self._commit_cond.wait_for(
+                lambda: self._committed >= target or self._commit_error is not None
+            )
+            if self._committed < target:
+                raise RuntimeError(f"Write-ahead log commit failed: {self._commit_error}")
+
+    def _logging(self, *run_ids: Any, tables: bool = False) -> _StripeLocks:
+        """Hold the log ordering locks for the table and/or the given runs' stripes"""
+        stripes = sorted({self._stripe(run_id) for run_id in run_ids})
+        locks = [self._log_table_lock] if tables else []
+        return _StripeLocks(locks + [self._log_stripes[stripe] for stripe in stripes])
+
+    def _result_runs(self, result_ids: Iterable[str]) -> List[Any]:
+        """Runs of the stored results with these IDs (None for results not stored)"""
+        results = self.evaluation_results
+        return [
+            results[result_id]["run_id"] if result_id in results else None
+            for result_id in result_ids
+        ]
+
+    def _writer_loop(self) -> None:
+        while True:
+            with self._commit_cond:
+                if not self._pending and not self._closed:
+                    self._commit_cond.wait(self.commit_interval)
+                frames, self._pending = self._pending, []
+                closing = self._closed
+            if frames:
+                # Everything appended since the last commit goes out in one write/fsync
+                data = b"".join(frames)
+                try:
+                    with self._segment_lock:
+                        self._segment.write(data)
+                        self._segment.flush()
+                        if self.fsync:
+                            os.fsync(self._segment.fileno())
+                        self._segment_bytes += len(data)
+                        rotate = self._segment_bytes >= self.segment_max_bytes
+                        if rotate:
+                            self._open_next_segment()
+                except OSError as e:
+                    logger.error(f"Write-ahead log commit failed, no longer logging: {e}")
+                    with self._commit_cond:
+                        self._commit_error = e
+                        self._commit_cond.notify_all()
+                    return
+                with self._commit_cond:
+                    self._committed += len(frames)
+                    self._commit_cond.notify_all()
+                if rotate:
+                    self._start_compaction(self._segment_number)
+            elif closing:
+                return
+
+    def _open_next_segment(self) -> None:
+        """Close the active segment (if any) and start the next one"""
+        if getattr(self, "_segment", None) is not None:
+            self._segment.close()
+        self._segment_number += 1
+        self._segment = open(self.log_dir / _segment_name(self._segment_number), "ab")
+        self._segment_bytes = 0
+
+    def flush(self) -> None:
+        """
+        Block until every logged mutation has been committed
+
+        Raises RuntimeError if the log can no longer be written
+        """
+        with self._commit_cond:
+            target = self._appended
+            self._commit_cond.notify_all()
+        self._wait_committed(target)
+
+    # ----- snapshots and compaction -----
+
+    def _start_compaction(self, upto_segment: int) -> None:
+        with self._compaction_lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                # The running compaction will be followed up at the next rotation
+                return
+            self._compaction = threading.Thread(
+                target=self._compact, args=(upto_segment,), name="wal-compaction", daemon=True
+            )
+            self._compaction.start()
+
+    def _compact(self, upto_segment: int) -> None:
+        """Write a snapshot covering every segment before upto_segment, then prune"""
+        with self._compact_mutex:
+            self._compact_locked(upto_segment)
+
+    def _compact_locked(self, upto_segment: int) -> None:
+        try:
+            start = time.perf_counter()
+            # Private to this thread, so no locking needed
+            state = InMemoryStorage(thread_safe=False)
+            snapshot_number = 0
+            snapshots = [(n, p) for n, p in self._numbered(SNAPSHOT_PATTERN) if n <= upto_segment]
+            if snapshots:
+                snapshot_number, snapshot_path = snapshots[-1]
+                self._load_state(state, snapshot_path)
+            for number, path in self._numbered(SEGMENT_PATTERN):
+                if snapshot_number <= number < upto_segment:
+                    self._replay(state, read_frames(path)[0])
+
+            snapshot_path = self.log_dir / _snapshot_name(upto_segment)
+            tmp_path = snapshot_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    tuple(getattr(state, name) for name in InMemoryStorage.STATE_ATTRIBUTES),
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, snapshot_path)
+
+            # The new snapshot covers everything before upto_segment
+            for number, path in self._numbered(SNAPSHOT_PATTERN):
+                if number < upto_segment:
+                    path.unlink(missing_ok=True)
+            for number, path in self._numbered(SEGMENT_PATTERN):
+                if number < upto_segment:
+                    path.unlink(missing_ok=True)
+            self.compactions += 1
+            logger.info(
+                f"Wrote snapshot {snapshot_path.name} in "
+                f"{(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            logger.error(f"WAL compaction failed: {e}")
+
+    def snapshot(self) -> None:
+        """Roll the log and write a snapshot now, waiting for it to finish"""
+        self.flush()
+        with self._segment_lock:
+            self._open_next_segment()
+            upto = self._segment_number
+        self._compact(upto)
+
+    # ----- logged mutations -----
+
+    def create_test_case(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a test case"""
+        with self._logging(tables=True):
+            created = super().create_test_case(test_case)
+            position = self._log("create_test_case", test_case)
+        self._acknowledge(position)
+        return created
+
+    def create_test_cases_many(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several test cases"""
+        with self._logging(tables=True):
+            created = super().create_test_cases_many(test_cases)
+            position = self._log("create_test_cases_many", test_cases)
+        self._acknowledge(position)
+        return created
+
+    def update_test_case(
+        self, test_case_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update a test case"""
+        position = None
+        with self._logging(tables=True):
+            updated = super().update_test_case(test_case_id, updates)
+            if updated is not None:
+                position = self._log("update_test_case", test_case_id, updates)
+        self._acknowledge(position)
+        return updated
+
+    def delete_test_case(self, test_case_id: str) -> bool:
+        """Delete a test case"""
+        position = None
+        with self._logging(tables=True):
+            deleted = super().delete_test_case(test_case_id)
+            if deleted:
+                position = self._log("delete_test_case", test_case_id)
+        self._acknowledge(position)
+        return deleted
+
+    def create_evaluation_run(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an evaluation run"""
+        with self._logging(tables=True):
+            created = super().create_evaluation_run(run)
+            position = self._log("create_evaluation_run", run)
+        self._acknowledge(position)
+        return created
+
+    def update_evaluation_run(
+        self, run_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update an evaluation run"""
+        position = None
+        with self._logging(tables=True):
+            updated = super().update_evaluation_run(run_id, updates)
+            if updated is not None:
+                position = self._log("update_evaluation_run", run_id, updates)
+        self._acknowledge(position)
+        return updated
+
+    def create_evaluation_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an evaluation result"""
+        # A result that replaces one in another run moves it out of that run too
+        with self._logging(result["run_id"], *self._result_runs([result["id"]])):
+            created = super().create_evaluation_result(result)
+            position = self._log("create_evaluation_result", result)
+        self._acknowledge(position)
+        return created
+
+    def create_evaluation_results_many(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several evaluation results"""
+        run_ids = {result["run_id"] for result in results}
+        run_ids.update(self._result_runs(result["id"] for result in results))
+        with self._logging(*run_ids):
+            created = super().create_evaluation_results_many(results)
+            position = self._log("create_evaluation_results_many", results)
+        self._acknowledge(position)
+        return created
+
+    def update_evaluation_result(
+        self, result_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update an evaluation result"""
+        position = None
+        run_ids = self._result_runs([result_id])
+        with self._logging(*run_ids, updates.get("run_id", run_ids[0])):
+            updated = super().update_evaluation_result(result_id, updates)
+            if updated is not None:
+                position = self._log("update_evaluation_result", result_id, updates)
+        self._acknowledge(position)
+        return updated
+
+    def delete_evaluation_results(self, run_id: str) -> int:
+        """Delete all results (and their scores) for a run, returning how many were deleted"""
+        position = None
+        with self._logging(run_id):
+            deleted = super().delete_evaluation_results(run_id)
+            if deleted:
+                position = self._log("delete_evaluation_results", run_id)
+        self._acknowledge(position)
+        return deleted
+
+    def create_score(self, score: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a score"""
+        with self._logging(*self._result_runs([score["result_id"]])):
+            created = super().create_score(score)
+            position = self._log("create_score", score)
+        self._acknowledge(position)
+        return created
+
+    def create_scores_many(self, scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several scores"""
+        run_ids = set(self._result_runs(score["result_id"] for score in scores))
+        with self._logging(*run_ids):
+            created = super().create_scores_many(scores)
+            position = self._log("create_scores_many", scores)
+        self._acknowledge(position)
+        return created
+
+    def clear(self) -> None:
+        """Delete every record (for testing)"""
+        with _StripeLocks([self._log_table_lock, *self._log_stripes]):
+            super().clear()
+            position = self._log("clear")
+        self._acknowledge(position)
+
+    # ----- lifecycle -----
+
+    def close(self) -> None:
+        """Commit pending log records and stop the background threads"""
+        if self._closed:
+            return
+        self.flush()
+        with self._commit_cond:
+            self._closed = True
+            self._commit_cond.notify_all()
+        self._writer.join()
+        with self._compaction_lock:
+            compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        self._segment.close()
+        logger.info("DurableInMemoryStorage closed")
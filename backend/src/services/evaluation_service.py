@@ -2,17 +2,136 @@
 Evaluation service - orchestrates execution of test cases against agents
 """
 from src.models.evaluation import EvaluationRun, EvaluationResult
+from src.models.test_case import TestCase
 from src.services.storage import StorageAbstraction
 from src.services.agent_client import AgentClient
 from src.services.test_case_service import TestCaseService
 from src.services.grading_service import GradingService
-from typing import List, Optional, Dict, Any
+from src.services.grader_service import get_grader_registry
+from src.services.concurrency import AdaptiveConcurrencyLimiter, get_concurrency_limiter
+from src.services.agent_batcher import AgentBatcher
+from src.services.response_cache import AgentResponseCache, get_response_cache
+from src.services.write_buffer import InOrderResults, ScoreSink, WriteBuffer
+from src.services.pagination import fetch_page
+from src.services.analytics_store import AnalyticsStore, RunColumns, FINISHED_STATUSES
+from src.services.event_bus import get_event_bus
+from src.services.run_stats import RunStats
+from src.config import (
+    AGENT_TIMEOUT,
+    AGENT_TOTAL_TIMEOUT,
+    AGENT_MAX_CONNECTIONS,
+    AGENT_MAX_KEEPALIVE_CONNECTIONS,
+    AGENT_KEEPALIVE_EXPIRY,
+    AGENT_HTTP2,
+    AGENT_MAX_RETRIES,
+    AGENT_RETRY_BACKOFF_BASE,
+    AGENT_RETRY_BACKOFF_MAX,
+    AGENT_HEDGING,
+    AGENT_HEDGE_PERCENTILE,
+    AGENT_HEDGE_MIN_SAMPLES,
+    AGENT_ADAPTIVE_CONCURRENCY,
+    AGENT_CONCURRENCY_INITIAL,
+    AGENT_CONCURRENCY_MIN,
+    AGENT_CONCURRENCY_MAX,
+    EVALUATION_MAX_CONCURRENCY,
+    EVALUATION_GLOBAL_MAX_CONCURRENCY,
+    AGENT_BATCH_MAX_WAIT_MS,
+    AGENT_CACHE_ENABLED,
+    GRADING_QUEUE_SIZE,
+    GRADING_BATCH_SIZE,
+    RESULTS_STREAM_CHUNK,
+    EVENTS_KEEPALIVE_S,
+    EVENTS_POLL_S,
+    EVENTS_POLL_RUNS,
+    RUN_STATS_SAVE_INTERVAL_S,
+)
+from typing import AsyncGenerator, Awaitable, Callable, Iterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+AgentCaller = Callable[[str], Awaitable[Dict[str, Any]]]
+
+# Process-wide cap on in-flight agent calls across all runs. Each worker process
+# has its own, so with N workers up to N * EVALUATION_GLOBAL_MAX_CONCURRENCY are in flight.
+# Semaphores bind to the event loop that first waits on them, so keep one per loop.
+_global_semaphore: Optional[asyncio.Semaphore] = None
+_global_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_global_semaphore() -> asyncio.Semaphore:
+    """Get the global agent call semaphore for the running event loop"""
+    global _global_semaphore, _global_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _global_semaphore is None or _global_semaphore_loop is not loop:
+        _global_semaphore = asyncio.Semaphore(EVALUATION_GLOBAL_MAX_CONCURRENCY)
+        _global_semaphore_loop = loop
+    return _global_semaphore
+
+
+class _StoredRunEvents:
+    """
+    Events of a run read back from storage, for runs executing in another worker
+
+    Each poll() returns what was stored since the last one: new results (in
+    stored order), new scores of results not yet scored by every grader, a
+    progress event, and the run record if its version moved on.
+    """
+
+    def __init__(self, storage: StorageAbstraction, run: EvaluationRun):
+        self.storage = storage
+        self.run_id = run.id
+        self.total = len(run.test_case_ids)
+        self.graders = len(run.grader_ids)
+        self.version = run.version
+        self.results = 0
+        self.scores = 0
+        self._unscored: Dict[str, int] = {}  # result ID -> scores seen
+
+    def seen_version(self, version: int) -> None:
+        self.version = max(self.version, version)
+
+    def poll(self) -> List[Dict[str, Any]]:
+        # Read the record first: if it says finished, everything below is complete
+        data = self.storage.get_evaluation_run(self.run_id)
+        events = []
+        while True:
+            results = self.storage.list_evaluation_results_slice(
+                self.run_id, self.results, RESULTS_STREAM_CHUNK
+            )
+            self.results += len(results)
+            for result in results:
+                events.append(self._event("result", result))
+                # Only successful responses are graded
+                if self.graders and result.get("response_status") == "success":
+                    self._unscored[result["id"]] = 0
+            if len(results) < RESULTS_STREAM_CHUNK:
+                break
+        if self._unscored:
+            stored = self.storage.list_scores_many(self.run_id, list(self._unscored))
+            for result_id, scores in stored.items():
+                seen = self._unscored[result_id]
+                events.extend(self._event("score", score) for score in scores[seen:])
+                self.scores += len(scores) - seen
+                if len(scores) >= self.graders:
+                    del self._unscored[result_id]
+                else:
+                    self._unscored[result_id] = len(scores)
+        if events:
+            events.append(self._event("progress", {
+                "results": self.results, "scores": self.scores, "total": self.total
+            }))
+        if data is not None and data.get("version", 0) > self.version:
+            self.version = data.get("version", 0)
+            events.append(self._event("run", EvaluationRun(**data).to_dict()))
+        return events
+
+    def _event(self, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": None, "type": event_type, "run_id": self.run_id, "data": data}
+
 
 class EvaluationService:
     """Service for managing evaluation runs"""
@@ -20,23 +139,56 @@ class EvaluationService:
     def __init__(self, storage: StorageAbstraction, test_case_service: TestCaseService):
         self.storage = storage
         self.test_case_service = test_case_service
-        self.agent_client = AgentClient(timeout=30)
-        self.grading_service = GradingService(storage)
+        self.agent_client = AgentClient(
+            timeout=AGENT_TIMEOUT,
+            total_timeout=AGENT_TOTAL_TIMEOUT,
+            max_connections=AGENT_MAX_CONNECTIONS,
+            max_keepalive_connections=AGENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=AGENT_KEEPALIVE_EXPIRY,
+            http2=AGENT_HTTP2,
+            max_retries=AGENT_MAX_RETRIES,
+            retry_backoff_base=AGENT_RETRY_BACKOFF_BASE,
+            retry_backoff_max=AGENT_RETRY_BACKOFF_MAX,
+            hedging=AGENT_HEDGING,
+            hedge_percentile=AGENT_HEDGE_PERCENTILE,
+            hedge_min_samples=AGENT_HEDGE_MIN_SAMPLES
+        )
+        self.analytics = AnalyticsStore(storage)
+        self.grading_service = GradingService(storage, analytics=self.analytics)
+        self.response_cache: Optional[AgentResponseCache] = (
+            get_response_cache() if AGENT_CACHE_ENABLED else None
+        )
+        self.events = get_event_bus()
+        # Running stats of the runs this service is executing
+        self._live_stats: Dict[str, RunStats] = {}
 
     def create_evaluation_run(
         self,
         test_case_ids: List[str],
         agent_endpoint_url: str,
-        grader_ids: List[str]
+        grader_ids: List[str],
+        max_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_max_wait_ms: Optional[int] = None,
+        agent_batch_endpoint_url: Optional[str] = None,
+        agent_version: Optional[str] = None
     ) -> EvaluationRun:
         """Create a new evaluation run"""
         run = EvaluationRun(
             test_case_ids=test_case_ids,
             agent_endpoint_url=agent_endpoint_url,
             grader_ids=grader_ids,
-            status="pending"
+            status="pending",
+            max_concurrency=max_concurrency,
+            batch_size=batch_size,
+            batch_max_wait_ms=batch_max_wait_ms,
+            agent_batch_endpoint_url=agent_batch_endpoint_url,
+            agent_version=agent_version
         )
         self.storage.create_evaluation_run(run.to_dict())
+        self.events.publish(run.id, "run", run.to_dict())
+        # Build the run's graders now rather than on the first result
+        get_grader_registry().warm(grader_ids)
         logger.info(f"Created evaluation run {run.id}")
         return run
 
@@ -52,82 +204,545 @@ class EvaluationService:
         data = self.storage.list_evaluation_runs(skip, limit)
         return [EvaluationRun(**item) for item in data]
 
+    def list_evaluation_runs_page(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None
+    ) -> Tuple[List[EvaluationRun], Optional[str]]:
+        """List evaluation runs with keyset pagination, returning the next page's cursor"""
+        data, next_cursor = fetch_page(self.storage.list_evaluation_runs_page, limit, cursor, sort)
+        return [EvaluationRun(**item) for item in data], next_cursor
+
     async def execute_evaluation(self, run_id: str) -> EvaluationRun:
         """
-        Execute an evaluation run:
+        Execute an evaluation run as a two-stage pipeline:
         1. Mark as running
-        2. For each test case, call agent endpoint
-        3. Store results
-        4. Mark as completed
+        2. Agent stage: call the agent endpoint for all test cases concurrently,
+           bounded by the run's max_concurrency and the global limit (optionally
+           grouped into micro-batches)
+        3. Grading stage: grade each result as soon as its agent call finishes,
+           fed through a bounded queue so grading overlaps with agent calls.
+           Results (and their scores) are stored in test-case order; a result
+           finishing early waits in memory for the ones before it, and agent
+           calls start at most RESULTS_REORDER_WINDOW positions ahead
+        4. Mark as completed once every result is stored and graded
+
+        Storage is only called from worker threads (each call can block, e.g. on
+        the shared storage socket): the run's record updates here, and its
+        results, scores and stats saves through the write buffer's writer.
         """
-        run = self.get_evaluation_run(run_id)
+        run = await asyncio.to_thread(self.get_evaluation_run, run_id)
         if not run:
             raise ValueError(f"Evaluation run {run_id} not found")
 
         # Mark as running
-        self.storage.update_evaluation_run(run_id, {
+        await asyncio.to_thread(self._update_run, run_id, {
             "status": "running",
             "started_at": datetime.utcnow()
         })
+        stats = self._live_stats[run_id] = RunStats()
 
         try:
             results_count = 0
-            
-            # Execute for each test case
-            for test_case_id in run.test_case_ids:
-                test_case = self.test_case_service.get_test_case(test_case_id)
-                if not test_case:
-                    logger.warning(f"Test case {test_case_id} not found")
-                    continue
+            run_semaphore = asyncio.Semaphore(run.max_concurrency or EVALUATION_MAX_CONCURRENCY)
+            grading_queue: asyncio.Queue = asyncio.Queue(maxsize=GRADING_QUEUE_SIZE)
+            grading_metrics = self.grading_service.new_grading_metrics()
+            call_agent, batcher = self._make_agent_caller(run, run_semaphore)
+            # Results and scores are written in bulk, bounded by size and time,
+            # in a worker thread, then fed into the run's analytics columns and running stats and
+            # published as events. The stats are saved on the run record every
+            # RUN_STATS_SAVE_INTERVAL_S, by the buffer's writer after queued writes.
+            analytics_columns = self.analytics.start_run(run_id)
+            saved_at = time.monotonic()
+            # Fetch every test case of the run in one bulk read (their tags
+            # feed the analytics columns too)
+            test_cases = await asyncio.to_thread(
+                self.storage.get_test_cases_many, run.test_case_ids
+            )
+            tags_for = self.analytics.tags_in(test_cases)
+            total = len(run.test_case_ids)
 
-                # Call agent
-                agent_result = await self.agent_client.call_agent(
-                    run.agent_endpoint_url,
-                    test_case.input
-                )
+            def on_stored(results: List[Dict[str, Any]], scores: List[Dict[str, Any]]) -> None:
+                nonlocal saved_at
+                self.analytics.append(analytics_columns, results, scores, tags_for)
+                stats.add_results(results)
+                stats.add_scores(scores)
+                if time.monotonic() - saved_at >= RUN_STATS_SAVE_INTERVAL_S:
+                    saved = {"result_count": stats.results, "stats": stats.to_dict()}
+                    write_buffer.write_later(
+                        lambda: self.storage.update_evaluation_run(run_id, saved)
+                    )
+                    saved_at = time.monotonic()
+                self._publish_stored(run_id, total, stats, results, scores)
 
-                # Store result
-                result = EvaluationResult(
-                    run_id=run_id,
-                    test_case_id=test_case_id,
-                    agent_response=agent_result.get("response"),
-                    response_latency_ms=agent_result.get("latency_ms"),
-                    response_status=agent_result["status"],
-                    error_message=agent_result.get("error")
+            write_buffer = WriteBuffer(self.storage, on_flush=on_stored)
+            # Results are graded as they complete but stored in test-case order
+            in_order = InOrderResults(write_buffer)
+
+            logger.info(f"Starting agent calls and grading for run {run_id}")
+            grading_task = asyncio.create_task(
+                self._grading_stage(run, grading_queue, grading_metrics, in_order)
+            )
+
+            async def execute_at(position: int, test_case_id: str):
+                # Bound how many finished results wait for a slow earlier one
+                await in_order.admit(position)
+                executed = await self._execute_test_case(
+                    run, test_case_id, test_cases.get(test_case_id), call_agent
                 )
-                self.storage.create_evaluation_result(result.to_dict())
-                results_count += 1
+                return position, executed
+
+            # Schedule every test case; the semaphores bound how many agent calls are in flight
+            tasks = [
+                asyncio.create_task(execute_at(position, test_case_id))
+                for position, test_case_id in enumerate(run.test_case_ids)
+            ]
+
+            try:
+                # Each result goes to grading as soon as its agent call finishes
+                for next_done in asyncio.as_completed(tasks):
+                    position, executed = await next_done
+                    if executed is None:
+                        in_order.skip(position)
+                        continue
+                    result, test_case = executed
+                    result_dict = result.to_dict()
+                    in_order.add_result(position, result_dict)
+                    results_count += 1
+                    await self._queue_for_grading(
+                        grading_queue, (result_dict, test_case.expected_output), grading_task
+                    )
+
+                # Signal the grading stage that no more results are coming
+                await self._queue_for_grading(grading_queue, None, grading_task)
+                await grading_task
+            finally:
+                for task in tasks:
+                    task.cancel()
+                grading_task.cancel()
+                await asyncio.gather(*tasks, grading_task, return_exceptions=True)
+                if batcher is not None:
+                    await batcher.aclose()
+                # Store whatever is still held or buffered, even if the run failed
+                in_order.release_all()
+                await write_buffer.drain()
+            # Fail the run if the backend couldn't store its results or scores
+            await asyncio.to_thread(self.storage.flush)
+
+            grading_metrics["total_results"] = results_count
+            logger.info(f"Grading metrics: {grading_metrics}")
 
             # Mark as completed
-            self.storage.update_evaluation_run(run_id, {
+            await asyncio.to_thread(self._finish_run, run_id, {
                 "status": "completed",
                 "completed_at": datetime.utcnow(),
-                "result_count": results_count
+                "result_count": results_count,
+                "stats": stats.to_dict()
             })
 
-            # Grade all results
-            logger.info(f"Starting grading for run {run_id}")
-            grading_metrics = await self.grading_service.grade_evaluation_run(run_id)
-            logger.info(f"Grading metrics: {grading_metrics}")
-
             logger.info(f"Completed evaluation run {run_id} with {results_count} results")
-            return self.get_evaluation_run(run_id)
+            completed = await asyncio.to_thread(self.get_evaluation_run, run_id)
+            if completed is None:
+                raise ValueError(f"Evaluation run {run_id} was deleted while executing")
+            return completed
 
         except Exception as e:
             # Mark as failed
-            self.storage.update_evaluation_run(run_id, {
+            await asyncio.to_thread(self._finish_run, run_id, {
                 "status": "failed",
                 "error_message": str(e),
-                "completed_at": datetime.utcnow()
+                "completed_at": datetime.utcnow(),
+                "result_count": stats.results,
+                "stats": stats.to_dict()
             })
             logger.error(f"Evaluation run {run_id} failed: {e}")
             raise
+        finally:
+            self._live_stats.pop(run_id, None)
+
+    def _update_run(self, run_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a run's record and publish the updated run"""
+        updated = self.storage.update_evaluation_run(run_id, updates)
+        if self.events.has_subscribers(run_id, "run"):
+            data = self.storage.get_evaluation_run(run_id)
+            if data:
+                self.events.publish(run_id, "run", EvaluationRun(**data).to_dict())
+        return updated
+
+    def _finish_run(self, run_id: str, updates: Dict[str, Any]) -> None:
+        """Record a run's final status, stamping its live analytics columns with the version"""
+        updated = self._update_run(run_id, updates)
+        if updated is not None:
+            self.analytics.finish_run(run_id, updated.get("version", 0))
+
+    def _publish_stored(
+        self,
+        run_id: str,
+        total: int,
+        stats: RunStats,
+        results: List[Dict[str, Any]],
+        scores: List[Dict[str, Any]]
+    ) -> None:
+        """Publish a stored batch of results and scores, then the run's progress"""
+        self.events.publish_many(run_id, "result", results)
+        self.events.publish_many(run_id, "score", scores)
+        self.events.publish(run_id, "progress", {
+            "results": stats.results, "scores": stats.scores, "total": total
+        })
+
+    def get_run_stats(self, run: EvaluationRun) -> Dict[str, Any]:
+        """
+        A run's running aggregates (see RunStats)
+
+        Runs executing here are read from their live stats; others from their
+        record. Runs without stats on their record (created before stats were
+        kept, or re-graded since) get them computed from their stored results
+        and scores, and saved if the run is finished.
+        """
+        live = self._live_stats.get(run.id)
+        if live is not None:
+            return live.to_dict()
+        if run.stats is not None:
+            return run.stats
+        stats = RunStats.compute(
+            self.storage.list_evaluation_results(run.id),
+            self.storage.list_all_scores(run.id)
+        ).to_dict()
+        if run.status in FINISHED_STATUSES:
+            self.storage.update_evaluation_run(run.id, {"stats": stats})
+        return stats
+
+    async def watch_run(
+        self,
+        run_id: str,
+        keepalive: float = EVENTS_KEEPALIVE_S,
+        poll: float = EVENTS_POLL_S
+    ) -> AsyncGenerator[Optional[Dict[str, Any]], None]:
+        """
+        Yield a run's events until it finishes, starting with its current record
+
+        Subscribes before reading the run, so no event falls between the two. A run
+        executing in this worker is followed through the event bus; any other run
+        (executing in another worker) is read from storage every poll seconds, in
+        a thread, and its new results, scores and record changes are yielded as
+        events without IDs. Run events no newer than a record already yielded
+        are skipped. Yields None after keepalive seconds without an event.
+        """
+        subscription = self.events.subscribe(run_id)
+        try:
+            data = await asyncio.to_thread(self.storage.get_evaluation_run, run_id)
+            if data is None:
+                return
+            run = EvaluationRun(**data)
+            yield {"id": None, "type": "run", "run_id": run_id, "data": run.to_dict()}
+            stored: Optional[_StoredRunEvents] = _StoredRunEvents(self.storage, run)
+            status = run.status
+            version = run.version
+            last_yield = time.monotonic()
+            while status not in FINISHED_STATUSES:
+                if stored is not None and run_id in self._live_stats:
+                    stored = None  # executing here: the bus has every event
+                idle = time.monotonic() - last_yield
+                timeout = max(0.0, min(keepalive if stored is None else poll, keepalive - idle))
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout)
+                except asyncio.TimeoutError:
+                    polled = await asyncio.to_thread(stored.poll) if stored is not None else []
+                    for event in polled:
+                        if event["type"] == "run":
+                            status = event["data"]["status"]
+                            version = event["data"]["version"]
+                        yield event
+                        last_yield = time.monotonic()
+                    if time.monotonic() - last_yield >= keepalive:
+                        yield None
+                        last_yield = time.monotonic()
+                    continue
+                if event["type"] == "run":
+                    if event["data"]["version"] <= version:
+                        continue
+                    status = event["data"]["status"]
+                    version = event["data"]["version"]
+                    if stored is not None:
+                        stored.seen_version(version)
+                yield event
+                last_yield = time.monotonic()
+        finally:
+            self.events.unsubscribe(subscription)
+
+    async def watch_runs(
+        self,
+        keepalive: float = EVENTS_KEEPALIVE_S,
+        poll: float = EVENTS_POLL_S
+    ) -> AsyncGenerator[Optional[Dict[str, Any]], None]:
+        """
+        Yield run and progress events of every run, and None after keepalive idle seconds
+
+        Runs executing in other workers are seen by reading the newest
+        EVENTS_POLL_RUNS runs every poll seconds: each changed record (a new
+        version) is yielded as a run event without an ID.
+        """
+        subscription = self.events.subscribe()
+        try:
+            versions = {
+                item["id"]: item.get("version", 0)
+                for item in await asyncio.to_thread(self._newest_runs)
+            }
+            last_yield = time.monotonic()
+            while True:
+                idle = time.monotonic() - last_yield
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), max(0.0, min(poll, keepalive - idle))
+                    )
+                except asyncio.TimeoutError:
+                    for item in await asyncio.to_thread(self._newest_runs):
+                        version = item.get("version", 0)
+                        if version > versions.get(item["id"], -1):
+                            versions[item["id"]] = version
+                            yield {
+                                "id": None, "type": "run", "run_id": item["id"],
+                                "data": EvaluationRun(**item).to_dict()
+                            }
+                            last_yield = time.monotonic()
+                    if time.monotonic() - last_yield >= keepalive:
+                        yield None
+                        last_yield = time.monotonic()
+                    continue
+                if event["type"] == "run":
+                    versions[event["run_id"]] = max(
+                        versions.get(event["run_id"], -1), event["data"]["version"]
+                    )
+                yield event
+                last_yield = time.monotonic()
+        finally:
+            self.events.unsubscribe(subscription)
+
+    def _newest_runs(self) -> List[Dict[str, Any]]:
+        return self.storage.list_evaluation_runs_page(limit=EVENTS_POLL_RUNS, descending=True)
+
+    @staticmethod
+    def get_agent_limiter(
+        agent_endpoint_url: str,
+        create: bool = True
+    ) -> Optional[AdaptiveConcurrencyLimiter]:
+        """Get the adaptive concurrency limiter for an agent endpoint, if enabled"""
+        if not AGENT_ADAPTIVE_CONCURRENCY:
+            return None
+        return get_concurrency_limiter(
+            agent_endpoint_url,
+            create=create,
+            initial_limit=AGENT_CONCURRENCY_INITIAL,
+            min_limit=AGENT_CONCURRENCY_MIN,
+            max_limit=AGENT_CONCURRENCY_MAX
+        )
+
+    def _make_agent_caller(
+        self,
+        run: EvaluationRun,
+        run_semaphore: asyncio.Semaphore
+    ) -> Tuple[AgentCaller, Optional[AgentBatcher]]:
+        """
+        Build the function a run uses to call its agent for one input
+
+        In batch mode inputs are grouped by an AgentBatcher, and each batch
+        request (not each input) takes one concurrency slot. Runs that pin an
+        agent_version go through the response cache first when it is enabled.
+        """
+        endpoint_url = run.agent_endpoint_url
+
+        async def call_single(input_text: str) -> Dict[str, Any]:
+            return await self._call_limited(
+                endpoint_url,
+                run_semaphore,
+                lambda: self.agent_client.call_agent(endpoint_url, input_text)
+            )
+
+        call_agent: AgentCaller = call_single
+        batcher = None
+
+        if run.batch_size:
+            batch_url = run.agent_batch_endpoint_url or endpoint_url
+
+            async def call_batch(inputs: List[str]) -> Dict[str, Any]:
+                return await self._call_limited(
+                    batch_url,
+                    run_semaphore,
+                    lambda: self.agent_client.call_agent_batch(batch_url, inputs)
+                )
+
+            max_wait_ms = (
+                run.batch_max_wait_ms if run.batch_max_wait_ms is not None
+                else AGENT_BATCH_MAX_WAIT_MS
+            )
+            batcher = AgentBatcher(call_batch, call_single, run.batch_size, max_wait_ms / 1000)
+            call_agent = batcher.submit
+
+        cache = self.response_cache
+        agent_version = run.agent_version
+        if cache is None or not agent_version:
+            return call_agent, batcher
+
+        uncached_call = call_agent
+
+        async def call_cached(input_text: str) -> Dict[str, Any]:
+            key = cache.make_key(endpoint_url, agent_version, input_text)
+            return await cache.get_or_call(key, lambda: uncached_call(input_text))
+
+        return call_cached, batcher
+
+    async def _call_limited(
+        self,
+        endpoint_url: str,
+        run_semaphore: asyncio.Semaphore,
+        call: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Make one agent request while holding a slot from every concurrency limit"""
+        # Acquire from the narrowest scope outwards so waiting calls don't hold
+        # global slots: per-run limit, then the endpoint's adaptive limit, then global
+        async with run_semaphore:
+            limiter = self.get_agent_limiter(endpoint_url)
+            if limiter is not None:
+                await limiter.acquire()
+            agent_result: Optional[Dict[str, Any]] = None
+            try:
+                async with _get_global_semaphore():
+                    agent_result = await call()
+            finally:
+                if limiter is not None:
+                    if agent_result is None:
+                        limiter.release()
+                    else:
+                        limiter.release(agent_result["status"], agent_result.get("latency_ms"))
+        return agent_result
+
+    async def _execute_test_case(
+        self,
+        run: EvaluationRun,
+        test_case_id: str,
+        test_case_data: Optional[Dict[str, Any]],
+        call_agent: AgentCaller
+    ) -> Optional[Tuple[EvaluationResult, TestCase]]:
+        """
+        Call the agent for a single test case
+
+        Returns the result with its test case, or None if the test case no longer exists
+        """
+        if not test_case_data:
+            logger.warning(f"Test case {test_case_id} not found")
+            return None
+        test_case = TestCase(**test_case_data)
+
+        agent_result = await call_agent(test_case.input)
+
+        result = EvaluationResult(
+            run_id=run.id,
+            test_case_id=test_case_id,
+            agent_response=agent_result.get("response"),
+            response_latency_ms=agent_result.get("latency_ms"),
+            response_status=agent_result["status"],
+            error_message=agent_result.get("error"),
+            attempt_count=agent_result.get("attempts", 1),
+            attempt_latencies_ms=agent_result.get("attempt_latencies_ms"),
+            cached=agent_result.get("cached", False)
+        )
+        return result, test_case
+
+    @staticmethod
+    async def _queue_for_grading(
+        grading_queue: asyncio.Queue,
+        item: Optional[Tuple[Dict[str, Any], str]],
+        grading_task: asyncio.Task
+    ) -> None:
+        """
+        Put an item on the bounded grading queue, unless the grading stage has stopped
+
+        A full queue is only drained by the grading stage, so if that stage has
+        died (e.g. a storage error while flushing scores) its error is raised
+        here rather than waiting for queue space forever.
+        """
+        if grading_task.done():
+            grading_task.result()
+            raise RuntimeError("Grading stage stopped before the run finished")
+        if not grading_queue.full():
+            grading_queue.put_nowait(item)
+            return
+        put = asyncio.ensure_future(grading_queue.put(item))
+        await asyncio.wait({put, grading_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            grading_task.result()
+            raise RuntimeError("Grading stage stopped before the run finished")
+
+    async def _grading_stage(
+        self,
+        run: EvaluationRun,
+        grading_queue: asyncio.Queue,
+        grading_metrics: Dict[str, Any],
+        write_buffer: ScoreSink
+    ) -> None:
+        """
+        Grade results from the queue until the None sentinel arrives
+
+        Waits for one result, then takes whatever else is already queued (up to
+        GRADING_BATCH_SIZE) so graders see chunks without delaying a lone result.
+        """
+        while True:
+            item = await grading_queue.get()
+            if item is None:
+                return
+            chunk = [item]
+            done = False
+            while len(chunk) < GRADING_BATCH_SIZE and not grading_queue.empty():
+                item = grading_queue.get_nowait()
+                if item is None:
+                    done = True
+                    break
+                chunk.append(item)
+            await self.grading_service.grade_results(
+                chunk, run.grader_ids, grading_metrics, write_buffer
+            )
+            if done:
+                return
 
     def get_evaluation_results(self, run_id: str) -> List[EvaluationResult]:
         """Get all results for an evaluation run"""
         data = self.storage.list_evaluation_results(run_id)
         return [EvaluationResult(**item) for item in data]
 
+    def stream_evaluation_results(
+        self,
+        run_id: str,
+        chunk_size: int = RESULTS_STREAM_CHUNK
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a run's results with their scores, then a summary record
+
+        Results and scores are read chunk_size results at a time, so only one
+        chunk of records is held however large the run is. The summary is
+        accumulated in columnar form as the chunks go by, and so describes
+        exactly the results that were yielded.
+        """
+        columns = RunColumns(run_id)
+        skip = 0
+        while True:
+            results = self.storage.list_evaluation_results_slice(run_id, skip, chunk_size)
+            if not results:
+                break
+            skip += len(results)
+            scores = self.storage.list_scores_many(run_id, [r["id"] for r in results])
+            columns.append_results(results, self.analytics.tags_lookup(results))
+            columns.append_scores([score for group in scores.values() for score in group])
+            for result in results:
+                record = EvaluationResult(**result).to_dict()
+                record["scores"] = scores.get(result["id"], [])
+                yield {"type": "result", "data": record}
+        yield {
+            "type": "summary",
+            "data": {"results": columns.result_summary(), "scores": columns.score_summary()}
+        }
+
     async def start_evaluation_async(self, run_id: str):
         """Start evaluation in background (fire and forget)"""
         try:
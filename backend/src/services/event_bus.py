@@ -0,0 +1,135 @@
+"""
+Run event bus - in-process pub/sub of evaluation run progress
+
+The evaluation service publishes an event whenever a run changes (created,
+status change), its results and scores are stored, and with progress counters
+after each stored batch. Subscribers watch one run or every run; each holds a
+bounded queue on its own event loop, so a slow client never holds up a run.
+
+Events are dicts: {"id": n, "type": ..., "run_id": ..., "data": {...}}.
+    run       the run record, on creation and every status change
+    result    a stored result
+    score     a stored score
+    progress  {"results": stored, "scores": stored, "total": test cases}
+    resync    the subscriber fell behind and its backlog was dropped; re-read
+              the run instead of relying on the events it missed
+
+The bus only carries events of runs executing in this process. With several
+workers, EvaluationService.watch_run and watch_runs follow runs executing in
+another worker by polling storage (every EVENTS_POLL_S), yielding the same event
+types without IDs.
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import itertools
+import logging
+import threading
+from src.config import EVENTS_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Event types sent to subscribers of every run (the others are per run only)
+ALL_RUNS_EVENT_TYPES = ("run", "progress")
+
+
+class Subscription:
+    """One subscriber's queue of events, owned by the event loop that created it"""
+
+    def __init__(self, run_id: Optional[str], queue_size: int):
+        self.run_id = run_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Queue an event from any thread"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._put(event)
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._put, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it is about to unsubscribe
+                pass
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+            return
+        except asyncio.QueueFull:
+            pass
+        # Fell behind: drop the backlog and tell the subscriber to re-read
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(
+            {"id": event["id"], "type": "resync", "run_id": event["run_id"], "data": {}}
+        )
+
+
+class RunEventBus:
+    """Fan-out of run events to per-run and all-runs subscribers"""
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[Optional[str], List[Subscription]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, run_id: Optional[str] = None) -> Subscription:
+        """Subscribe to one run's events, or to every run's (run_id None)"""
+        subscription = Subscription(run_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(run_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.run_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.run_id, None)
+
+    def has_subscribers(self, run_id: str, event_type: str) -> bool:
+        """Whether anyone would receive this event (so building it can be skipped)"""
+        subscribers = self._subscribers
+        return run_id in subscribers or (None in subscribers and event_type in ALL_RUNS_EVENT_TYPES)
+
+    def publish(self, run_id: str, event_type: str, data: Dict[str, Any]) -> None:
+        """Send an event to the run's subscribers and, for run-level types, to all-runs ones"""
+        with self._lock:
+            targets = list(self._subscribers.get(run_id, ()))
+            if event_type in ALL_RUNS_EVENT_TYPES:
+                targets.extend(self._subscribers.get(None, ()))
+        if not targets:
+            return
+        event = {"id": next(self._ids), "type": event_type, "run_id": run_id, "data": data}
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def publish_many(self, run_id: str, event_type: str, items: List[Dict[str, Any]]) -> None:
+        """Publish one event per item"""
+        if not self.has_subscribers(run_id, event_type):
+            return
+        for data in items:
+            self.publish(run_id, event_type, data)
+
+
+# Process-wide event bus
+_event_bus: Optional[RunEventBus] = None
+
+
+def get_event_bus() -> RunEventBus:
+    """Get the process-wide run event bus"""
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = RunEventBus()
+    return _event_bus
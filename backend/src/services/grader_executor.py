@@ -0,0 +1,436 @@
+"""
+Grader executors - run graders off the event loop with enforced timeouts
+
+Backends:
+- "thread": default thread pool. Cheap, but a grader that exceeds its timeout
+  cannot be stopped and keeps its thread busy until it returns.
+- "process": a ProcessPoolExecutor. CPU-heavy graders scale across cores; on
+  timeout the pool's processes are killed and the pool is replaced, and the
+  grades that were lost with it are resubmitted.
+- "subprocess": warm, dedicated worker processes fed over pipes. On timeout
+  only the worker running the grade is killed and respawned.
+
+A grade's timeout starts when a worker picks it up, so time spent queued behind
+other grades doesn't count against it.
+
+Graders can be run one response at a time (grade) or on a whole chunk of
+responses (grade_batch), which crosses the thread/process boundary once.
+Every backend reports per-grader call counts and CPU time.
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from src.config import GRADER_EXECUTOR, GRADER_WORKERS
+from src.services.grader_service import GraderService
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_BACKENDS = ("thread", "process", "subprocess")
+
+GradeOutcome = Tuple[Dict[str, Any], float]
+BatchGradeOutcome = Tuple[List[Dict[str, Any]], float]
+WorkerFn = Callable[[str, str, str], GradeOutcome]
+BatchWorkerFn = Callable[[str, List[str], List[str]], BatchGradeOutcome]
+
+# Times a process-pool grade is resubmitted after another grade's timeout killed the pool
+POOL_RESUBMITS = 3
+
+
+def run_grader(grader_id: str, agent_response: str, expected_output: str) -> GradeOutcome:
+    """
+    Grade one response (runs inside the executor's thread or worker process)
+
+    Returns (grading result, CPU seconds spent in grade())
+    """
+    grader = GraderService.get_grader_instance(grader_id)
+    if not grader:
+        raise ValueError(f"Grader {grader_id} not found")
+    start = time.thread_time()
+    result = grader.grade(agent_response, expected_output)
+    return result, time.thread_time() - start
+
+
+def run_grader_batch(
+    grader_id: str, agent_responses: List[str], expected_outputs: List[str]
+) -> BatchGradeOutcome:
+    """
+    Grade a chunk of responses with one grade_batch() call
+
+    Returns (grading results in input order, CPU seconds spent in grade_batch())
+    """
+    grader = GraderService.get_grader_instance(grader_id)
+    if not grader:
+        raise ValueError(f"Grader {grader_id} not found")
+    start = time.thread_time()
+    results = grader.grade_batch(agent_responses, expected_outputs)
+    if len(results) != len(agent_responses):
+        raise ValueError(
+            f"Grader {grader_id} returned {len(results)} results "
+            f"for {len(agent_responses)} responses"
+        )
+    return results, time.thread_time() - start
+
+
+class GraderExecutor(ABC):
+    """Base class for grader executor backends"""
+
+    backend = ""
+
+    def __init__(
+        self, worker_fn: WorkerFn = run_grader, batch_worker_fn: BatchWorkerFn = run_grader_batch
+    ):
+        self.worker_fn = worker_fn
+        self.batch_worker_fn = batch_worker_fn
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    async def grade(
+        self, grader_id: str, agent_response: str, expected_output: str, timeout: float
+    ) -> GradeOutcome:
+        """
+        Run a grader on one response with a timeout
+
+        Raises asyncio.TimeoutError if the grader doesn't finish in time
+        """
+        return await self._run_tracked(
+            grader_id, 1, self.worker_fn, (grader_id, agent_response, expected_output), timeout
+        )
+
+    async def grade_batch(
+        self,
+        grader_id: str,
+        agent_responses: List[str],
+        expected_outputs: List[str],
+        timeout: float,
+    ) -> BatchGradeOutcome:
+        """
+        Run a grader on a chunk of responses with one timeout for the whole chunk
+
+        Raises asyncio.TimeoutError if the grader doesn't finish in time
+        """
+        return await self._run_tracked(
+            grader_id,
+            len(agent_responses),
+            self.batch_worker_fn,
+            (grader_id, agent_responses, expected_outputs),
+            timeout,
+        )
+
+    async def _run_tracked(
+        self, grader_id: str, count: int, fn: Callable, args: tuple, timeout: float
+    ) -> Tuple[Any, float]:
+        """Run a worker function and record per-grader stats"""
+        stats = self.stats.setdefault(
+            grader_id, {"calls": 0, "cpu_time_ms": 0.0, "timeouts": 0, "errors": 0}
+        )
+        stats["calls"] += count
+        try:
+            result, cpu_seconds = await self._run(fn, args, timeout)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            raise
+        except Exception:
+            stats["errors"] += 1
+            raise
+        stats["cpu_time_ms"] += cpu_seconds * 1000
+        return result, cpu_seconds
+
+    @abstractmethod
+    async def _run(self, fn: Callable, args: tuple, timeout: float) -> Tuple[Any, float]:
+        """Backend-specific execution of fn(*args)"""
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Executor backend and per-grader stats for introspection"""
+        return {
+            "backend": self.backend,
+            "graders": {
+                grader_id: {**stats, "cpu_time_ms": round(stats["cpu_time_ms"], 3)}
+                for grader_id, stats in self.stats.items()
+            },
+        }
+
+    def shutdown(self) -> None:
+        """Release worker threads/processes"""
+        pass
+
+
+class ThreadGraderExecutor(GraderExecutor):
+    """Runs graders in the default thread pool (timeouts can't stop the grader)"""
+
+    backend = "thread"
+
+    async def _run(self, fn, args, timeout):
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+
+        def call():
+            loop.call_soon_threadsafe(started.set)
+            return fn(*args)
+
+        task = asyncio.ensure_future(asyncio.to_thread(call))
+        waiter = asyncio.ensure_future(started.wait())
+        try:
+            # The timeout starts once a thread picks the grade up
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        return await asyncio.wait_for(task, timeout=timeout)
+
+
+_started_queue: Any = None
+
+
+def _init_pool_worker(started_queue) -> None:
+    """Process pool initializer: keep the queue grades report their start on"""
+    global _started_queue
+    _started_queue = started_queue
+
+
+def _signal_start(token: int, fn: Callable, args: tuple) -> Any:
+    """Run fn(*args) in a pool worker, first telling the parent it has started"""
+    _started_queue.put(token)
+    return fn(*args)
+
+
+class _StartSignal:
+    """Set when a pool worker picks up a grade (or the grade ends without starting)"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.at: Optional[float] = None
+
+
+class ProcessPoolGraderExecutor(GraderExecutor):
+    """Runs graders in a process pool, replacing the pool when a grader times out"""
+
+    backend = "process"
+
+    def __init__(
+        self,
+        workers: int,
+        worker_fn: WorkerFn = run_grader,
+        batch_worker_fn: BatchWorkerFn = run_grader_batch,
+    ):
+        super().__init__(worker_fn, batch_worker_fn)
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        # Workers report the grades they start here; a listener thread records when
+        self._started_queue = self._context.Queue()
+        self._starts: Dict[int, _StartSignal] = {}
+        self._tokens = itertools.count()
+        self._listener = threading.Thread(
+            target=self._listen_for_starts, name="grader-starts", daemon=True
+        )
+        self._listener.start()
+        self._pool_lock = threading.Lock()
+        self._pool = self._new_pool()
+        # Threads that wait on pool futures so timeouts are enforced off the event loop
+        self._waiters = ThreadPoolExecutor(
+            max_workers=workers * 2, thread_name_prefix="grader-wait"
+        )
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=_init_pool_worker,
+            initargs=(self._started_queue,),
+        )
+
+    def _listen_for_starts(self) -> None:
+        while True:
+            token = self._started_queue.get()
+            if token is None:
+                return
+            started = self._starts.get(token)
+            if started is not None:
+                started.at = time.monotonic()
+                started.event.set()
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Kill a pool's workers and start a fresh pool"""
+        with self._pool_lock:
+            if self._pool is not broken:
+                return
+            for process in list((broken._processes or {}).values()):
+                process.kill()
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+        logger.warning("Replaced grader process pool after a timeout")
+
+    def _run_blocking(self, fn, args, timeout):
+        # Resubmissions cover grades lost when another grade's timeout killed the pool
+        for _ in range(POOL_RESUBMITS + 1):
+            pool = self._pool
+            token = next(self._tokens)
+            started = self._starts[token] = _StartSignal()
+            try:
+                try:
+                    future = pool.submit(_signal_start, token, fn, args)
+                except RuntimeError:
+                    if pool is self._pool:
+                        raise
+                    continue  # the pool was replaced after we picked it up
+                future.add_done_callback(lambda _: started.event.set())
+                started.event.wait()
+                elapsed = time.monotonic() - started.at if started.at is not None else 0.0
+                return future.result(timeout=max(0.0, timeout - elapsed))
+            except concurrent.futures.TimeoutError:
+                self._replace_pool(pool)
+                raise asyncio.TimeoutError()
+            except BrokenProcessPool:
+                self._replace_pool(pool)
+            finally:
+                self._starts.pop(token, None)
+        raise RuntimeError("Grader process pool is unavailable")
+
+    async def _run(self, fn, args, timeout):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._waiters, self._run_blocking, fn, args, timeout)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._waiters.shutdown(wait=False)
+        self._started_queue.put(None)
+
+
+def _subprocess_worker_main(conn) -> None:
+    """Warm worker loop: run (fn, args) requests from the pipe until it closes"""
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        fn, args = request
+        try:
+            conn.send(("ok", fn(*args)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _SubprocessWorker:
+    """A dedicated grader process and the parent's end of its pipe"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_subprocess_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class SubprocessGraderExecutor(GraderExecutor):
+    """Runs graders in warm worker processes, killing only a worker that times out"""
+
+    backend = "subprocess"
+
+    def __init__(
+        self,
+        workers: int,
+        worker_fn: WorkerFn = run_grader,
+        batch_worker_fn: BatchWorkerFn = run_grader_batch,
+    ):
+        super().__init__(worker_fn, batch_worker_fn)
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_SubprocessWorker]" = queue.Queue()
+        self._all: List[_SubprocessWorker] = []
+        for _ in range(workers):
+            self._add_worker()
+        self._waiters = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grader-wait")
+
+    def _add_worker(self) -> None:
+        worker = _SubprocessWorker(self._context)
+        self._all.append(worker)
+        self._idle.put(worker)
+
+    def _run_blocking(self, fn, args, timeout):
+        worker = self._idle.get()
+        try:
+            # The timeout starts once an idle worker has the grade
+            worker.conn.send((fn, args))
+            ready = worker.conn.poll(timeout)
+            if ready:
+                status, payload = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            ready, status, payload = True, "crashed", f"Grader worker died: {e}"
+
+        if not ready or status == "crashed":
+            # The worker is stuck or gone: kill it and start a replacement
+            worker.kill()
+            self._all.remove(worker)
+            self._add_worker()
+            if not ready:
+                raise asyncio.TimeoutError()
+            raise RuntimeError(payload)
+
+        self._idle.put(worker)
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    async def _run(self, fn, args, timeout):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._waiters, self._run_blocking, fn, args, timeout)
+
+    def shutdown(self) -> None:
+        for worker in self._all:
+            worker.kill()
+        self._all = []
+        self._waiters.shutdown(wait=False)
+
+
+def create_grader_executor(
+    backend: str,
+    workers: Optional[int] = None,
+    worker_fn: WorkerFn = run_grader,
+    batch_worker_fn: BatchWorkerFn = run_grader_batch,
+) -> GraderExecutor:
+    """Create a grader executor for a backend name"""
+    workers = workers or os.cpu_count() or 1
+    if backend == "thread":
+        return ThreadGraderExecutor(worker_fn, batch_worker_fn)
+    if backend == "process":
+        return ProcessPoolGraderExecutor(workers, worker_fn, batch_worker_fn)
+    if backend == "subprocess":
+        return SubprocessGraderExecutor(workers, worker_fn, batch_worker_fn)
+    raise ValueError(f"Unknown grader executor backend: {backend}")
+
+
+# Process-wide executor shared by all grading services
+_grader_executor: Optional[GraderExecutor] = None
+
+
+def get_grader_executor() -> GraderExecutor:
+    """Get the process-wide grader executor, creating it from config"""
+    global _grader_executor
+    if _grader_executor is None:
+        _grader_executor = create_grader_executor(GRADER_EXECUTOR, GRADER_WORKERS or None)
+        logger.info(f"Initialized {_grader_executor.backend} grader executor")
+    return _grader_executor
+
+
+def shutdown_grader_executor() -> None:
+    """Stop the process-wide grader executor (called on app shutdown)"""
+    global _grader_executor
+    if _grader_executor is not None:
+        _grader_executor.shutdown()
+        _grader_executor = None
@@ -0,0 +1,128 @@
+"""
+Grader registry - build each grader configuration once per process
+
+Instances are keyed by (grader id, config hash). A grader's setup work
+(compiling patterns, loading vocabularies, building models) runs once per
+process and the instance is shared by every result it grades. Worker
+processes start with an empty registry and build their own instances on
+first use.
+"""
+from src.graders.base import GraderInterface
+from src.graders.string_match import StringMatchGrader
+from src.models.grader import Grader
+from typing import Dict, Any, List, Optional, Tuple, Type
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Grader implementation for each grader type
+GRADER_TYPES: Dict[str, Type[GraderInterface]] = {
+    "string-match": StringMatchGrader,
+}
+
+
+def config_hash(config: Optional[Dict[str, Any]]) -> str:
+    """Stable short hash of a grader configuration"""
+    encoded = json.dumps(config or {}, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class GraderRegistry:
+    """Process-local cache of built grader instances"""
+
+    def __init__(self, definitions: Dict[str, Grader]):
+        self.definitions = definitions
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._instances: Dict[Tuple[str, str], GraderInterface] = {}
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.warmup_ms = 0.0
+
+    def _check_process(self) -> None:
+        """Start afresh in a forked child (inherited locks may be held)"""
+        if self._pid != os.getpid():
+            self._reset()
+
+    def get(
+        self, grader_id: str, config: Optional[Dict[str, Any]] = None
+    ) -> Optional[GraderInterface]:
+        """
+        Get the shared instance for a grader, building it on first use
+
+        config overrides the grader's declared config; returns None for
+        unknown graders
+        """
+        return self._get(grader_id, config, count_use=True)
+
+    def _get(
+        self, grader_id: str, config: Optional[Dict[str, Any]], count_use: bool
+    ) -> Optional[GraderInterface]:
+        self._check_process()
+        definition = self.definitions.get(grader_id)
+        if definition is None or definition.type not in GRADER_TYPES:
+            return None
+        merged_config = {**(definition.config or {}), **(config or {})}
+        key = (grader_id, config_hash(merged_config))
+
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                instance = self._build(key, definition.type, merged_config)
+            if count_use:
+                self._stats[key]["uses"] += 1
+        return instance
+
+    def _build(self, key: Tuple[str, str], grader_type: str, config: Dict[str, Any]):
+        """Instantiate and validate a grader (caller holds the lock)"""
+        grader_id, hashed = key
+        start = time.perf_counter()
+        instance = GRADER_TYPES[grader_type](grader_id, config)
+        instance.validate_config()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        self._stats[key] = {
+            "grader_id": grader_id,
+            "config_hash": hashed,
+            "config": config,
+            "build_ms": round(build_ms, 3),
+            "built_at": datetime.utcnow().isoformat(),
+            "uses": 0,
+        }
+        self._instances[key] = instance
+        logger.info(f"Built grader {grader_id} ({hashed}) in {build_ms:.2f}ms")
+        return instance
+
+    def warm(self, grader_ids: Optional[List[str]] = None) -> float:
+        """
+        Build graders ahead of grading (all declared graders by default)
+
+        Warm-ups don't count as uses. Returns the time spent in milliseconds
+        """
+        start = time.perf_counter()
+        for grader_id in grader_ids if grader_ids is not None else list(self.definitions):
+            self._get(grader_id, None, count_use=False)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.warmup_ms += elapsed_ms
+        return elapsed_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Registry contents and build/warmup cost for introspection"""
+        self._check_process()
+        return {
+            "pid": self._pid,
+            "warmup_ms": round(self.warmup_ms, 3),
+            "instances": [dict(stats) for stats in self._stats.values()],
+        }
+
+    def clear(self) -> None:
+        """Drop all built instances (for testing)"""
+        self._reset()
@@ -2,7 +2,7 @@
 Grader service - list and get graders
 """
 from src.models.grader import Grader
-from src.graders.string_match import StringMatchGrader
+from src.services.grader_registry import GraderRegistry
 from typing import List, Optional, Dict, Any
 import logging
 
@@ -22,6 +22,14 @@ AVAILABLE_GRADERS = {
     )
 }
 
+# Built grader instances shared within this process
+_grader_registry = GraderRegistry(AVAILABLE_GRADERS)
+
+
+def get_grader_registry() -> GraderRegistry:
+    """Get the process-wide grader instance registry"""
+    return _grader_registry
+
 
 class GraderService:
     """Service for managing graders"""
@@ -38,10 +46,8 @@ class GraderService:
 
     @staticmethod
     def get_grader_instance(grader_id: str) -> Optional[Any]:
-        """Get an instantiated grader for execution"""
-        if grader_id == "string-match":
-            return StringMatchGrader()
-        return None
+        """Get the shared, configured grader instance for execution"""
+        return _grader_registry.get(grader_id)
 
     @staticmethod
     def validate_grader_ids(grader_ids: List[str]) -> bool:
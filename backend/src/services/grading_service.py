@@ -4,78 +4,186 @@ Per-result isolation: grader failures don't cascade
 """
 from src.models.score import Score
 from src.services.storage import StorageAbstraction
-from src.services.grader_service import GraderService
-from typing import List, Dict, Any
+from src.services.grader_executor import GraderExecutor, get_grader_executor
+from src.services.write_buffer import ScoreSink
+from src.services.analytics_store import AnalyticsStore
+from src.config import GRADER_TIMEOUT, GRADING_BATCH_SIZE
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Default grader timeout
-GRADER_TIMEOUT = 5
-
 
 class GradingService:
     """Service for grading evaluation results"""
 
-    def __init__(self, storage: StorageAbstraction):
+    def __init__(
+        self,
+        storage: StorageAbstraction,
+        executor: Optional[GraderExecutor] = None,
+        analytics: Optional[AnalyticsStore] = None
+    ):
         self.storage = storage
+        self.executor = executor or get_grader_executor()
+        self.analytics = analytics or AnalyticsStore(storage)
+
+    @staticmethod
+    def new_grading_metrics(total_results: int = 0) -> Dict[str, Any]:
+        """Create an empty grading metrics accumulator"""
+        return {
+            "total_results": total_results,
+            "total_scores": 0,
+            "successful_scores": 0,
+            "failed_scores": 0,
+            "errors": []
+        }
 
     async def grade_evaluation_run(self, run_id: str) -> Dict[str, Any]:
         """
         Grade all results in an evaluation run
 
-        Returns metrics about grading success/failure
+        Returns metrics about grading success/failure. Raises ValueError for an
+        archived run: its results live in the archive, so new scores would be
+        orphaned in storage.
         """
+        run = self.storage.get_evaluation_run(run_id)
+        if run and run.get("archived_at") is not None:
+            raise ValueError(f"Evaluation run {run_id} is archived and can't be re-graded")
+
         # Get all results for this run
         results = self.storage.list_evaluation_results(run_id)
-        
-        grading_metrics = {
-            "total_results": len(results),
-            "total_scores": 0,
-            "successful_scores": 0,
-            "failed_scores": 0,
-            "errors": []
-        }
+        grading_metrics = self.new_grading_metrics(len(results))
+        if not run:
+            return grading_metrics
 
-        # For each result, apply each grader
+        # Pair each result with its test case's expected output
+        items = []
         for result in results:
-            # Only grade successful agent responses
-            if result["response_status"] != "success":
-                logger.debug(f"Skipping grading for non-success result {result['id']}")
-                continue
-
-            # Get the evaluation run to find graders
-            run = self.storage.get_evaluation_run(run_id)
-            if not run:
-                continue
-
-            agent_response = result.get("agent_response", "")
-
-            # Get test case for expected output
             test_case_id = result["test_case_id"]
-            test_case = self.storage.test_cases.get(test_case_id) if hasattr(self.storage, 'test_cases') else None
+            test_case = self.storage.get_test_case(test_case_id)
 
             if not test_case:
                 logger.warning(f"Test case {test_case_id} not found for grading")
                 continue
 
-            expected_output = test_case.get("expected_output", "")
+            items.append((result, test_case.get("expected_output", "")))
+
+        # Grade in chunks so each grader sees many results per call
+        for start in range(0, len(items), GRADING_BATCH_SIZE):
+            await self.grade_results(
+                items[start:start + GRADING_BATCH_SIZE],
+                run.get("grader_ids", []),
+                grading_metrics
+            )
+
+        # Scores were written outside any run's live analytics feed and stats
+        self.analytics.invalidate(run_id)
+        self.storage.update_evaluation_run(run_id, {"stats": None})
+        logger.info(f"Grading completed for run {run_id}: {grading_metrics}")
+        return grading_metrics
+
+    async def grade_result(
+        self,
+        result: Dict[str, Any],
+        grader_ids: List[str],
+        expected_output: str,
+        grading_metrics: Dict[str, Any],
+        write_buffer: Optional[ScoreSink] = None
+    ) -> None:
+        """
+        Apply each grader to a single result and store the scores
+
+        Grader failures are recorded in grading_metrics and don't stop other graders.
+        Scores go through write_buffer when one is given.
+        """
+        # Only grade successful agent responses
+        if result["response_status"] != "success":
+            logger.debug(f"Skipping grading for non-success result {result['id']}")
+            return
+
+        agent_response = result.get("agent_response", "")
+
+        # Apply each grader to this result
+        for grader_id in grader_ids:
+            try:
+                score = await self._grade_with_grader(
+                    grader_id,
+                    result["id"],
+                    agent_response,
+                    expected_output
+                )
+                if score:
+                    self._store_scores([score.to_dict()], write_buffer)
+                    grading_metrics["total_scores"] += 1
+                    grading_metrics["successful_scores"] += 1
+
+            except Exception as e:
+                # Per-result isolation: capture error but don't stop
+                error_msg = f"Grader {grader_id} failed on result {result['id']}: {str(e)}"
+                logger.warning(error_msg)
+                grading_metrics["failed_scores"] += 1
+                grading_metrics["errors"].append(error_msg)
+
+    async def grade_results(
+        self,
+        items: List[Tuple[Dict[str, Any], str]],
+        grader_ids: List[str],
+        grading_metrics: Dict[str, Any],
+        write_buffer: Optional[ScoreSink] = None
+    ) -> None:
+        """
+        Apply each grader to a chunk of (result, expected_output) pairs
 
-            # Apply each grader to this result
-            for grader_id in run.get("grader_ids", []):
+        Each grader gets the whole chunk in one grade_batch() call. If the batch
+        call fails or times out, that grader falls back to grading results one
+        at a time so a single bad result doesn't fail the whole chunk. The
+        chunk's scores are stored with one bulk write (or through write_buffer).
+        """
+        # Only grade successful agent responses
+        gradable = []
+        for result, expected_output in items:
+            if result["response_status"] != "success":
+                logger.debug(f"Skipping grading for non-success result {result['id']}")
+                continue
+            gradable.append((result, expected_output))
+        if not gradable:
+            return
+
+        agent_responses = [result.get("agent_response", "") for result, _ in gradable]
+        expected_outputs = [expected_output for _, expected_output in gradable]
+
+        for grader_id in grader_ids:
+            try:
+                grading_results, _ = await self.executor.grade_batch(
+                    grader_id,
+                    agent_responses,
+                    expected_outputs,
+                    timeout=GRADER_TIMEOUT * len(gradable)
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Batch grading with {grader_id} failed on {len(gradable)} results "
+                    f"({type(e).__name__}: {e}); grading one at a time"
+                )
+                for result, expected_output in gradable:
+                    await self.grade_result(
+                        result, [grader_id], expected_output, grading_metrics, write_buffer
+                    )
+                continue
+
+            scores = []
+            for (result, _), grading_result in zip(gradable, grading_results):
                 try:
-                    score = await self._grade_with_grader(
-                        grader_id,
-                        result["id"],
-                        agent_response,
-                        expected_output
+                    score = Score(
+                        result_id=result["id"],
+                        grader_id=grader_id,
+                        passed=grading_result["passed"],
+                        score=grading_result["score"],
+                        details=grading_result.get("details")
                     )
-                    if score:
-                        self.storage.create_score(score.to_dict())
-                        grading_metrics["total_scores"] += 1
-                        grading_metrics["successful_scores"] += 1
+                    scores.append(score.to_dict())
 
                 except Exception as e:
                     # Per-result isolation: capture error but don't stop
@@ -84,8 +192,22 @@ class GradingService:
                     grading_metrics["failed_scores"] += 1
                     grading_metrics["errors"].append(error_msg)
 
-        logger.info(f"Grading completed for run {run_id}: {grading_metrics}")
-        return grading_metrics
+            self._store_scores(scores, write_buffer)
+            grading_metrics["total_scores"] += len(scores)
+            grading_metrics["successful_scores"] += len(scores)
+
+    def _store_scores(
+        self,
+        scores: List[Dict[str, Any]],
+        write_buffer: Optional[ScoreSink]
+    ) -> None:
+        """Write scores now, or hand them to the run's write buffer"""
+        if not scores:
+            return
+        if write_buffer is not None:
+            write_buffer.add_scores(scores)
+        else:
+            self.storage.create_scores_many(scores)
 
     async def _grade_with_grader(
         self,
@@ -97,17 +219,16 @@ class GradingService:
         """
         Apply a single grader to a result with timeout
 
+        The grader runs on the configured executor, which stops it if it
+        exceeds GRADER_TIMEOUT (except on the thread backend).
+
         Returns Score object
         """
         try:
-            # Get grader instance with timeout
-            grader = GraderService.get_grader_instance(grader_id)
-            if not grader:
-                raise ValueError(f"Grader {grader_id} not found")
-
-            # Execute grader with timeout
-            grading_result = await asyncio.wait_for(
-                asyncio.to_thread(grader.grade, agent_response, expected_output),
+            grading_result, _ = await self.executor.grade(
+                grader_id,
+                agent_response,
+                expected_output,
                 timeout=GRADER_TIMEOUT
             )
 
@@ -130,30 +251,5 @@ class GradingService:
             raise
 
     def get_grading_results(self, run_id: str) -> Dict[str, Any]:
-        """Get grading results summary for a run"""
-        all_scores = self.storage.list_all_scores(run_id)
-
-        summary = {
-            "total_scores": len(all_scores),
-            "passed": sum(1 for s in all_scores if s.get("passed")),
-            "failed": sum(1 for s in all_scores if not s.get("passed")),
-            "by_grader": {}
-        }
-
-        # Group by grader
-        for score in all_scores:
-            grader_id = score.get("grader_id")
-            if grader_id not in summary["by_grader"]:
-                summary["by_grader"][grader_id] = {
-                    "total": 0,
-                    "passed": 0,
-                    "failed": 0
-                }
-            
-            summary["by_grader"][grader_id]["total"] += 1
-            if score.get("passed"):
-                summary["by_grader"][grader_id]["passed"] += 1
-            else:
-                summary["by_grader"][grader_id]["failed"] += 1
-
-        return summary
+        """Get grading results summary for a run (overall, by grader and by tag)"""
+        return self.analytics.get_run(run_id).score_summary()
@@ -0,0 +1,114 @@
+"""
+Keyset pagination - sort keys, sorted key indexes and opaque cursors
+
+A page is addressed by the sort key of the last item already seen rather than
+by an offset, so fetching it costs O(page size) from an index and items don't
+shift between pages when records are inserted concurrently. Every sort key
+ends with the record ID, which makes keys unique and the order total.
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import base64
+import bisect
+import json
+
+# Fields test cases and runs can be sorted by ("-field" sorts descending)
+SORT_FIELDS = ("created_at", "id")
+DEFAULT_SORT = "created_at"
+
+SortKey = Tuple[str, str]
+
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """Split "field" / "-field" into (field, descending)"""
+    descending = sort.startswith("-")
+    field = sort[1:] if descending else sort
+    if field not in SORT_FIELDS:
+        raise ValueError(f"Unknown sort field: {field}")
+    return field, descending
+
+
+def sort_key(record: Dict[str, Any], field: str) -> SortKey:
+    """A record's position in the order of field, ties broken by ID"""
+    value = record.get(field)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return ("" if value is None else str(value)), record["id"]
+
+
+def encode_cursor(field: str, descending: bool, key: SortKey) -> str:
+    """Opaque cursor for the page after key"""
+    payload = json.dumps([field, descending, list(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, bool, SortKey]:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        field, descending, key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, record_id = key
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if field not in SORT_FIELDS or not isinstance(descending, bool):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return field, descending, (str(value), str(record_id))
+
+
+class SortedKeyIndex:
+    """Sort keys kept in order, for O(log N) seeks and O(page) page reads"""
+
+    def __init__(self):
+        self.keys: List[SortKey] = []
+
+    def add(self, key: SortKey) -> None:
+        bisect.insort(self.keys, key)
+
+    def add_many(self, keys: List[SortKey]) -> None:
+        """Add several keys with one sort (appended runs merge in linear time)"""
+        self.keys.extend(keys)
+        self.keys.sort()
+
+    def remove(self, key: SortKey) -> None:
+        position = bisect.bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+
+    def page(self, after: Optional[SortKey], limit: int, descending: bool = False) -> List[SortKey]:
+        """Up to limit keys following after (from the start if None) in the given direction"""
+        keys = self.keys
+        if not descending:
+            start = 0 if after is None else bisect.bisect_right(keys, after)
+            return keys[start : start + limit]
+        end = len(keys) if after is None else bisect.bisect_left(keys, after)
+        return keys[max(end - limit, 0) : end][::-1]
+
+
+def fetch_page(
+    list_page: Callable[[str, Optional[SortKey], int, bool], List[Dict[str, Any]]],
+    limit: int,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Read one page with a storage list_*_page method
+
+    Starts from the beginning of sort (default created_at) or continues from
+    cursor. Returns the page and the cursor for the next one (None on the last
+    page). Raises ValueError for a malformed cursor or one issued for another sort.
+    """
+    if cursor is not None:
+        field, descending, after = decode_cursor(cursor)
+        if sort is not None and parse_sort(sort) != (field, descending):
+            raise ValueError("Cursor was issued for a different sort")
+    else:
+        field, descending = parse_sort(sort or DEFAULT_SORT)
+        after = None
+
+    # One extra record tells whether there is a next page
+    records = list_page(field, after, limit + 1, descending)
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(field, descending, sort_key(records[-1], field))
+    return records, next_cursor
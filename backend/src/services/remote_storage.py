@@ -0,0 +1,236 @@
+"""
+Remote storage - StorageAbstraction served by a storage daemon
+
+Forwards every call over the daemon's Unix socket (see storage_daemon), so
+all API worker processes share one set of records. Each thread has its own
+connection, and a call returns once the daemon has applied it.
+"""
+from src.services.storage import StorageAbstraction
+from src.services.storage_daemon import recv_frame, send_frame
+from src.services.pagination import DEFAULT_SORT, SortKey
+from typing import BinaryIO, List, Optional, Dict, Any, Tuple
+import logging
+import socket
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteStorage(StorageAbstraction):
+    """Client for a storage daemon listening on socket_path"""
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self._local = threading.local()
+        self._connections: List[Tuple[socket.socket, BinaryIO]] = []
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        # Fail fast if nothing is listening
+        self._connection()
+        logger.info(f"RemoteStorage connected to {socket_path}")
+
+    # ----- connections -----
+
+    def _connection(self) -> Tuple[socket.socket, BinaryIO]:
+        """This thread's socket and its buffered reader, connecting on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._closed:
+                raise RuntimeError("RemoteStorage is closed")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+            except OSError as e:
+                sock.close()
+                raise ConnectionError(
+                    f"No storage daemon listening on {self.socket_path}: {e}"
+                ) from e
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = self._local.conn
+        self._local.conn = None
+        self._close_connection(conn)
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+
+    @staticmethod
+    def _close_connection(conn: Tuple[socket.socket, BinaryIO]) -> None:
+        # The socket only closes once its reader is closed too
+        sock, rfile = conn
+        rfile.close()
+        sock.close()
+
+    def _call(self, method: str, *args: Any) -> Any:
+        """Run a storage method in the daemon and return its result"""
+        sock, rfile = self._connection()
+        try:
+            send_frame(sock, (method, args))
+            reply = recv_frame(rfile)
+            if reply is None:
+                raise EOFError("Connection closed by the storage daemon")
+        except (OSError, EOFError) as e:
+            # The next call from this thread reconnects
+            self._drop_connection()
+            raise ConnectionError(f"Storage daemon call {method} failed: {e}") from e
+        ok, value = reply
+        if not ok:
+            raise value
+        return value
+
+    # ----- test cases -----
+
+    def create_test_case(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a test case"""
+        return self._call("create_test_case", test_case)
+
+    def get_test_case(self, test_case_id: str) -> Optional[Dict[str, Any]]:
+        """Get a test case by ID"""
+        return self._call("get_test_case", test_case_id)
+
+    def list_test_cases(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """List test cases with pagination"""
+        return self._call("list_test_cases", skip, limit)
+
+    def list_test_cases_page(
+        self,
+        sort_field: str = DEFAULT_SORT,
+        after: Optional[SortKey] = None,
+        limit: int = 10,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """List a page of test cases ordered by sort_field, then ID"""
+        return self._call("list_test_cases_page", sort_field, after, limit, descending)
+
+    def get_test_cases_many(self, test_case_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get test cases by ID, keyed by ID (missing IDs are left out)"""
+        return self._call("get_test_cases_many", test_case_ids)
+
+    def create_test_cases_many(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several test cases in one round trip"""
+        return self._call("create_test_cases_many", test_cases)
+
+    def update_test_case(
+        self, test_case_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update a test case"""
+        return self._call("update_test_case", test_case_id, updates)
+
+    def delete_test_case(self, test_case_id: str) -> bool:
+        """Delete a test case"""
+        return self._call("delete_test_case", test_case_id)
+
+    # ----- evaluation runs -----
+
+    def create_evaluation_run(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an evaluation run"""
+        return self._call("create_evaluation_run", run)
+
+    def get_evaluation_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Get an evaluation run by ID"""
+        return self._call("get_evaluation_run", run_id)
+
+    def list_evaluation_runs(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """List evaluation runs with pagination"""
+        return self._call("list_evaluation_runs", skip, limit)
+
+    def list_evaluation_runs_page(
+        self,
+        sort_field: str = DEFAULT_SORT,
+        after: Optional[SortKey] = None,
+        limit: int = 10,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """List a page of evaluation runs ordered by sort_field, then ID"""
+        return self._call("list_evaluation_runs_page", sort_field, after, limit, descending)
+
+    def update_evaluation_run(
+        self, run_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update an evaluation run"""
+        return self._call("update_evaluation_run", run_id, updates)
+
+    # ----- evaluation results -----
+
+    def create_evaluation_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an evaluation result"""
+        return self._call("create_evaluation_result", result)
+
+    def create_evaluation_results_many(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several evaluation results in one round trip"""
+        return self._call("create_evaluation_results_many", results)
+
+    def get_evaluation_result(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """Get an evaluation result by ID"""
+        return self._call("get_evaluation_result", result_id)
+
+    def list_evaluation_results_slice(
+        self, run_id: str, skip: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Up to limit of a run's results, starting at position skip (creation order)"""
+        return self._call("list_evaluation_results_slice", run_id, skip, limit)
+
+    def list_evaluation_results(self, run_id: str) -> List[Dict[str, Any]]:
+        """List all results for a run"""
+        return self._call("list_evaluation_results", run_id)
+
+    def update_evaluation_result(
+        self, result_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update an evaluation result"""
+        return self._call("update_evaluation_result", result_id, updates)
+
+    def delete_evaluation_results(self, run_id: str) -> int:
+        """Delete all results (and their scores) for a run, returning how many were deleted"""
+        return self._call("delete_evaluation_results", run_id)
+
+    def list_test_case_results(self, test_case_id: str) -> List[Dict[str, Any]]:
+        """List all results for a test case across runs"""
+        return self._call("list_test_case_results", test_case_id)
+
+    # ----- scores -----
+
+    def create_score(self, score: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a score"""
+        return self._call("create_score", score)
+
+    def create_scores_many(self, scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several scores in one round trip"""
+        return self._call("create_scores_many", scores)
+
+    def list_scores(self, result_id: str) -> List[Dict[str, Any]]:
+        """List all scores for a result"""
+        return self._call("list_scores", result_id)
+
+    def list_all_scores(self, run_id: str) -> List[Dict[str, Any]]:
+        """List all scores for a run, in creation order"""
+        return self._call("list_all_scores", run_id)
+
+    def list_scores_many(
+        self, run_id: str, result_ids: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Scores of some of a run's results, keyed by result ID, in one round trip"""
+        return self._call("list_scores_many", run_id, result_ids)
+
+    # ----- lifecycle -----
+
+    def flush(self) -> None:
+        """Wait for the daemon's backend to store accepted writes"""
+        self._call("flush")
+
+    def clear(self) -> None:
+        """Delete every record in the daemon (for testing)"""
+        self._call("clear")
+
+    def close(self) -> None:
+        """Close this client's connections (the daemon keeps running)"""
+        self._closed = True
+        with self._connections_lock:
+            for conn in self._connections:
+                self._close_connection(conn)
+            self._connections = []
+        logger.info("RemoteStorage closed")
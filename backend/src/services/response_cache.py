@@ -0,0 +1,241 @@
+"""
+Agent response cache - reuse answers from frozen agent builds
+
+Entries are keyed by (endpoint URL, agent version tag, input hash) and kept in
+an in-memory LRU tier and an optional on-disk tier, both with a TTL. Concurrent
+requests for the same key share a single in-flight agent call.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from src.config import (
+    AGENT_CACHE_MAX_ENTRIES,
+    AGENT_CACHE_TTL,
+    AGENT_CACHE_DIR,
+    AGENT_CACHE_DISK_MAX_MB,
+)
+
+logger = logging.getLogger(__name__)
+
+# Default cache settings
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL_SECONDS = 86400
+DEFAULT_DISK_MAX_BYTES = 512 * 1024 * 1024
+
+
+class AgentResponseCache:
+    """Two-tier (memory LRU + disk) cache of successful agent outcomes"""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = DEFAULT_DISK_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "merged": 0, "misses": 0}
+
+        # Disk tier: key -> file size, oldest first (by mtime) for size-based eviction
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(endpoint_url: str, agent_version: str, input_text: str) -> str:
+        """Cache key for an agent call"""
+        input_hash = hashlib.sha256(input_text.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{endpoint_url}\0{agent_version}\0{input_hash}".encode("utf-8")
+        ).hexdigest()
+
+    async def get_or_call(
+        self, key: str, call: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return the cached outcome for key, or make the call and cache a success
+
+        Successful outcomes served from the cache (or shared with a concurrent
+        identical call) are copies marked "cached": True, with the latency of
+        the lookup itself and no attempts. A failure shared with a concurrent
+        call is returned as it was, unmarked.
+        """
+        started = time.perf_counter()
+        cached = self._memory_get(key)
+        if cached is not None:
+            self.stats["memory_hits"] += 1
+            return _served_from_cache(cached, started)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["merged"] += 1
+            try:
+                outcome = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leading call was cancelled; make our own
+                return await self.get_or_call(key, call)
+            if outcome.get("status") != "success":
+                return dict(outcome)
+            return _served_from_cache(outcome, started)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self.disk_dir is not None:
+                cached = await asyncio.to_thread(self._disk_get, key)
+                if cached is not None:
+                    self.stats["disk_hits"] += 1
+                    self._memory_put(key, cached)
+                    future.set_result(cached)
+                    return _served_from_cache(cached, started)
+
+            self.stats["misses"] += 1
+            outcome = await call()
+            if outcome.get("status") == "success":
+                self._memory_put(key, outcome)
+                if self.disk_dir is not None:
+                    await asyncio.to_thread(self._disk_put, key, outcome)
+            future.set_result(outcome)
+            return outcome
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark retrieved so an unawaited failure isn't logged
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    # ----- memory tier -----
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, outcome = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return outcome
+
+    def _memory_put(self, key: str, outcome: Dict[str, Any]) -> None:
+        self._memory[key] = (time.time() + self.ttl_seconds, outcome)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # ----- disk tier -----
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _load_disk_index(self) -> None:
+        """Index existing cache files, oldest first"""
+        assert self.disk_dir is not None
+        entries = []
+        for path in self.disk_dir.glob("*/*.json"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+        logger.info(f"Agent response cache: {len(entries)} entries on disk in {self.disk_dir}")
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            self._disk_remove(key)
+            return None
+        return entry.get("outcome")
+
+    def _disk_put(self, key: str, outcome: Dict[str, Any]) -> None:
+        path = self._disk_path(key)
+        data = json.dumps({"expires_at": time.time() + self.ttl_seconds, "outcome": outcome})
+        path.parent.mkdir(exist_ok=True)
+        # Write then rename so readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._disk_lock:
+            self._disk_bytes += len(data) - self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(data)
+            evict = []
+            while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+                old_key, size = self._disk_index.popitem(last=False)
+                self._disk_bytes -= size
+                evict.append(old_key)
+        for old_key in evict:
+            self._disk_path(old_key).unlink(missing_ok=True)
+
+    def _disk_remove(self, key: str) -> None:
+        with self._disk_lock:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+        self._disk_path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Drop every cached entry from both tiers"""
+        self._memory.clear()
+        if self.disk_dir is not None:
+            with self._disk_lock:
+                keys = list(self._disk_index)
+                self._disk_index.clear()
+                self._disk_bytes = 0
+            for key in keys:
+                self._disk_path(key).unlink(missing_ok=True)
+
+
+def _served_from_cache(outcome: Dict[str, Any], started: float) -> Dict[str, Any]:
+    """A copy of a stored outcome as a cache hit: its own latency, no agent attempts"""
+    return {
+        **outcome,
+        "cached": True,
+        "latency_ms": int((time.perf_counter() - started) * 1000),
+        "attempts": 0,
+        "attempt_latencies_ms": [],
+    }
+
+
+# Process-wide cache instance
+_response_cache: Optional[AgentResponseCache] = None
+
+
+def get_response_cache() -> AgentResponseCache:
+    """Get the process-wide agent response cache, creating it from config"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = AgentResponseCache(
+            max_entries=AGENT_CACHE_MAX_ENTRIES,
+            ttl_seconds=AGENT_CACHE_TTL,
+            disk_dir=AGENT_CACHE_DIR or None,
+            disk_max_bytes=AGENT_CACHE_DISK_MAX_MB * 1024 * 1024,
+        )
+    return _response_cache
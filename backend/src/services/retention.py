@@ -0,0 +1,100 @@
+"""
+Retention - archive old runs so in-memory storage stops growing
+
+A background thread periodically picks finished runs outside the retention
+policy and moves their results and scores to the run archive (see
+InMemoryStorage.archive_run). Runs are archived one at a time, and requests
+are only held up for as long as a single run's records take to copy.
+"""
+from src.services.storage import InMemoryStorage
+from src.services.analytics_store import FINISHED_STATUSES
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+import logging
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc(value: Any) -> Optional[datetime]:
+    """A stored timestamp (datetime or ISO string) as a naive UTC datetime"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class RetentionPolicy:
+    """Keep the newest max_runs runs and runs finished within max_age_days (0 = no limit)"""
+
+    def __init__(self, max_runs: int = 0, max_age_days: float = 0):
+        self.max_runs = max_runs
+        self.max_age_days = max_age_days
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_runs > 0 or self.max_age_days > 0
+
+    def select(self, runs: List[Dict[str, Any]], now: datetime) -> List[str]:
+        """IDs of the runs (given newest first) to archive"""
+        cutoff = now - timedelta(days=self.max_age_days) if self.max_age_days > 0 else None
+        selected = []
+        for position, run in enumerate(runs):
+            if run.get("archived_at") is not None or run.get("status") not in FINISHED_STATUSES:
+                continue
+            over_count = self.max_runs > 0 and position >= self.max_runs
+            finished_at = _as_utc(run.get("completed_at")) or _as_utc(run.get("created_at"))
+            too_old = cutoff is not None and finished_at is not None and finished_at < cutoff
+            if over_count or too_old:
+                selected.append(run["id"])
+        return selected
+
+
+class RetentionWorker:
+    """Applies a retention policy to a storage every interval seconds"""
+
+    def __init__(self, storage: InMemoryStorage, policy: RetentionPolicy, interval: float):
+        self.storage = storage
+        self.policy = policy
+        self.interval = interval
+        self.archived_runs = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Archive every run outside the policy now, returning how many were archived"""
+        runs = self.storage.list_evaluation_runs_page("created_at", None, sys.maxsize, True)
+        archived = 0
+        for run_id in self.policy.select(runs, datetime.utcnow()):
+            if self._stop.is_set():
+                break
+            try:
+                self.storage.archive_run(run_id)
+                archived += 1
+            except Exception as e:
+                logger.error(f"Archiving run {run_id} failed: {e}")
+        self.archived_runs += archived
+        if archived:
+            logger.info(f"Retention archived {archived} runs")
+        return archived
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def start(self) -> "RetentionWorker":
+        self._thread = threading.Thread(target=self._loop, name="retention", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,119 @@
+"""
+Run archive - compressed files holding the results and scores of old runs
+
+Retention moves a finished run's results and scores out of memory into one
+gzip-compressed pickle per run. Reads of an archived run load its file, and
+the most recently loaded runs are kept in an LRU cache so a run being browsed
+is only decompressed once.
+
+Files are pickles, so the archive directory must only be writable by the
+service itself.
+"""
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from pathlib import Path
+import gzip
+import logging
+import os
+import pickle
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Archived runs kept decompressed in memory
+DEFAULT_CACHE_RUNS = 8
+ARCHIVE_SUFFIX = ".pkl.gz"
+
+# Run IDs are used as file names
+RUN_ID_PATTERN = re.compile(r"[\w.-]+")
+
+
+class ArchivedRun:
+    """An archived run's results and scores, as loaded from its file"""
+
+    __slots__ = ("results", "scores", "_scores_by_result")
+
+    def __init__(self, results: List[Dict[str, Any]], scores: List[Dict[str, Any]]):
+        self.results = results
+        self.scores = scores
+        self._scores_by_result: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+    def scores_for(self, result_id: str) -> List[Dict[str, Any]]:
+        """A result's scores, in creation order"""
+        if self._scores_by_result is None:
+            by_result: Dict[str, List[Dict[str, Any]]] = {}
+            for score in self.scores:
+                by_result.setdefault(score["result_id"], []).append(score)
+            self._scores_by_result = by_result
+        return self._scores_by_result.get(result_id, [])
+
+
+class RunArchive:
+    """One compressed file per archived run, with an LRU cache of loaded runs"""
+
+    def __init__(
+        self, directory: str, cache_runs: int = DEFAULT_CACHE_RUNS, compresslevel: int = 6
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.cache_runs = cache_runs
+        self.compresslevel = compresslevel
+        self._loaded: "OrderedDict[str, ArchivedRun]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, run_id: str) -> Path:
+        if not RUN_ID_PATTERN.fullmatch(run_id):
+            raise ValueError(f"Run ID can't be archived: {run_id}")
+        return self.directory / f"run-{run_id}{ARCHIVE_SUFFIX}"
+
+    def write(
+        self, run_id: str, results: List[Dict[str, Any]], scores: List[Dict[str, Any]]
+    ) -> int:
+        """Write a run's results and scores, returning the compressed size"""
+        path = self.path(run_id)
+        payload = pickle.dumps((results, scores), protocol=pickle.HIGHEST_PROTOCOL)
+        # Write to a temporary file first so a crash never leaves a torn archive
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(payload, compresslevel=self.compresslevel))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        size = path.stat().st_size
+        logger.debug(f"Archived run {run_id}: {len(payload)} bytes -> {size} bytes")
+        return size
+
+    def load(self, run_id: str, cache: bool = True) -> ArchivedRun:
+        """
+        A run's results and scores (both empty if it was never archived)
+
+        With cache=False a run that isn't cached is read without being added,
+        for scans over many runs.
+        """
+        with self._lock:
+            records = self._loaded.get(run_id)
+            if records is not None:
+                self._loaded.move_to_end(run_id)
+                return records
+        try:
+            with open(self.path(run_id), "rb") as f:
+                records = ArchivedRun(*pickle.loads(gzip.decompress(f.read())))
+        except FileNotFoundError:
+            logger.warning(f"Archive of run {run_id} is missing")
+            return ArchivedRun([], [])
+        if not cache:
+            return records
+        with self._lock:
+            self._loaded[run_id] = records
+            while len(self._loaded) > self.cache_runs:
+                self._loaded.popitem(last=False)
+        return records
+
+    def delete(self, run_id: str) -> None:
+        with self._lock:
+            self._loaded.pop(run_id, None)
+        try:
+            self.path(run_id).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,141 @@
+"""
+Run stats - running aggregates of an evaluation run's results and scores
+
+Counts, latency sum/min/max and per-grader pass/fail/score sums, updated as
+each batch of results and scores is stored, so reading them costs the same
+however large the run is. They are kept on the run record as "stats" and only
+rebuilt from the stored records for runs that predate them or whose scores
+were rewritten by re-grading.
+
+A lock makes each update and each to_dict() atomic: the event loop updates a
+running run's stats while API requests read them from threadpool threads.
+"""
+from typing import Any, Dict, Iterable, Optional
+import threading
+
+
+class RunStats:
+    """Running aggregates of one run, updated in O(1) per result and score"""
+
+    __slots__ = (
+        "results",
+        "by_status",
+        "latency_sum",
+        "latency_count",
+        "latency_min",
+        "latency_max",
+        "scores",
+        "passed",
+        "by_grader",
+        "_lock",
+    )
+
+    def __init__(self):
+        self.results = 0
+        self.by_status: Dict[str, int] = {}
+        self.latency_sum = 0
+        self.latency_count = 0
+        self.latency_min: Optional[int] = None
+        self.latency_max: Optional[int] = None
+        self.scores = 0
+        self.passed = 0
+        # grader ID -> total, passed, score_sum, score_count
+        self.by_grader: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def compute(
+        cls, results: Iterable[Dict[str, Any]], scores: Iterable[Dict[str, Any]]
+    ) -> "RunStats":
+        """Aggregate a run's stored results and scores from scratch"""
+        stats = cls()
+        stats.add_results(results)
+        stats.add_scores(scores)
+        return stats
+
+    def add_results(self, results: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            by_status = self.by_status
+            for result in results:
+                self.results += 1
+                status = result["response_status"]
+                by_status[status] = by_status.get(status, 0) + 1
+                latency = result.get("response_latency_ms")
+                if latency is None:
+                    continue
+                self.latency_sum += latency
+                self.latency_count += 1
+                if self.latency_min is None or latency < self.latency_min:
+                    self.latency_min = latency
+                if self.latency_max is None or latency > self.latency_max:
+                    self.latency_max = latency
+
+    def add_scores(self, scores: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            by_grader = self.by_grader
+            for score in scores:
+                self.scores += 1
+                grader = by_grader.get(score["grader_id"])
+                if grader is None:
+                    grader = by_grader[score["grader_id"]] = {
+                        "total": 0,
+                        "passed": 0,
+                        "score_sum": 0.0,
+                        "score_count": 0,
+                    }
+                grader["total"] += 1
+                if score.get("passed"):
+                    grader["passed"] += 1
+                    self.passed += 1
+                value = score.get("score")
+                if value is not None:
+                    grader["score_sum"] += value
+                    grader["score_count"] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The aggregates, with averages and failed counts derived from them"""
+        with self._lock:
+            return {
+                "results": self.results,
+                "by_status": dict(self.by_status),
+                "latency_sum_ms": self.latency_sum,
+                "latency_count": self.latency_count,
+                "latency_min_ms": self.latency_min,
+                "latency_max_ms": self.latency_max,
+                "avg_latency_ms": (
+                    round(self.latency_sum / self.latency_count, 2) if self.latency_count else None
+                ),
+                "scores": self.scores,
+                "passed": self.passed,
+                "failed": self.scores - self.passed,
+                "by_grader": {
+                    grader_id: {
+                        **counts,
+                        "failed": counts["total"] - counts["passed"],
+                        "mean_score": (
+                            round(counts["score_sum"] / counts["score_count"], 4)
+                            if counts["score_count"]
+                            else None
+                        ),
+                    }
+                    for grader_id, counts in self.by_grader.items()
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunStats":
+        """Resume aggregating from a run record's stats"""
+        stats = cls()
+        stats.results = data["results"]
+        stats.by_status = dict(data["by_status"])
+        stats.latency_sum = data["latency_sum_ms"]
+        stats.latency_count = data["latency_count"]
+        stats.latency_min = data["latency_min_ms"]
+        stats.latency_max = data["latency_max_ms"]
+        stats.scores = data["scores"]
+        stats.passed = data["passed"]
+        stats.by_grader = {
+            grader_id: {key: counts[key] for key in ("total", "passed", "score_sum", "score_count")}
+            for grader_id, counts in data["by_grader"].items()
+        }
+        return stats
@@ -0,0 +1,566 @@
+"""
+SQLite storage backend - persistent StorageAbstraction implementation
+
+Records are stored as JSON documents with the keys used for lookups (run_id,
+result_id, test_case_id) and for keyset pagination (created_at) copied into
+indexed columns. The database runs in
+WAL mode so readers never block the writer.
+
+Writes are write-behind: create/update/delete calls queue their statements
+and return immediately, and a single writer thread commits everything queued
+so far in one transaction. A read waits only while writes to the tables it
+reads are still queued, so a caller always sees its own writes without every
+read waiting on the queue. Writes that fail are reported by the next flush(),
+which raises. sqlite3 caches each connection's compiled
+statements, and the SQL below is constant, so every statement is prepared once
+per connection.
+"""
+from src.services.storage import StorageAbstraction
+from src.services.pagination import DEFAULT_SORT, SortKey, sort_key
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+import json
+import logging
+import queue
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Most queued write operations committed in one transaction
+DEFAULT_WRITE_BATCH = 500
+# Most IDs bound into one IN (...) query
+MAX_QUERY_IDS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_cases (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS evaluation_runs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS evaluation_results (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    run_id TEXT NOT NULL,
+    test_case_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_run ON evaluation_results (run_id, seq);
+CREATE INDEX IF NOT EXISTS idx_results_test_case ON evaluation_results (test_case_id, seq);
+CREATE TABLE IF NOT EXISTS scores (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    result_id TEXT NOT NULL,
+    run_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_result ON scores (result_id, seq);
+CREATE INDEX IF NOT EXISTS idx_scores_run ON scores (run_id, seq);
+"""
+
+# Tables listed with keyset pagination; their created_at column and index are
+# added to databases created before the column existed
+SORTED_TABLES = ("test_cases", "evaluation_runs")
+SORT_INDEX = "CREATE INDEX IF NOT EXISTS idx_{table}_created ON {table} (created_at, id)"
+
+UPSERT_SORTED_DOCUMENT = (
+    "INSERT INTO {table} (id, created_at, data) VALUES (?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET created_at = excluded.created_at, data = excluded.data"
+)
+# Keyset page queries: (sort column, descending) -> ORDER BY and "after" condition
+PAGE_ORDER = {
+    ("created_at", False): ("created_at, id", "(created_at, id) > (?, ?)"),
+    ("created_at", True): ("created_at DESC, id DESC", "(created_at, id) < (?, ?)"),
+    ("id", False): ("id", "id > ?"),
+    ("id", True): ("id DESC", "id < ?"),
+}
+UPSERT_RESULT = (
+    "INSERT INTO evaluation_results (id, run_id, test_case_id, data) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET run_id = excluded.run_id, "
+    "test_case_id = excluded.test_case_id, data = excluded.data"
+)
+UPSERT_SCORE = (
+    "INSERT INTO scores (id, result_id, run_id, data) "
+    "VALUES (?, ?, (SELECT run_id FROM evaluation_results WHERE id = ?), ?) "
+    "ON CONFLICT(id) DO UPDATE SET result_id = excluded.result_id, "
+    "run_id = excluded.run_id, data = excluded.data"
+)
+
+TABLES = ("test_cases", "evaluation_runs", "evaluation_results", "scores")
+
+# A write operation: statements that are applied together
+WriteOp = List[Tuple[str, tuple]]
+
+
+@lru_cache(maxsize=None)
+def _tables_in(sql: str) -> Tuple[str, ...]:
+    """Tables a statement names (the SQL is constant, so this is cached)"""
+    return tuple(table for table in TABLES if table in sql)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot store value of type {type(value).__name__}")
+
+
+def _encode(record: Dict[str, Any]) -> str:
+    return json.dumps(record, default=_json_default)
+
+
+class SQLiteStorage(StorageAbstraction):
+    """SQLite storage implementation with a batching writer thread"""
+
+    def __init__(self, path: str, write_batch: int = DEFAULT_WRITE_BATCH):
+        self.path = path
+        self.write_batch = write_batch
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._connection().executescript(SCHEMA)
+        self._migrate()
+
+        # Write-behind queue: counters let readers wait for their own writes,
+        # and the last queued write touching each table tells a read whether
+        # it has to wait at all
+        self._writes: "queue.Queue[Optional[WriteOp]]" = queue.Queue()
+        self._write_cond = threading.Condition()
+        self._last_write: Dict[str, int] = {}
+        # Failed writes not yet reported by flush()
+        self._write_errors: List[sqlite3.Error] = []
+        # Updates read, modify and re-write a document; serialize them so
+        # concurrent updates to one record can't lose each other's changes
+        self._update_lock = threading.Lock()
+        self._enqueued = 0
+        self._committed = 0
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, name="sqlite-writer", daemon=True)
+        self._writer.start()
+        logger.info(f"SQLiteStorage initialized at {path}")
+
+    # ----- connections and the writer thread -----
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections are per thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Each connection is only used by its own thread; close() runs elsewhere
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _migrate(self) -> None:
+        """Add the created_at sort column to tables created without it"""
+        conn = self._connection()
+        for table in SORTED_TABLES:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if "created_at" not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN created_at TEXT NOT NULL DEFAULT ''")
+                conn.execute(
+                    f"UPDATE {table} SET created_at = "
+                    f"COALESCE(json_extract(data, '$.created_at'), '')"
+                )
+                logger.info(f"Added created_at column to {table}")
+            conn.execute(SORT_INDEX.format(table=table))
+
+    def _write(self, op: WriteOp) -> None:
+        """Queue statements for the writer thread"""
+        if self._closed:
+            raise RuntimeError("SQLiteStorage is closed")
+        with self._write_cond:
+            self._enqueued += 1
+            for sql, _ in op:
+                for table in _tables_in(sql):
+                    self._last_write[table] = self._enqueued
+            self._writes.put(op)
+
+    def _writer_loop(self) -> None:
+        conn = self._connection()
+        while True:
+            op = self._writes.get()
+            if op is None:
+                return
+            batch = [op]
+            stop = False
+            while len(batch) < self.write_batch:
+                try:
+                    op = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    stop = True
+                    break
+                batch.append(op)
+
+            errors = []
+            try:
+                self._commit(conn, batch)
+            except sqlite3.Error as e:
+                # Apply the batch one operation at a time so only the bad one is lost
+                logger.warning(f"SQLite batch of {len(batch)} writes failed ({e}); retrying singly")
+                for single in batch:
+                    try:
+                        self._commit(conn, [single])
+                    except sqlite3.Error as single_error:
+                        logger.error(f"SQLite write failed: {single_error}")
+                        errors.append(single_error)
+
+            with self._write_cond:
+                self._committed += len(batch)
+                self._write_errors.extend(errors)
+                self._write_cond.notify_all()
+            if stop:
+                return
+
+    @staticmethod
+    def _commit(conn: sqlite3.Connection, batch: List[WriteOp]) -> None:
+        """Apply write operations in a single transaction"""
+        conn.execute("BEGIN")
+        try:
+            for op in batch:
+                for sql, params in op:
+                    conn.execute(sql, params)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def flush(self) -> None:
+        """
+        Block until every queued write has been committed
+
+        Raises RuntimeError if any write queued since the last flush() failed
+        """
+        with self._write_cond:
+            target = self._enqueued
+            self._write_cond.wait_for(lambda: self._committed >= target)
+            errors, self._write_errors = self._write_errors, []
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} SQLite write(s) failed, first: {errors[0]}"
+            ) from errors[0]
+
+    def _wait_for_writes(self, sql: str) -> None:
+        """Wait for queued writes to the tables a read uses (if there are any)"""
+        target = max((self._last_write.get(table, 0) for table in _tables_in(sql)), default=0)
+        if self._committed >= target:
+            return
+        with self._write_cond:
+            self._write_cond.wait_for(lambda: self._committed >= target)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        self._wait_for_writes(sql)
+        return self._connection().execute(sql, params).fetchall()
+
+    def _documents(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in self._query(sql, params)]
+
+    def _document(self, sql: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
+        rows = self._query(sql, params)
+        return json.loads(rows[0][0]) if rows else None
+
+    @staticmethod
+    def _sorted_statement(table: str, record: Dict[str, Any]) -> Tuple[str, tuple]:
+        return (
+            UPSERT_SORTED_DOCUMENT.format(table=table),
+            (record["id"], sort_key(record, "created_at")[0], _encode(record)),
+        )
+
+    def _page(
+        self, table: str, sort_field: str, after: Optional[SortKey], limit: int, descending: bool
+    ) -> List[Dict[str, Any]]:
+        """A keyset page read from the (created_at, id) or id index"""
+        order, condition = PAGE_ORDER[(sort_field, descending)]
+        if after is None:
+            return self._documents(f"SELECT data FROM {table} ORDER BY {order} LIMIT ?", (limit,))
+        params = after if sort_field == "created_at" else (after[1],)
+        return self._documents(
+            f"SELECT data FROM {table} WHERE {condition} ORDER BY {order} LIMIT ?", (*params, limit)
+        )
+
+    # ----- test cases -----
+
+    def create_test_case(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a test case"""
+        self._write([self._sorted_statement("test_cases", test_case)])
+        logger.debug(f"Created test case {test_case['id']}")
+        return test_case
+
+    def create_test_cases_many(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several test cases in one transaction"""
+        self._write([self._sorted_statement("test_cases", test_case) for test_case in test_cases])
+        logger.debug(f"Created {len(test_cases)} test cases")
+        return test_cases
+
+    def get_test_case(self, test_case_id: str) -> Optional[Dict[str, Any]]:
+        """Get a test case by ID"""
+        return self._document("SELECT data FROM test_cases WHERE id = ?", (test_case_id,))
+
+    def list_test_cases(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """List test cases with pagination"""
+        return self._documents(
+            "SELECT data FROM test_cases ORDER BY seq LIMIT ? OFFSET ?", (limit, skip)
+        )
+
+    def list_test_cases_page(
+        self,
+        sort_field: str = DEFAULT_SORT,
+        after: Optional[SortKey] = None,
+        limit: int = 10,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """List a page of test cases ordered by sort_field, then ID"""
+        return self._page("test_cases", sort_field, after, limit, descending)
+
+    def get_test_cases_many(self, test_case_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get test cases by ID, keyed by ID (missing IDs are left out)"""
+        unique_ids = list(dict.fromkeys(test_case_ids))
+        found = {}
+        for start in range(0, len(unique_ids), MAX_QUERY_IDS):
+            chunk = unique_ids[start : start + MAX_QUERY_IDS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._query(
+                f"SELECT id, data FROM test_cases WHERE id IN ({placeholders})", tuple(chunk)
+            )
+            for test_case_id, data in rows:
+                found[test_case_id] = json.loads(data)
+        return found
+
+    def update_test_case(
+        self, test_case_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update a test case"""
+        with self._update_lock:
+            test_case = self.get_test_case(test_case_id)
+            if test_case is None:
+                return None
+            test_case.update(updates)
+            self.create_test_case(test_case)
+        logger.debug(f"Updated test case {test_case_id}")
+        return test_case
+
+    def delete_test_case(self, test_case_id: str) -> bool:
+        """Delete a test case"""
+        with self._update_lock:
+            if not self._query("SELECT 1 FROM test_cases WHERE id = ?", (test_case_id,)):
+                return False
+            self._write([("DELETE FROM test_cases WHERE id = ?", (test_case_id,))])
+        logger.debug(f"Deleted test case {test_case_id}")
+        return True
+
+    # ----- evaluation runs -----
+
+    def create_evaluation_run(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an evaluation run"""
+        self._write([self._sorted_statement("evaluation_runs", run)])
+        logger.debug(f"Created evaluation run {run['id']}")
+        return run
+
+    def get_evaluation_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Get an evaluation run by ID"""
+        return self._document("SELECT data FROM evaluation_runs WHERE id = ?", (run_id,))
+
+    def list_evaluation_runs(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """List evaluation runs with pagination"""
+        return self._documents(
+            "SELECT data FROM evaluation_runs ORDER BY seq LIMIT ? OFFSET ?", (limit, skip)
+        )
+
+    def list_evaluation_runs_page(
+        self,
+        sort_field: str = DEFAULT_SORT,
+        after: Optional[SortKey] = None,
+        limit: int = 10,
+        descending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """List a page of evaluation runs ordered by sort_field, then ID"""
+        return self._page("evaluation_runs", sort_field, after, limit, descending)
+
+    def update_evaluation_run(
+        self, run_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update an evaluation run, bumping its version"""
+        with self._update_lock:
+            run = self.get_evaluation_run(run_id)
+            if run is None:
+                return None
+            run.update(updates)
+            run["version"] = run.get("version", 0) + 1
+            self.create_evaluation_run(run)
+        logger.debug(f"Updated evaluation run {run_id}")
+        return run
+
+    # ----- evaluation results -----
+
+    @staticmethod
+    def _result_statement(result: Dict[str, Any]) -> Tuple[str, tuple]:
+        return (
+            UPSERT_RESULT,
+            (result["id"], result["run_id"], result.get("test_case_id"), _encode(result)),
+        )
+
+    def create_evaluation_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Create an evaluation result"""
+        self._write([self._result_statement(result)])
+        logger.debug(f"Created evaluation result {result['id']}")
+        return result
+
+    def create_evaluation_results_many(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several evaluation results in one transaction"""
+        self._write([self._result_statement(result) for result in results])
+        logger.debug(f"Created {len(results)} evaluation results")
+        return results
+
+    def get_evaluation_result(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """Get an evaluation result by ID"""
+        return self._document("SELECT data FROM evaluation_results WHERE id = ?", (result_id,))
+
+    def list_evaluation_results(self, run_id: str) -> List[Dict[str, Any]]:
+        """List all results for a run"""
+        return self._documents(
+            "SELECT data FROM evaluation_results WHERE run_id = ? ORDER BY seq", (run_id,)
+        )
+
+    def list_evaluation_results_slice(
+        self, run_id: str, skip: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Up to limit of a run's results, starting at position skip (creation order)"""
+        return self._documents(
+            "SELECT data FROM evaluation_results WHERE run_id = ? ORDER BY seq LIMIT ? OFFSET ?",
+            (run_id, limit, skip),
+        )
+
+    def update_evaluation_result(
+        self, result_id: str, updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Update an evaluation result"""
+        with self._update_lock:
+            result = self.get_evaluation_result(result_id)
+            if result is None:
+                return None
+            result.update(updates)
+            self._write(
+                [
+                    self._result_statement(result),
+                    # Keep the scores' denormalized run_id in step
+                    (
+                        "UPDATE scores SET run_id = ? WHERE result_id = ?",
+                        (result["run_id"], result_id),
+                    ),
+                ]
+            )
+        logger.debug(f"Updated evaluation result {result_id}")
+        return result
+
+    def delete_evaluation_results(self, run_id: str) -> int:
+        """Delete all results (and their scores) for a run, returning how many were deleted"""
+        with self._update_lock:
+            count = self._query(
+                "SELECT COUNT(*) FROM evaluation_results WHERE run_id = ?", (run_id,)
+            )[0][0]
+            self._write(
+                [
+                    (
+                        "DELETE FROM scores WHERE result_id IN "
+                        "(SELECT id FROM evaluation_results WHERE run_id = ?)",
+                        (run_id,),
+                    ),
+                    ("DELETE FROM evaluation_results WHERE run_id = ?", (run_id,)),
+                ]
+            )
+        logger.debug(f"Deleted {count} evaluation results for run {run_id}")
+        return count
+
+    def list_test_case_results(self, test_case_id: str) -> List[Dict[str, Any]]:
+        """List all results for a test case across runs"""
+        return self._documents(
+            "SELECT data FROM evaluation_results WHERE test_case_id = ? ORDER BY seq",
+            (test_case_id,),
+        )
+
+    # ----- scores -----
+
+    @staticmethod
+    def _score_statement(score: Dict[str, Any]) -> Tuple[str, tuple]:
+        return (UPSERT_SCORE, (score["id"], score["result_id"], score["result_id"], _encode(score)))
+
+    def create_score(self, score: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a score"""
+        self._write([self._score_statement(score)])
+        logger.debug(f"Created score {score['id']}")
+        return score
+
+    def create_scores_many(self, scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several scores in one transaction"""
+        self._write([self._score_statement(score) for score in scores])
+        logger.debug(f"Created {len(scores)} scores")
+        return scores
+
+    def list_scores(self, result_id: str) -> List[Dict[str, Any]]:
+        """List all scores for a result"""
+        return self._documents(
+            "SELECT data FROM scores WHERE result_id = ? ORDER BY seq", (result_id,)
+        )
+
+    def list_all_scores(self, run_id: str) -> List[Dict[str, Any]]:
+        """List all scores for a run, in creation order"""
+        return self._documents("SELECT data FROM scores WHERE run_id = ? ORDER BY seq", (run_id,))
+
+    def list_scores_many(
+        self, run_id: str, result_ids: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Scores of some of a run's results, keyed by result ID (in creation order)"""
+        found: Dict[str, List[Dict[str, Any]]] = {result_id: [] for result_id in result_ids}
+        unique_ids = list(found)
+        for start in range(0, len(unique_ids), MAX_QUERY_IDS):
+            chunk = unique_ids[start : start + MAX_QUERY_IDS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._query(
+                f"SELECT result_id, data FROM scores WHERE result_id IN ({placeholders}) "
+                f"ORDER BY seq",
+                tuple(chunk),
+            )
+            for result_id, data in rows:
+                found[result_id].append(json.loads(data))
+        return found
+
+    # ----- lifecycle -----
+
+    def clear(self) -> None:
+        """Delete every record (for testing)"""
+        self._write(
+            [
+                (f"DELETE FROM {table}", ())
+                for table in ("scores", "evaluation_results", "evaluation_runs", "test_cases")
+            ]
+        )
+        self.flush()
+
+    def close(self) -> None:
+        """Commit queued writes, stop the writer and close connections"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        logger.info("SQLiteStorage closed")
@@ -1,12 +1,22 @@
 """
 Storage abstraction layer - supports swapping implementations
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Protocol
 from abc import ABC, abstractmethod
+from src.services.compact_records import ScoreRecord, unpack_scores
+from src.services.pagination import SORT_FIELDS, DEFAULT_SORT, SortKey, SortedKeyIndex, sort_key
+from src.services.run_archive import ArchivedRun, RunArchive
+from datetime import datetime
+from itertools import islice
 import logging
+import sys
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Lock stripes InMemoryStorage spreads runs over
+DEFAULT_LOCK_STRIPES = 64
+
 
 class StorageAbstraction(ABC):
     """Base class for storage implementations"""
@@ -53,7 +63,7 @@ class StorageAbstraction(ABC):
 
     @abstractmethod
     def update_evaluation_run(self, run_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update an evaluation run"""
+        """Update an evaluation run, bumping its version"""
         pass
 
     @abstractmethod
@@ -71,6 +81,21 @@ class StorageAbstraction(ABC):
         """List all results for a run"""
         pass
 
+    @abstractmethod
+    def update_evaluation_result(self, result_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an evaluation result"""
+        pass
+
+    @abstractmethod
+    def delete_evaluation_results(self, run_id: str) -> int:
+        """Delete all results (and their scores) for a run, returning how many were deleted"""
+        pass
+
+    @abstractmethod
+    def list_test_case_results(self, test_case_id: str) -> List[Dict[str, Any]]:
+        """List all results for a test case across runs"""
+        pass
+
     @abstractmethod
     def create_score(self, score: Dict[str, Any]) -> Dict[str, Any]:
         """Create a score"""
@@ -86,20 +111,250 @@ class StorageAbstraction(ABC):
         """List all scores for a run"""
         pass
 
+    # Keyset pagination: items after the sort key `after` (from the start if
+    # None) in the order of sort_field. Backends override these to read from
+    # an index; the defaults sort every record
+
+    def list_test_cases_page(
+        self,
+        sort_field: str = DEFAULT_SORT,
+        after: Optional[SortKey] = None,
+        limit: int = 10,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """List a page of test cases ordered by sort_field, then ID"""
+        return self._sorted_page(self.list_test_cases(0, sys.maxsize), sort_field, after,
+                                 limit, descending)
+
+    def list_evaluation_runs_page(
+        self,
+        sort_field: str = DEFAULT_SORT,
+        after: Optional[SortKey] = None,
+        limit: int = 10,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """List a page of evaluation runs ordered by sort_field, then ID"""
+        return self._sorted_page(self.list_evaluation_runs(0, sys.maxsize), sort_field, after,
+                                 limit, descending)
+
+    @staticmethod
+    def _sorted_page(
+        records: List[Dict[str, Any]],
+        sort_field: str,
+        after: Optional[SortKey],
+        limit: int,
+        descending: bool
+    ) -> List[Dict[str, Any]]:
+        keyed = sorted(
+            ((sort_key(record, sort_field), record) for record in records),
+            key=lambda item: item[0],
+            reverse=descending
+        )
+        if after is not None:
+            keyed = [
+                (key, record) for key, record in keyed
+                if (key < after if descending else key > after)
+            ]
+        return [record for _, record in keyed[:limit]]
+
+    # Bulk operations: backends override these to use one round trip or
+    # transaction; the defaults fall back to the single-record methods
+
+    def get_test_cases_many(self, test_case_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get test cases by ID, keyed by ID (missing IDs are left out)"""
+        found = {}
+        for test_case_id in test_case_ids:
+            test_case = self.get_test_case(test_case_id)
+            if test_case is not None:
+                found[test_case_id] = test_case
+        return found
+
+    def create_test_cases_many(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several test cases"""
+        return [self.create_test_case(test_case) for test_case in test_cases]
+
+    def create_evaluation_results_many(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several evaluation results"""
+        return [self.create_evaluation_result(result) for result in results]
+
+    def list_evaluation_results_slice(self, run_id: str, skip: int, limit: int) -> List[Dict[str, Any]]:
+        """Up to limit of a run's results, starting at position skip (creation order)"""
+        return self.list_evaluation_results(run_id)[skip:skip + limit]
+
+    def list_scores_many(self, run_id: str, result_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Scores of some of a run's results, keyed by result ID (in creation order)"""
+        return {result_id: self.list_scores(result_id) for result_id in result_ids}
+
+    def create_scores_many(self, scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several scores"""
+        return [self.create_score(score) for score in scores]
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Delete every record (for testing)"""
+        pass
+
+    def flush(self) -> None:
+        """
+        Wait until accepted writes are stored (no-op by default)
+
+        Backends that write in the background raise here if a write failed.
+        """
+        pass
+
+    def close(self) -> None:
+        """Release connections/threads held by the backend (no-op by default)"""
+        pass
+
+
+class _Lock(Protocol):
+    """What storage needs of a lock: threading.Lock or _NullLock"""
+
+    def __enter__(self) -> Any: ...
+
+    def __exit__(self, *exc_info: Any) -> Any: ...
+
+    def acquire(self) -> bool: ...
+
+    def release(self) -> None: ...
+
+
+class _NullLock:
+    """Stands in for a lock when thread safety is switched off"""
+
+    def __enter__(self) -> "_NullLock":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+    def acquire(self) -> bool:
+        return True
+
+    def release(self) -> None:
+        pass
+
+
+class _StripeLocks:
+    """Holds the stripe locks of several runs, acquired in stripe order"""
+
+    __slots__ = ("_locks",)
+
+    def __init__(self, locks: List[_Lock]):
+        self._locks = locks
+
+    def __enter__(self) -> "_StripeLocks":
+        for lock in self._locks:
+            lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        for lock in reversed(self._locks):
+            lock.release()
+
 
 class InMemoryStorage(StorageAbstraction):
-    """In-memory storage implementation"""
+    """
+    In-memory storage implementation
+
+    Results and scores are reachable through maintained secondary indexes, so
+    per-run and per-result lookups cost O(items returned) rather than
+    O(everything ever stored). The id indexes are dicts used as insertion
+    ordered sets so entries can also be removed in O(1).
+
+    With thread_safe (the default) it can be shared by the event loop and
+    worker threads. Results and scores are guarded by lock stripes chosen by
+    run ID, so writers to different runs rarely wait on each other. Test cases
+    and runs share one table lock, and the cross-run test case index has its
+    own innermost lock. Locks are always taken in the order table or stripes,
+    then index. Updates are copy-on-write: the stored dict is replaced, never
+    mutated, so a record a reader already holds stays consistent.
+
+    With an archive, archive_run() moves a finished run's results and scores
+    to a compressed file. The run record stays in memory, marked with
+    archived_at, and the run's results and scores are read from the archive.
+    Looking up an archived run's results or scores by their own ID finds nothing.
+    """
+
+    # Attributes holding the stored records and their indexes
+    STATE_ATTRIBUTES = (
+        "test_cases",
+        "evaluation_runs",
+        "evaluation_results",
+        "scores",
+        "results_by_run",
+        "results_by_test_case",
+        "score_ids_by_run",
+        "scores_by_id",
+        "test_case_keys",
+        "run_keys",
+    )
+
+    def __init__(
+        self,
+        thread_safe: bool = True,
+        lock_stripes: int = DEFAULT_LOCK_STRIPES,
+        archive: Optional[RunArchive] = None
+    ):
+        self.thread_safe = thread_safe
+        self.archive = archive
+        self._table_lock = self._new_lock()
+        self._index_lock = self._new_lock()
+        self._stripes = [
+            self._new_lock() for _ in range(max(lock_stripes, 1) if thread_safe else 1)
+        ]
+        self._init_state()
+        logger.info("InMemoryStorage initialized")
 
-    def __init__(self):
+    def _init_state(self) -> None:
         self.test_cases: Dict[str, Dict[str, Any]] = {}
         self.evaluation_runs: Dict[str, Dict[str, Any]] = {}
         self.evaluation_results: Dict[str, Dict[str, Any]] = {}
-        self.scores: Dict[str, List[Dict[str, Any]]] = {}
-        logger.info("InMemoryStorage initialized")
+        # result_id -> scores for that result, in creation order. Scores are
+        # kept as compact ScoreRecords and turned back into dicts when read
+        self.scores: Dict[str, List[ScoreRecord]] = {}
+        # run_id -> result ids, in creation order
+        self.results_by_run: Dict[str, Dict[str, None]] = {}
+        # test_case_id -> result ids, in creation order
+        self.results_by_test_case: Dict[str, Dict[str, None]] = {}
+        # run_id -> score ids, and score_id -> score, for run-wide score listing
+        # (keyed by the record's packed id)
+        self.score_ids_by_run: Dict[str, Dict[Any, None]] = {}
+        self.scores_by_id: Dict[Any, ScoreRecord] = {}
+        # sort field -> sorted (value, id) keys, for keyset pagination
+        self.test_case_keys: Dict[str, SortedKeyIndex] = {f: SortedKeyIndex() for f in SORT_FIELDS}
+        self.run_keys: Dict[str, SortedKeyIndex] = {f: SortedKeyIndex() for f in SORT_FIELDS}
+
+    def clear(self) -> None:
+        """Delete every record (for testing)"""
+        with self._locked_runs(*range(len(self._stripes))), self._table_lock:
+            self._init_state()
+
+    # ----- locks -----
+
+    def _new_lock(self) -> _Lock:
+        if self.thread_safe:
+            return threading.Lock()
+        return _NullLock()
+
+    def _stripe(self, run_id: Any) -> int:
+        return hash(run_id) % len(self._stripes)
+
+    def _run_lock(self, run_id: Any) -> _Lock:
+        """The stripe lock guarding a run's results and scores"""
+        return self._stripes[self._stripe(run_id)]
+
+    def _locked_runs(self, *run_ids: Any) -> _StripeLocks:
+        """Hold the stripe locks of several runs (in stripe order, so no deadlock)"""
+        stripes = sorted({self._stripe(run_id) for run_id in run_ids})
+        return _StripeLocks([self._stripes[stripe] for stripe in stripes])
+
+    # ----- test cases -----
 
     def create_test_case(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
         """Create a test case"""
-        self.test_cases[test_case["id"]] = test_case
+        with self._table_lock:
+            self._put_sorted(self.test_cases, self.test_case_keys, test_case)
         logger.debug(f"Created test case {test_case['id']}")
         return test_case
 
@@ -109,28 +364,47 @@ class InMemoryStorage(StorageAbstraction):
 
     def list_test_cases(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
         """List test cases with pagination"""
-        items = list(self.test_cases.values())
-        return items[skip : skip + limit]
+        with self._table_lock:
+            return list(islice(self.test_cases.values(), skip, skip + limit))
+
+    def list_test_cases_page(
+        self,
+        sort_field: str = DEFAULT_SORT,
+        after: Optional[SortKey] = None,
+        limit: int = 10,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """List a page of test cases ordered by sort_field, then ID"""
+        with self._table_lock:
+            keys = self.test_case_keys[sort_field].page(after, limit, descending)
+            return [self.test_cases[record_id] for _, record_id in keys]
 
     def update_test_case(self, test_case_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update a test case"""
-        if test_case_id not in self.test_cases:
-            return None
-        self.test_cases[test_case_id].update(updates)
-        logger.debug(f"Updated test case {test_case_id}")
-        return self.test_cases[test_case_id]
+        with self._table_lock:
+            updated = self._update_sorted(
+                self.test_cases, self.test_case_keys, test_case_id, updates
+            )
+        if updated is not None:
+            logger.debug(f"Updated test case {test_case_id}")
+        return updated
 
     def delete_test_case(self, test_case_id: str) -> bool:
         """Delete a test case"""
-        if test_case_id in self.test_cases:
-            del self.test_cases[test_case_id]
-            logger.debug(f"Deleted test case {test_case_id}")
-            return True
-        return False
+        with self._table_lock:
+            test_case = self.test_cases.pop(test_case_id, None)
+            if test_case is None:
+                return False
+            self._unindex_sorted(self.test_case_keys, test_case)
+        logger.debug(f"Deleted test case {test_case_id}")
+        return True
+
+    # ----- evaluation runs -----
 
     def create_evaluation_run(self, run: Dict[str, Any]) -> Dict[str, Any]:
         """Create an evaluation run"""
-        self.evaluation_runs[run["id"]] = run
+        with self._table_lock:
+            self._put_sorted(self.evaluation_runs, self.run_keys, run)
         logger.debug(f"Created evaluation run {run['id']}")
         return run
 
@@ -140,48 +414,404 @@ class InMemoryStorage(StorageAbstraction):
 
     def list_evaluation_runs(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
         """List evaluation runs with pagination"""
-        items = list(self.evaluation_runs.values())
-        return items[skip : skip + limit]
+        with self._table_lock:
+            return list(islice(self.evaluation_runs.values(), skip, skip + limit))
+
+    def list_evaluation_runs_page(
+        self,
+        sort_field: str = DEFAULT_SORT,
+        after: Optional[SortKey] = None,
+        limit: int = 10,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """List a page of evaluation runs ordered by sort_field, then ID"""
+        with self._table_lock:
+            keys = self.run_keys[sort_field].page(after, limit, descending)
+            return [self.evaluation_runs[record_id] for _, record_id in keys]
 
     def update_evaluation_run(self, run_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update an evaluation run"""
-        if run_id not in self.evaluation_runs:
+        """Update an evaluation run, bumping its version"""
+        with self._table_lock:
+            run = self.evaluation_runs.get(run_id)
+            if run is not None:
+                updates = {**updates, "version": run.get("version", 0) + 1}
+            updated = self._update_sorted(self.evaluation_runs, self.run_keys, run_id, updates)
+        if updated is not None:
+            logger.debug(f"Updated evaluation run {run_id}")
+        return updated
+
+    @staticmethod
+    def _index_sorted(indexes: Dict[str, SortedKeyIndex], record: Dict[str, Any]) -> None:
+        for field, index in indexes.items():
+            index.add(sort_key(record, field))
+
+    @staticmethod
+    def _unindex_sorted(indexes: Dict[str, SortedKeyIndex], record: Dict[str, Any]) -> None:
+        for field, index in indexes.items():
+            index.remove(sort_key(record, field))
+
+    def _put_sorted(
+        self,
+        table: Dict[str, Dict[str, Any]],
+        indexes: Dict[str, SortedKeyIndex],
+        record: Dict[str, Any]
+    ) -> None:
+        """Store a record (replacing any with its ID) and add it to the sort indexes"""
+        previous = table.get(record["id"])
+        if previous is not None:
+            self._unindex_sorted(indexes, previous)
+        table[record["id"]] = record
+        self._index_sorted(indexes, record)
+
+    def _update_sorted(
+        self,
+        table: Dict[str, Dict[str, Any]],
+        indexes: Dict[str, SortedKeyIndex],
+        record_id: str,
+        updates: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Replace a record with an updated copy, moving it in the sort indexes if needed"""
+        record = table.get(record_id)
+        if record is None:
             return None
-        self.evaluation_runs[run_id].update(updates)
-        logger.debug(f"Updated evaluation run {run_id}")
-        return self.evaluation_runs[run_id]
+        updated = {**record, **updates}
+        resort = any(field in updates for field in indexes)
+        if resort:
+            self._unindex_sorted(indexes, record)
+        table[record_id] = updated
+        if resort:
+            self._index_sorted(indexes, updated)
+        return updated
+
+    # ----- evaluation results -----
 
     def create_evaluation_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Create an evaluation result"""
-        self.evaluation_results[result["id"]] = result
+        self._add_result(result)
         logger.debug(f"Created evaluation result {result['id']}")
         return result
 
+    def _add_result(self, result: Dict[str, Any]) -> None:
+        """Store a result and add it to the indexes, holding its run's stripe"""
+        while True:
+            previous = self.evaluation_results.get(result["id"])
+            run_ids = [result["run_id"]]
+            if previous is not None:
+                run_ids.append(previous["run_id"])
+            with self._locked_runs(*run_ids):
+                # Replaced by another writer while we waited: look again
+                if self.evaluation_results.get(result["id"]) is previous:
+                    self._add_result_locked(result, previous)
+                    return
+
+    def _add_result_locked(
+        self,
+        result: Dict[str, Any],
+        previous: Optional[Dict[str, Any]]
+    ) -> None:
+        """Store a result (stripes of its run and of any result it replaces held)"""
+        if previous is not None:
+            # Replacing a result: drop its old index entries first
+            self._unindex_result(previous)
+            if previous.get("agent_response") != result.get("agent_response"):
+                self._detach_scores(previous)
+        self.evaluation_results[result["id"]] = result
+        self._index_result(result)
+
     def get_evaluation_result(self, result_id: str) -> Optional[Dict[str, Any]]:
         """Get an evaluation result by ID"""
         return self.evaluation_results.get(result_id)
 
     def list_evaluation_results(self, run_id: str) -> List[Dict[str, Any]]:
         """List all results for a run"""
-        return [r for r in self.evaluation_results.values() if r["run_id"] == run_id]
+        archived = self._archived_run(run_id)
+        if archived is not None:
+            return list(archived.results)
+        with self._run_lock(run_id):
+            return [
+                self.evaluation_results[result_id]
+                for result_id in self.results_by_run.get(run_id, ())
+            ]
+
+    def list_evaluation_results_slice(self, run_id: str, skip: int, limit: int) -> List[Dict[str, Any]]:
+        """Up to limit of a run's results, starting at position skip (creation order)"""
+        archived = self._archived_run(run_id)
+        if archived is not None:
+            return archived.results[skip:skip + limit]
+        with self._run_lock(run_id):
+            return [
+                self.evaluation_results[result_id]
+                for result_id in islice(self.results_by_run.get(run_id, ()), skip, skip + limit)
+            ]
+
+    def update_evaluation_result(self, result_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update an evaluation result"""
+        while True:
+            result = self.evaluation_results.get(result_id)
+            if result is None:
+                return None
+            with self._locked_runs(result["run_id"], updates.get("run_id", result["run_id"])):
+                if self.evaluation_results.get(result_id) is result:
+                    updated = self._update_result_locked(result, updates)
+                    break
+        logger.debug(f"Updated evaluation result {result_id}")
+        return updated
+
+    def _update_result_locked(
+        self,
+        result: Dict[str, Any],
+        updates: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        updated = {**result, **updates}
+        reindex = any(
+            key in updates and updates[key] != result.get(key)
+            for key in ("run_id", "test_case_id")
+        )
+        if reindex:
+            self._unindex_result(result)
+        response = result.get("agent_response")
+        if updated.get("agent_response") != response:
+            self._detach_scores(result)
+        self.evaluation_results[result["id"]] = updated
+        if reindex:
+            self._index_result(updated)
+        return updated
+
+    def delete_evaluation_results(self, run_id: str) -> int:
+        """Delete all results (and their scores) for a run, returning how many were deleted"""
+        with self._run_lock(run_id):
+            result_ids = list(self.results_by_run.get(run_id, ()))
+            for result_id in result_ids:
+                result = self.evaluation_results.pop(result_id)
+                self._unindex_result(result)
+                for record in self.scores.pop(result_id, []):
+                    self.scores_by_id.pop(record.id, None)
+        logger.debug(f"Deleted {len(result_ids)} evaluation results for run {run_id}")
+        return len(result_ids)
+
+    def list_test_case_results(self, test_case_id: str) -> List[Dict[str, Any]]:
+        """List all results for a test case across runs"""
+        with self._index_lock:
+            result_ids = list(self.results_by_test_case.get(test_case_id, ()))
+        results = self.evaluation_results
+        hot = [results[result_id] for result_id in result_ids if result_id in results]
+        archive = self.archive
+        if archive is None:
+            return hot
+        # Archived runs are older than any hot result. They are read past the
+        # archive's cache so one listing doesn't evict the runs being browsed
+        archived = [
+            result
+            for run in list(self.evaluation_runs.values())
+            if run.get("archived_at") is not None and test_case_id in run.get("test_case_ids", ())
+            for result in archive.load(run["id"], cache=False).results
+            if result.get("test_case_id") == test_case_id
+        ]
+        return archived + hot
+
+    def _index_result(self, result: Dict[str, Any]) -> None:
+        """Add a result and its scores to the run and test case indexes"""
+        result_id = result["id"]
+        self.results_by_run.setdefault(result["run_id"], {})[result_id] = None
+        test_case_id = result.get("test_case_id")
+        with self._index_lock:
+            if test_case_id is not None:
+                self.results_by_test_case.setdefault(test_case_id, {})[result_id] = None
+            # Scores stored before their result are checked under the index lock
+            scores = list(self.scores.get(result_id, ()))
+        if scores:
+            run_score_ids = self.score_ids_by_run.setdefault(result["run_id"], {})
+            for record in scores:
+                run_score_ids[record.id] = None
+
+    def _unindex_result(self, result: Dict[str, Any]) -> None:
+        """Remove a result and its scores from the run and test case indexes"""
+        result_id = result["id"]
+        self._discard(self.results_by_run, result["run_id"], result_id)
+        test_case_id = result.get("test_case_id")
+        if test_case_id is not None:
+            with self._index_lock:
+                self._discard(self.results_by_test_case, test_case_id, result_id)
+        for record in self.scores.get(result_id, ()):
+            self._discard(self.score_ids_by_run, result["run_id"], record.id)
+
+    def _detach_scores(self, result: Dict[str, Any]) -> None:
+        """Give a result's scores their own copy of its response before it changes"""
+        for record in self.scores.get(result["id"], ()):
+            record.detach(result.get("agent_response"))
+
+    @staticmethod
+    def _discard(index: Dict[str, Dict[Any, None]], key: str, item_id: Any) -> None:
+        """Remove an id from an index bucket, dropping the bucket once empty"""
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(item_id, None)
+        if not bucket:
+            del index[key]
+
+    # ----- scores -----
 
     def create_score(self, score: Dict[str, Any]) -> Dict[str, Any]:
         """Create a score"""
-        result_id = score["result_id"]
-        if result_id not in self.scores:
-            self.scores[result_id] = []
-        self.scores[result_id].append(score)
+        self._add_score(score)
         logger.debug(f"Created score {score['id']}")
         return score
 
+    def _add_score(self, score: Dict[str, Any]) -> None:
+        """Store a score and add it to the result and run indexes"""
+        result_id = score["result_id"]
+        while True:
+            result = self.evaluation_results.get(result_id)
+            if result is None:
+                with self._index_lock:
+                    # The result's indexing reads orphan scores under this lock
+                    if result_id not in self.evaluation_results:
+                        self._append_score(ScoreRecord(score, result_id, None))
+                        return
+                continue
+            with self._run_lock(result["run_id"]):
+                if self.evaluation_results.get(result_id) is result:
+                    self._add_score_locked(score, result)
+                    return
+
+    def _add_score_locked(self, score: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Store a score for a stored result (its run's stripe held)"""
+        # Share the result's id string and reference its response text
+        record = ScoreRecord(score, result["id"], result.get("agent_response"))
+        self._append_score(record)
+        self.score_ids_by_run.setdefault(result["run_id"], {})[record.id] = None
+
+    def _append_score(self, record: ScoreRecord) -> None:
+        self.scores.setdefault(record.result_id, []).append(record)
+        self.scores_by_id[record.id] = record
+
+    def _response(self, result_id: str) -> Optional[str]:
+        result = self.evaluation_results.get(result_id)
+        return result.get("agent_response") if result is not None else None
+
     def list_scores(self, result_id: str) -> List[Dict[str, Any]]:
         """List all scores for a result"""
-        return self.scores.get(result_id, [])
+        # Copy first: list() of a list is atomic, iterating one being appended is not
+        records = list(self.scores.get(result_id, ()))
+        return unpack_scores(records, self._response(result_id))
 
     def list_all_scores(self, run_id: str) -> List[Dict[str, Any]]:
-        """List all scores for a run"""
-        all_scores = []
-        for result in self.evaluation_results.values():
-            if result["run_id"] == run_id:
-                all_scores.extend(self.list_scores(result["id"]))
-        return all_scores
+        """List all scores for a run, in creation order"""
+        archived = self._archived_run(run_id)
+        if archived is not None:
+            return list(archived.scores)
+        scores_by_id = self.scores_by_id
+        with self._run_lock(run_id):
+            records = [scores_by_id[score_id] for score_id in self.score_ids_by_run.get(run_id, ())]
+        return [record.to_dict(self._response(record.result_id)) for record in records]
+
+    def list_scores_many(self, run_id: str, result_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Scores of some of a run's results, keyed by result ID (in creation order)"""
+        archived = self._archived_run(run_id)
+        if archived is not None:
+            return {result_id: list(archived.scores_for(result_id)) for result_id in result_ids}
+        return {result_id: self.list_scores(result_id) for result_id in result_ids}
+
+    # ----- bulk operations -----
+
+    def create_test_cases_many(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several test cases, sorting each index once rather than per record"""
+        with self._table_lock:
+            for test_case in test_cases:
+                previous = self.test_cases.get(test_case["id"])
+                if previous is not None:
+                    self._unindex_sorted(self.test_case_keys, previous)
+                self.test_cases[test_case["id"]] = test_case
+            for field, index in self.test_case_keys.items():
+                index.add_many([sort_key(test_case, field) for test_case in test_cases])
+        logger.debug(f"Created {len(test_cases)} test cases")
+        return test_cases
+
+    def get_test_cases_many(self, test_case_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get test cases by ID, keyed by ID (missing IDs are left out)"""
+        test_cases = self.test_cases
+        found = {}
+        for test_case_id in test_case_ids:
+            test_case = test_cases.get(test_case_id)
+            if test_case is not None:
+                found[test_case_id] = test_case
+        return found
+
+    def create_evaluation_results_many(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several evaluation results, taking each run's stripe once"""
+        deferred = []
+        for run_id, group in self._group_by(results, lambda r: r["run_id"]).items():
+            stripe = self._stripe(run_id)
+            with self._run_lock(run_id):
+                for result in group:
+                    previous = self.evaluation_results.get(result["id"])
+                    if previous is not None and self._stripe(previous["run_id"]) != stripe:
+                        # Moves a result between stripes: needs both locks
+                        deferred.append(result)
+                    else:
+                        self._add_result_locked(result, previous)
+        for result in deferred:
+            self._add_result(result)
+        logger.debug(f"Created {len(results)} evaluation results")
+        return results
+
+    def create_scores_many(self, scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several scores, taking each run's stripe once"""
+        results = self.evaluation_results
+        deferred = []
+        by_run = self._group_by(
+            scores, lambda s: (results.get(s["result_id"]) or {}).get("run_id")
+        )
+        for run_id, group in by_run.items():
+            if run_id is None:
+                deferred.extend(group)
+                continue
+            with self._run_lock(run_id):
+                for score in group:
+                    result = results.get(score["result_id"])
+                    if result is not None and result["run_id"] == run_id:
+                        self._add_score_locked(score, result)
+                    else:
+                        deferred.append(score)
+        for score in deferred:
+            self._add_score(score)
+        logger.debug(f"Created {len(scores)} scores")
+        return scores
+
+    # ----- archived runs -----
+
+    def _archived_run(self, run_id: str) -> Optional[ArchivedRun]:
+        """The archived results and scores of a run, or None if it isn't archived"""
+        if self.archive is None:
+            return None
+        run = self.evaluation_runs.get(run_id)
+        if run is None or run.get("archived_at") is None:
+            return None
+        return self.archive.load(run_id)
+
+    def archive_run(self, run_id: str) -> int:
+        """
+        Move a finished run's results and scores to the archive
+
+        Returns how many results were archived (0 if there is no archive, or
+        the run is missing or already archived). Finished runs receive no more
+        writes, so the copy taken here is complete.
+        """
+        run = self.evaluation_runs.get(run_id)
+        if self.archive is None or run is None or run.get("archived_at") is not None:
+            return 0
+        results = self.list_evaluation_results(run_id)
+        self.archive.write(run_id, results, self.list_all_scores(run_id))
+        # Readers switch to the archive before the in-memory copies are dropped
+        self.update_evaluation_run(run_id, {"archived_at": datetime.utcnow()})
+        self.delete_evaluation_results(run_id)
+        logger.info(f"Archived run {run_id} ({len(results)} results)")
+        return len(results)
+
+    @staticmethod
+    def _group_by(records: List[Dict[str, Any]], key: Any) -> Dict[Any, List[Dict[str, Any]]]:
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        for record in records:
+            groups.setdefault(key(record), []).append(record)
+        return groups
@@ -0,0 +1,247 @@
+"""
+Storage daemon - one storage backend shared by several worker processes
+
+Each API worker process normally holds its own storage instance, so with
+`uvicorn --workers N` every worker would see different test cases and runs.
+The daemon owns a single backend (memory, durable or sqlite) and serves it
+over a Unix domain socket; workers use RemoteStorage as their storage. Every
+call is applied by the daemon before it replies, so a write made through one
+worker is visible to reads through every other worker.
+
+Only storage is shared. Each worker still has its own event bus, live run
+stats, adaptive concurrency limiters, global agent concurrency cap and caches;
+the workers follow runs executing elsewhere, and check cached data against run
+versions, by reading storage (see EvaluationService.watch_run).
+
+Protocol: each message is a frame of a 4-byte big-endian payload length and a
+pickled payload. A request is (method name, args), a reply (True, return
+value) or (False, exception). Only StorageAbstraction methods can be called.
+Pickles are only exchanged with processes that can open the socket, which is
+created readable and writable by its owner only.
+
+Run it directly (or let the first worker start it, see ensure_daemon):
+    python -m src.services.storage_daemon [--socket data/storage.sock] [--backend memory]
+"""
+from src.services.storage import StorageAbstraction
+from typing import Any, Optional, Tuple, cast
+from pathlib import Path
+import argparse
+import fcntl
+import logging
+import os
+import pickle
+import signal
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Frame header: payload length
+FRAME_HEADER = struct.Struct(">I")
+
+# Methods clients may call: the public storage interface (including clear() for tests)
+REMOTE_METHODS = frozenset(
+    name for name in vars(StorageAbstraction) if not name.startswith("_") and name != "close"
+)
+
+# How long ensure_daemon waits for a freshly started daemon to listen
+DEFAULT_START_TIMEOUT = 10.0
+
+
+def send_frame(sock: socket.socket, message: Any) -> None:
+    """Send one framed pickle"""
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(rfile) -> Optional[Any]:
+    """Read one framed pickle from a buffered reader (None at end of stream)"""
+    header = rfile.read(FRAME_HEADER.size)
+    if not header:
+        return None
+    if len(header) < FRAME_HEADER.size:
+        raise EOFError("Connection closed inside a frame header")
+    (length,) = FRAME_HEADER.unpack(header)
+    payload = rfile.read(length)
+    if len(payload) < length:
+        raise EOFError("Connection closed inside a frame")
+    return pickle.loads(payload)
+
+
+def _reply(method: str, args: tuple, storage: StorageAbstraction) -> Tuple[bool, Any]:
+    if method not in REMOTE_METHODS:
+        return False, AttributeError(f"Storage method {method} cannot be called remotely")
+    try:
+        return True, getattr(storage, method)(*args)
+    except Exception as e:
+        logger.debug(f"Remote {method} raised {e!r}")
+        return False, e
+
+
+class _StorageRequestHandler(socketserver.StreamRequestHandler):
+    """Serves one client connection: requests are answered in order"""
+
+    def handle(self) -> None:
+        storage = cast("_StorageServer", self.server).storage
+        while True:
+            try:
+                request = recv_frame(self.rfile)
+            except (OSError, EOFError):
+                return
+            if request is None:
+                return
+            method, args = request
+            ok, value = _reply(method, args, storage)
+            try:
+                send_frame(self.connection, (ok, value))
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                # Exceptions that can't be pickled are sent as their message
+                send_frame(self.connection, (False, RuntimeError(f"{value!r} ({e})")))
+            except OSError:
+                return
+
+
+class _StorageServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self, socket_path: str, storage: StorageAbstraction):
+        self.storage = storage
+        super().__init__(socket_path, _StorageRequestHandler)
+
+
+def daemon_alive(socket_path: str) -> bool:
+    """Whether a daemon is accepting connections on socket_path"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class StorageDaemon:
+    """Serves a storage backend on a Unix socket, one thread per client connection"""
+
+    def __init__(self, socket_path: str, storage: StorageAbstraction):
+        self.socket_path = socket_path
+        self.storage = storage
+        Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+        if os.path.exists(socket_path):
+            if daemon_alive(socket_path):
+                raise RuntimeError(f"A storage daemon is already listening on {socket_path}")
+            # Left behind by a daemon that didn't shut down cleanly
+            os.unlink(socket_path)
+        # Bind under an owner-only umask: a socket that is briefly open to other
+        # users could queue a connection whose pickles the daemon would load
+        umask = os.umask(0o077)
+        try:
+            self._server = _StorageServer(socket_path, storage)
+        finally:
+            os.umask(umask)
+        os.chmod(socket_path, 0o600)
+        self._thread: Optional[threading.Thread] = None
+        logger.info(f"Storage daemon listening on {socket_path}")
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def start(self) -> "StorageDaemon":
+        """Serve from a background thread"""
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="storage-daemon", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        """Stop accepting requests and remove the socket (the backend stays open)"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        logger.info(f"Storage daemon on {self.socket_path} stopped")
+
+
+def ensure_daemon(
+    socket_path: str, backend: str, timeout: float = DEFAULT_START_TIMEOUT
+) -> Optional[subprocess.Popen]:
+    """
+    Start a daemon on socket_path unless one is already listening
+
+    Worker processes starting together race for a lock file next to the
+    socket, so exactly one of them starts the daemon. Returns the started
+    process, or None if a daemon was already running.
+    """
+    socket_path = os.path.abspath(socket_path)
+    if daemon_alive(socket_path):
+        return None
+    Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(socket_path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        if daemon_alive(socket_path):
+            return None
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "src.services.storage_daemon",
+                "--socket",
+                socket_path,
+                "--backend",
+                backend,
+            ],
+            cwd=Path(__file__).resolve().parents[2],
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + timeout
+        while not daemon_alive(socket_path):
+            if process.poll() is not None:
+                raise RuntimeError(f"Storage daemon exited with status {process.returncode}")
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError(f"Storage daemon did not start within {timeout}s")
+            time.sleep(0.02)
+    logger.info(f"Started storage daemon (pid {process.pid}) on {socket_path}")
+    return process
+
+
+def main() -> None:
+    from src.config import STORAGE_SOCKET, STORAGE_DAEMON_BACKEND
+    from src.services.storage_service import StorageService
+
+    parser = argparse.ArgumentParser(description="Serve storage to API worker processes")
+    parser.add_argument("--socket", default=STORAGE_SOCKET)
+    parser.add_argument(
+        "--backend", default=STORAGE_DAEMON_BACKEND, choices=("memory", "durable", "sqlite")
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    storage = StorageService.initialize_storage(args.backend)
+    daemon = StorageDaemon(args.socket, storage).start()
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    stop.wait()
+
+    daemon.shutdown()
+    # Commits whatever a persistent backend still has queued
+    StorageService.close_storage()
+
+
+if __name__ == "__main__":
+    main()
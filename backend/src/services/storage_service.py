@@ -2,6 +2,31 @@
 Storage service factory - manage storage instances
 """
 from src.services.storage import StorageAbstraction, InMemoryStorage
+from src.services.sqlite_storage import SQLiteStorage
+from src.services.durable_storage import DurableInMemoryStorage
+from src.services.remote_storage import RemoteStorage
+from src.services.storage_daemon import ensure_daemon
+from src.services.run_archive import RunArchive
+from src.services.retention import RetentionPolicy, RetentionWorker
+from src.config import (
+    STORAGE_TYPE,
+    SQLITE_PATH,
+    STORAGE_SOCKET,
+    STORAGE_DAEMON_BACKEND,
+    STORAGE_DAEMON_AUTOSTART,
+    STORAGE_THREAD_SAFE,
+    STORAGE_LOCK_STRIPES,
+    WAL_DIR,
+    WAL_COMMIT_INTERVAL_MS,
+    WAL_FSYNC,
+    WAL_SYNC_COMMIT,
+    WAL_SEGMENT_MAX_MB,
+    RETENTION_MAX_RUNS,
+    RETENTION_MAX_AGE_DAYS,
+    RETENTION_INTERVAL_S,
+    ARCHIVE_DIR,
+    ARCHIVE_CACHE_RUNS,
+)
 from typing import Optional
 import logging
 
@@ -9,34 +34,112 @@ logger = logging.getLogger(__name__)
 
 # Global storage instance
 _storage_instance: Optional[StorageAbstraction] = None
+# Archives old runs of the in-memory backends when a retention limit is set
+_retention_worker: Optional[RetentionWorker] = None
 
 
 class StorageService:
     """Factory for managing storage instances"""
 
     @staticmethod
-    def initialize_storage(storage_type: str = "memory") -> StorageAbstraction:
-        """Initialize storage (currently only in-memory supported)"""
+    def initialize_storage(storage_type: str = STORAGE_TYPE) -> StorageAbstraction:
+        """Initialize storage ("memory", "durable", "sqlite" or "shared")"""
         global _storage_instance
-        
+
         if storage_type == "memory":
-            _storage_instance = InMemoryStorage()
+            _storage_instance = StorageService._new_in_memory_storage()
             logger.info("Initialized InMemoryStorage")
+            StorageService._start_retention(_storage_instance)
+            return _storage_instance
+        elif storage_type == "durable":
+            _storage_instance = DurableInMemoryStorage(
+                WAL_DIR,
+                commit_interval=WAL_COMMIT_INTERVAL_MS / 1000,
+                fsync=WAL_FSYNC,
+                sync_commit=WAL_SYNC_COMMIT,
+                segment_max_bytes=WAL_SEGMENT_MAX_MB * 1024 * 1024,
+                thread_safe=STORAGE_THREAD_SAFE,
+                lock_stripes=STORAGE_LOCK_STRIPES,
+                archive=StorageService._new_archive()
+            )
+            logger.info(f"Initialized DurableInMemoryStorage in {WAL_DIR}")
+            StorageService._start_retention(_storage_instance)
+            return _storage_instance
+        elif storage_type == "sqlite":
+            _storage_instance = SQLiteStorage(SQLITE_PATH)
+            logger.info(f"Initialized SQLiteStorage at {SQLITE_PATH}")
+            return _storage_instance
+        elif storage_type == "shared":
+            # Every worker process talks to the same daemon
+            if STORAGE_DAEMON_AUTOSTART:
+                ensure_daemon(STORAGE_SOCKET, STORAGE_DAEMON_BACKEND)
+            _storage_instance = RemoteStorage(STORAGE_SOCKET)
+            logger.info(f"Initialized RemoteStorage on {STORAGE_SOCKET}")
             return _storage_instance
         else:
             raise ValueError(f"Unknown storage type: {storage_type}")
 
+    @staticmethod
+    def _new_in_memory_storage() -> InMemoryStorage:
+        return InMemoryStorage(
+            thread_safe=STORAGE_THREAD_SAFE,
+            lock_stripes=STORAGE_LOCK_STRIPES,
+            archive=StorageService._new_archive()
+        )
+
+    @staticmethod
+    def _retention_policy() -> RetentionPolicy:
+        return RetentionPolicy(RETENTION_MAX_RUNS, RETENTION_MAX_AGE_DAYS)
+
+    @staticmethod
+    def _new_archive() -> Optional[RunArchive]:
+        if not StorageService._retention_policy().enabled:
+            return None
+        return RunArchive(ARCHIVE_DIR, cache_runs=ARCHIVE_CACHE_RUNS)
+
+    @staticmethod
+    def _start_retention(storage: InMemoryStorage) -> None:
+        """Start archiving storage's old runs in the background (if a limit is set)"""
+        global _retention_worker
+        StorageService._stop_retention()
+        policy = StorageService._retention_policy()
+        if policy.enabled:
+            _retention_worker = RetentionWorker(storage, policy, RETENTION_INTERVAL_S).start()
+            logger.info(f"Retention enabled: archiving old runs to {ARCHIVE_DIR}")
+
+    @staticmethod
+    def _stop_retention() -> None:
+        global _retention_worker
+        if _retention_worker is not None:
+            _retention_worker.stop()
+            _retention_worker = None
+
     @staticmethod
     def get_storage() -> StorageAbstraction:
         """Get the current storage instance"""
         global _storage_instance
         if _storage_instance is None:
-            _storage_instance = StorageService.initialize_storage("memory")
+            _storage_instance = StorageService.initialize_storage(STORAGE_TYPE)
         return _storage_instance
 
     @staticmethod
     def reset_storage() -> None:
         """Reset storage (for testing)"""
         global _storage_instance
-        _storage_instance = InMemoryStorage()
+        if STORAGE_TYPE == "memory":
+            _storage_instance = StorageService._new_in_memory_storage()
+            StorageService._start_retention(_storage_instance)
+        else:
+            # Persistent backends are emptied in place so services holding
+            # the instance keep working
+            StorageService.get_storage().clear()
         logger.info("Storage reset")
+
+    @staticmethod
+    def close_storage() -> None:
+        """Close the current storage instance (called on app shutdown)"""
+        global _storage_instance
+        StorageService._stop_retention()
+        if _storage_instance is not None:
+            _storage_instance.close()
+            _storage_instance = None
@@ -0,0 +1,192 @@
+"""
+Test case import - bulk creation of test cases from streamed JSONL or CSV
+
+The upload is fed in as it arrives. Complete lines are parsed straight away. In
+CSV a record can span lines inside quotes, so lines are joined until the quotes
+balance. Parsed rows are validated a chunk at a time with one pydantic call and
+written with one create_test_cases_many call, so memory stays bounded by the
+chunk size and a large suite costs a few dozen storage writes instead of one
+request per test case. Rows that fail to parse or validate are reported by line
+number and skipped; the rest are imported.
+"""
+from src.models.test_case import TestCase
+from src.services.storage import StorageAbstraction
+from src.config import IMPORT_CHUNK_SIZE, IMPORT_MAX_ERRORS
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, Dict, List, Optional, Tuple
+import codecs
+import csv
+import json
+
+IMPORT_FORMATS = ("jsonl", "csv")
+
+# Fields read from each row; anything else (ids, timestamps) is ignored
+IMPORT_FIELDS = ("input", "expected_output", "description", "tags")
+REQUIRED_COLUMNS = ("input", "expected_output")
+
+# CSV has no lists: tags are one cell separated by this
+CSV_TAG_SEPARATOR = ";"
+
+_test_cases = TypeAdapter(List[TestCase])
+
+
+class TestCaseImport:
+    """One streamed import: feed() the body's chunks as they arrive, then finish()"""
+
+    def __init__(
+        self,
+        storage: StorageAbstraction,
+        fmt: str = "jsonl",
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        max_errors: int = IMPORT_MAX_ERRORS,
+    ):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unknown import format: {fmt} (expected jsonl or csv)")
+        self.storage = storage
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        self._tail = ""  # text after the last newline seen
+        self._line = 0
+        self._rows: List[Tuple[int, Dict[str, Any]]] = []
+        # CSV state: header columns, and the lines of a record still inside quotes
+        self._columns: Optional[List[str]] = None
+        self._record: List[str] = []
+        self._record_line = 0
+        self._quotes = 0
+
+    def feed(self, data: bytes) -> None:
+        """
+        Parse the complete lines in a chunk of the upload, writing rows a chunk at a time
+
+        Raises ValueError if a CSV header lacks the input or expected_output column.
+        """
+        lines = (self._tail + self._decoder.decode(data)).split("\n")
+        self._tail = lines.pop()
+        self._parse(lines)
+
+    def finish(self) -> Dict[str, Any]:
+        """Parse and write whatever is left, returning the import's report"""
+        rest = self._tail + self._decoder.decode(b"", final=True)
+        self._tail = ""
+        if rest:
+            self._parse([rest])
+        if self._record:
+            self._error(self._record_line, "Unterminated quoted field")
+            self._record = []
+        self._flush()
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        """Counts of imported and failed rows, and the first max_errors errors"""
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def _parse(self, lines: List[str]) -> None:
+        if self.fmt == "csv":
+            self._parse_csv(lines)
+        else:
+            self._parse_jsonl(lines)
+
+    def _parse_jsonl(self, lines: List[str]) -> None:
+        for line in lines:
+            self._line += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                self._error(self._line, f"Invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                self._error(self._line, "Expected a JSON object")
+                continue
+            self._add(self._line, {field: row[field] for field in IMPORT_FIELDS if field in row})
+
+    def _parse_csv(self, lines: List[str]) -> None:
+        for line in lines:
+            self._line += 1
+            if not self._record:
+                self._record_line = self._line
+            self._record.append(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2:
+                continue  # the newline is inside a quoted field
+            record = "\n".join(self._record)
+            self._record = []
+            self._quotes = 0
+            if not record.strip():
+                continue
+            (cells,) = csv.reader([record])
+            if self._columns is None:
+                self._set_columns(cells)
+            elif len(cells) != len(self._columns):
+                self._error(
+                    self._record_line, f"Expected {len(self._columns)} fields, got {len(cells)}"
+                )
+            else:
+                self._add(self._record_line, self._csv_row(cells))
+
+    def _set_columns(self, header: List[str]) -> None:
+        self._columns = [column.strip() for column in header]
+        missing = [column for column in REQUIRED_COLUMNS if column not in self._columns]
+        if missing:
+            raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+
+    def _csv_row(self, cells: List[str]) -> Dict[str, Any]:
+        assert self._columns is not None  # set from the header row
+        row: Dict[str, Any] = {
+            column: cell for column, cell in zip(self._columns, cells) if column in IMPORT_FIELDS
+        }
+        # Empty optional cells mean "not set"
+        if not row.get("description"):
+            row.pop("description", None)
+        if "tags" in row:
+            row["tags"] = [
+                tag.strip() for tag in row["tags"].split(CSV_TAG_SEPARATOR) if tag.strip()
+            ]
+        return row
+
+    def _add(self, line: int, row: Dict[str, Any]) -> None:
+        self._rows.append((line, row))
+        if len(self._rows) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Validate the pending rows in one call and write the valid ones in one batch"""
+        rows, self._rows = self._rows, []
+        if not rows:
+            return
+        try:
+            test_cases = _test_cases.validate_python([row for _, row in rows])
+        except ValidationError as e:
+            problems: Dict[int, List[str]] = {}
+            for error in e.errors():
+                position, *field = error["loc"]
+                index = int(position)  # the row's position in the list
+                where = ".".join(str(part) for part in field)
+                problems.setdefault(index, []).append(
+                    f"{where}: {error['msg']}" if where else error["msg"]
+                )
+            for index, messages in problems.items():
+                self._error(rows[index][0], "; ".join(messages))
+            valid = [row for index, (_, row) in enumerate(rows) if index not in problems]
+            test_cases = _test_cases.validate_python(valid) if valid else []
+
+        if test_cases:
+            self.storage.create_test_cases_many([test_case.to_dict() for test_case in test_cases])
+            self.imported += len(test_cases)
+
+    def _error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": message})
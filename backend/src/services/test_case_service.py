@@ -3,7 +3,9 @@ TestCase service - CRUD operations for test cases
 """
 from src.models.test_case import TestCase
 from src.services.storage import StorageAbstraction
-from typing import List, Optional, Dict, Any
+from src.services.pagination import fetch_page
+from src.services.test_case_import import TestCaseImport
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import logging
 
@@ -36,6 +38,14 @@ class TestCaseService:
         logger.info(f"Created test case {test_case.id}")
         return test_case
 
+    def start_import(self, fmt: str = "jsonl") -> TestCaseImport:
+        """
+        Start a bulk import of test cases from a JSONL or CSV upload (see TestCaseImport)
+
+        Raises ValueError for an unknown format.
+        """
+        return TestCaseImport(self.storage, fmt)
+
     def get_test_case(self, test_case_id: str) -> Optional[TestCase]:
         """Get a test case by ID"""
         data = self.storage.get_test_case(test_case_id)
@@ -48,6 +58,16 @@ class TestCaseService:
         data = self.storage.list_test_cases(skip, limit)
         return [TestCase(**item) for item in data]
 
+    def list_test_cases_page(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None
+    ) -> Tuple[List[TestCase], Optional[str]]:
+        """List test cases with keyset pagination, returning the next page's cursor"""
+        data, next_cursor = fetch_page(self.storage.list_test_cases_page, limit, cursor, sort)
+        return [TestCase(**item) for item in data], next_cursor
+
     def update_test_case(
         self,
         test_case_id: str,
@@ -90,10 +110,6 @@ class TestCaseService:
         return result
 
     def get_test_cases_by_ids(self, test_case_ids: List[str]) -> List[TestCase]:
-        """Get multiple test cases by IDs"""
-        test_cases = []
-        for tc_id in test_case_ids:
-            tc = self.get_test_case(tc_id)
-            if tc:
-                test_cases.append(tc)
-        return test_cases
+        """Get multiple test cases by IDs (in the given order, skipping missing ones)"""
+        data = self.storage.get_test_cases_many(test_case_ids)
+        return [TestCase(**data[tc_id]) for tc_id in test_case_ids if tc_id in data]
@@ -0,0 +1,282 @@
+"""
+Write buffer - batch a run's result and score writes into bulk storage calls
+"""
+from src.services.storage import StorageAbstraction
+from src.config import WRITE_BUFFER_SIZE, WRITE_BUFFER_MAX_WAIT_MS, RESULTS_REORDER_WINDOW
+from collections import deque
+from typing import Callable, Deque, List, Dict, Any, Optional, Protocol, Union
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+FlushListener = Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], None]
+
+
+class ScoreSink(Protocol):
+    """Where grading hands the scores it produces"""
+
+    def add_scores(self, scores: List[Dict[str, Any]]) -> None:
+        ...
+
+
+class _Batch:
+    """Records handed to the writer; results are cleared once written"""
+
+    def __init__(self, results: List[Dict[str, Any]], scores: List[Dict[str, Any]]):
+        self.results = results
+        self.scores = scores
+
+
+class WriteBuffer:
+    """
+    Buffers evaluation results and scores and writes them with the bulk
+    storage methods
+
+    A flush happens once max_items records are buffered or max_wait seconds
+    after the first buffered record, whichever comes first. Results are always
+    written before scores, so a score never reaches storage ahead of its result.
+    on_flush, if given, is called with (results, scores) once they are stored.
+
+    On an event loop the writes happen in a worker thread: a storage call can
+    block (a durable commit, a SQLite writer, the shared storage socket), and
+    must not hold up the loop. Flushed batches are written one at a time, in
+    order, by a background task; write_later() queues another storage call
+    behind them, and drain() waits until everything is written. on_flush is
+    called on the loop. Without a running loop flush() writes in the caller.
+    """
+
+    def __init__(
+        self,
+        storage: StorageAbstraction,
+        max_items: int = WRITE_BUFFER_SIZE,
+        max_wait: float = WRITE_BUFFER_MAX_WAIT_MS / 1000,
+        on_flush: Optional[FlushListener] = None,
+    ):
+        self.storage = storage
+        self.max_items = max_items
+        self.max_wait = max_wait
+        self.on_flush = on_flush
+        self._results: List[Dict[str, Any]] = []
+        self._scores: List[Dict[str, Any]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Flushed batches and queued calls, written in order by the writer task
+        self._queue: Deque[Union[_Batch, Callable[[], Any]]] = deque()
+        self._writer: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self.flushes = 0
+
+    def add_result(self, result: Dict[str, Any]) -> None:
+        """Buffer an evaluation result"""
+        self._results.append(result)
+        self._added()
+
+    def add_scores(self, scores: List[Dict[str, Any]]) -> None:
+        """Buffer scores"""
+        self._scores.extend(scores)
+        self._added()
+
+    def _added(self) -> None:
+        if len(self._results) + len(self._scores) >= self.max_items or self.max_wait <= 0:
+            self._flush_soon()
+        elif self._timer is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop to schedule a timed flush on
+                self.flush()
+                return
+            self._timer = loop.call_later(self.max_wait, self._flush_soon)
+
+    def _flush_soon(self) -> None:
+        """Hand the buffered records to the writer task (or write them now without a loop)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._take_buffered()
+        self._start_writer()
+
+    def write_later(self, call: Callable[[], Any]) -> None:
+        """Run a storage call in the writer, after every record flushed so far"""
+        self._queue.append(call)
+        self._start_writer()
+
+    async def drain(self) -> None:
+        """
+        Flush and wait until everything handed to the writer is written
+
+        Raises the first write that fails; its records stay queued.
+        """
+        self._take_buffered()
+        async with self._lock():
+            await self._write_queued()
+
+    def flush(self) -> None:
+        """Write everything buffered in the calling thread (for use outside an event loop)"""
+        self._take_buffered()
+        while self._queue:
+            self._write_one_sync(self._queue[0])
+            self._queue.popleft()
+
+    def _take_buffered(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._results or self._scores:
+            self._queue.append(_Batch(self._results, self._scores))
+            self._results, self._scores = [], []
+
+    def _lock(self) -> asyncio.Lock:
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        return self._write_lock
+
+    def _start_writer(self) -> None:
+        if self._queue and (self._writer is None or self._writer.done()):
+            self._writer = asyncio.get_running_loop().create_task(self._write_in_background())
+
+    async def _write_in_background(self) -> None:
+        async with self._lock():
+            try:
+                await self._write_queued()
+            except Exception as e:
+                # The records stay queued; the next flush or drain() retries them
+                logger.error(f"Buffered write failed: {e}")
+
+    async def _write_queued(self) -> None:
+        while self._queue:
+            item = self._queue[0]
+            if isinstance(item, _Batch):
+                if item.results:
+                    await asyncio.to_thread(
+                        self.storage.create_evaluation_results_many, item.results
+                    )
+                    written, item.results = item.results, []
+                    self._stored(written, [])
+                if item.scores:
+                    await asyncio.to_thread(self.storage.create_scores_many, item.scores)
+                    self._stored([], item.scores)
+                self.flushes += 1
+            else:
+                await asyncio.to_thread(item)
+            self._queue.popleft()
+
+    def _write_one_sync(self, item: Union[_Batch, Callable[[], Any]]) -> None:
+        if not isinstance(item, _Batch):
+            item()
+            return
+        if item.results:
+            self.storage.create_evaluation_results_many(item.results)
+            written, item.results = item.results, []
+            self._stored(written, [])
+        if item.scores:
+            self.storage.create_scores_many(item.scores)
+            self._stored([], item.scores)
+        self.flushes += 1
+
+    def _stored(self, results: List[Dict[str, Any]], scores: List[Dict[str, Any]]) -> None:
+        if self.on_flush is None:
+            return
+        try:
+            self.on_flush(results, scores)
+        except Exception as e:
+            # Records are already stored; a failing listener must not re-queue them
+            logger.error(f"Write buffer listener failed: {e}")
+
+    @property
+    def pending(self) -> int:
+        """Number of records not yet written (buffered or waiting for the writer)"""
+        queued = sum(
+            len(item.results) + len(item.scores) for item in self._queue if isinstance(item, _Batch)
+        )
+        return len(self._results) + len(self._scores) + queued
+
+
+class InOrderResults:
+    """
+    Passes results to a WriteBuffer in position order while they complete in any order
+
+    A result is handed on once every earlier position has been added or
+    skipped; until then it is held here, along with any scores already
+    produced for it, so a score never reaches the buffer ahead of its result.
+    Scores of results already handed on go straight to the buffer.
+
+    The hold is bounded by window: a producer awaits admit(position) before
+    starting the work for a position, which returns once the position is
+    fewer than window places past the oldest one not yet handed on. A slow
+    result then holds back at most window - 1 later ones (window 0: no limit).
+    """
+
+    def __init__(self, buffer: WriteBuffer, window: int = RESULTS_REORDER_WINDOW):
+        self.buffer = buffer
+        self.window = window
+        self._next = 0
+        self._ready: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._held_scores: Dict[str, List[Dict[str, Any]]] = {}
+        # Positions waiting in admit(), woken as the window moves on
+        self._admissions: Dict[int, asyncio.Future] = {}
+
+    async def admit(self, position: int) -> None:
+        """Wait until the work for a position may start without overflowing the window"""
+        if self.window <= 0 or position < self._next + self.window:
+            return
+        admission = asyncio.get_running_loop().create_future()
+        self._admissions[position] = admission
+        try:
+            await admission
+        finally:
+            self._admissions.pop(position, None)
+
+    def add_result(self, position: int, result: Dict[str, Any]) -> None:
+        """Add the result at a position (handing on any that are now in order)"""
+        self._held_scores[result["id"]] = []
+        self._ready[position] = result
+        self._release()
+
+    def skip(self, position: int) -> None:
+        """Mark a position that has no result"""
+        self._ready[position] = None
+        self._release()
+
+    def add_scores(self, scores: List[Dict[str, Any]]) -> None:
+        """Buffer scores, holding back those whose result is still held"""
+        passed = []
+        for score in scores:
+            held = self._held_scores.get(score["result_id"])
+            if held is None:
+                passed.append(score)
+            else:
+                held.append(score)
+        if passed:
+            self.buffer.add_scores(passed)
+
+    def release_all(self) -> None:
+        """Hand on every held result in position order, gaps and all (when a run stops)"""
+        for position in sorted(self._ready):
+            self._hand_on(self._ready.pop(position))
+
+    @property
+    def held(self) -> int:
+        """Number of results waiting for an earlier position"""
+        return len(self._held_scores)
+
+    def _release(self) -> None:
+        start = self._next
+        while self._next in self._ready:
+            self._hand_on(self._ready.pop(self._next))
+            self._next += 1
+        if self._admissions:
+            for position in range(start + self.window, self._next + self.window):
+                admission = self._admissions.pop(position, None)
+                if admission is not None and not admission.done():
+                    admission.set_result(None)
+
+    def _hand_on(self, result: Optional[Dict[str, Any]]) -> None:
+        if result is None:
+            return
+        self.buffer.add_result(result)
+        scores = self._held_scores.pop(result["id"])
+        if scores:
+            self.buffer.add_scores(scores)
@@ -2,6 +2,7 @@
 Pytest configuration and fixtures for backend tests
 """
 import pytest
+import pytest_asyncio
 from pathlib import Path
 import sys
 from httpx import AsyncClient
@@ -13,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 # Import app after path setup
 from main import app
 from src.services.storage_service import StorageService
+from src.api.http_cache import get_encoded_response_cache
 from src.services.test_case_service import TestCaseService
 
 
@@ -46,17 +48,18 @@ def mock_evaluation_run():
     }
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def client():
     """Async HTTP test client"""
-    # Reset storage before each test
+    # Reset storage (and responses cached from it) before each test
     StorageService.reset_storage()
+    get_encoded_response_cache().clear()
     
     async with AsyncClient(app=app, base_url="http://test") as test_client:
         yield test_client
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def test_case_id(client):
     """Create a test case and return its ID"""
     payload = {
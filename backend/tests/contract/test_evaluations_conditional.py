@@ -0,0 +1,78 @@
+"""
+Contract tests for ETags and conditional GETs of evaluation runs
+"""
+import pytest
+from src.api.evaluations import get_evaluation_service
+from src.api.http_cache import get_encoded_response_cache
+
+
+def add_run(run_id, status):
+    storage = get_evaluation_service().storage
+    storage.create_evaluation_run(
+        {
+            "id": run_id,
+            "test_case_ids": ["tc-1"],
+            "agent_endpoint_url": "http://agent",
+            "grader_ids": ["string-match"],
+            "status": status,
+            "created_at": "2026-01-01T00:00:00",
+        }
+    )
+    storage.create_evaluation_result(
+        {
+            "id": f"{run_id}-r",
+            "run_id": run_id,
+            "test_case_id": "tc-1",
+            "agent_response": "Paris",
+            "response_status": "success",
+            "response_latency_ms": 12,
+        }
+    )
+    storage.create_score(
+        {
+            "id": f"{run_id}-s",
+            "result_id": f"{run_id}-r",
+            "grader_id": "string-match",
+            "passed": True,
+            "score": 1.0,
+        }
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["", "/results", "/analytics"])
+async def test_finished_run_reads_are_conditional(client, path):
+    """A finished run's reads carry its version as ETag and answer If-None-Match with 304"""
+    add_run("run-etag", "completed")
+    url = f"/api/evaluations/run-etag{path}"
+
+    first = await client.get(url)
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+
+    cached = await client.get(url)
+    assert cached.content == first.content
+    assert get_encoded_response_cache().hits >= 1
+
+    not_modified = await client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    # Any update of the run (archiving, re-grading) moves its ETag on
+    get_evaluation_service().storage.update_evaluation_run("run-etag", {"error_message": "x"})
+    changed = await client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_running_run_reads_are_not_cached(client):
+    add_run("run-live", "running")
+
+    response = await client.get("/api/evaluations/run-live/results")
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert len(response.json()["data"]["results"]) == 1
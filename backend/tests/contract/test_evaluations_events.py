@@ -0,0 +1,105 @@
+"""
+Contract tests for GET /api/evaluations/events and /api/evaluations/{id}/events
+"""
+import asyncio
+import json
+import threading
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from main import app
+from src.api.evaluations import get_evaluation_service
+from src.services.run_stats import RunStats
+
+
+def add_run(run_id, status):
+    get_evaluation_service().storage.create_evaluation_run(
+        {
+            "id": run_id,
+            "test_case_ids": ["tc-1"],
+            "agent_endpoint_url": "http://agent",
+            "grader_ids": ["string-match"],
+            "status": status,
+            "created_at": "2026-01-01T00:00:00",
+        }
+    )
+
+
+def sse_events(body):
+    """The JSON events of an SSE body, skipping comments"""
+    return [
+        json.loads(line[len("data: ") :]) for line in body.splitlines() if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_events_of_finished_run(client):
+    """A finished run's stream holds its record and ends"""
+    add_run("run-done", "completed")
+
+    response = await client.get("/api/evaluations/run-done/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = sse_events(response.text)
+    assert [(e["type"], e["data"]["status"]) for e in events] == [("run", "completed")]
+
+
+@pytest.mark.asyncio
+async def test_events_follow_running_run(client, monkeypatch):
+    """Stored results, progress and the final status are pushed while the run executes"""
+    add_run("run-live", "running")
+    service = get_evaluation_service()
+    # The stream reads the run in a thread after subscribing (the route reads it
+    # before): execute once that read is done
+    read = threading.Event()
+    get_evaluation_run = service.storage.get_evaluation_run
+
+    def get_run_and_signal(run_id):
+        subscribed = service.events.has_subscribers(run_id, "result")
+        data = get_evaluation_run(run_id)
+        if subscribed:
+            read.set()
+        return data
+
+    monkeypatch.setattr(service.storage, "get_evaluation_run", get_run_and_signal)
+
+    async def execute():
+        while not read.is_set():
+            await asyncio.sleep(0.001)
+        result = {
+            "id": "r-1",
+            "run_id": "run-live",
+            "test_case_id": "tc-1",
+            "response_status": "success",
+        }
+        service._publish_stored("run-live", 1, RunStats.compute([result], []), [result], [])
+        service._update_run("run-live", {"status": "completed", "result_count": 1})
+
+    response, _ = await asyncio.gather(client.get("/api/evaluations/run-live/events"), execute())
+
+    events = sse_events(response.text)
+    assert [e["type"] for e in events] == ["run", "result", "progress", "run"]
+    assert events[1]["data"]["id"] == "r-1"
+    assert events[2]["data"] == {"results": 1, "scores": 0, "total": 1}
+    assert events[3]["data"]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_events_not_found(client):
+    response = await client.get("/api/evaluations/missing/events")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_events_over_websocket(client):
+    """The WebSocket sends the same events as JSON messages"""
+    add_run("run-ws", "failed")
+
+    with TestClient(app).websocket_connect("/api/evaluations/run-ws/events") as websocket:
+        event = websocket.receive_json()
+        assert (event["type"], event["data"]["status"]) == ("run", "failed")
+
+    with pytest.raises(WebSocketDisconnect):
+        with TestClient(app).websocket_connect("/api/evaluations/missing/events") as websocket:
+            websocket.receive_json()
@@ -0,0 +1,65 @@
+"""
+Contract tests for GET /api/evaluations/{id}
+"""
+import pytest
+from src.api.evaluations import get_evaluation_service
+
+
+@pytest.mark.asyncio
+async def test_read_run_with_stats(client):
+    """A run stored without stats gets them computed from its records, then saved"""
+    storage = get_evaluation_service().storage
+    storage.create_evaluation_run(
+        {
+            "id": "run-old",
+            "test_case_ids": ["tc-1", "tc-2"],
+            "agent_endpoint_url": "http://agent",
+            "grader_ids": ["string-match"],
+            "status": "completed",
+            "result_count": 2,
+            "created_at": "2026-01-01T00:00:00",
+        }
+    )
+    storage.create_evaluation_results_many(
+        [
+            {
+                "id": "old-r-1",
+                "run_id": "run-old",
+                "test_case_id": "tc-1",
+                "response_status": "success",
+                "response_latency_ms": 40,
+            },
+            {
+                "id": "old-r-2",
+                "run_id": "run-old",
+                "test_case_id": "tc-2",
+                "response_status": "timeout",
+                "response_latency_ms": None,
+            },
+        ]
+    )
+    storage.create_score(
+        {
+            "id": "old-s-1",
+            "result_id": "old-r-1",
+            "grader_id": "string-match",
+            "passed": True,
+            "score": 1.0,
+        }
+    )
+
+    response = await client.get("/api/evaluations/run-old")
+
+    assert response.status_code == 200
+    stats = response.json()["data"]["stats"]
+    assert stats["results"] == 2
+    assert stats["by_status"] == {"success": 1, "timeout": 1}
+    assert stats["avg_latency_ms"] == 40
+    assert stats["by_grader"]["string-match"]["passed"] == 1
+    assert storage.get_evaluation_run("run-old")["stats"] == stats
+
+
+@pytest.mark.asyncio
+async def test_read_run_not_found(client):
+    response = await client.get("/api/evaluations/missing")
+    assert response.status_code == 404
@@ -0,0 +1,65 @@
+"""
+Contract test for GET /api/evaluations/{id}/results/stream
+"""
+import json
+import pytest
+from src.api.evaluations import get_evaluation_service
+
+
+@pytest.mark.asyncio
+async def test_stream_results_as_ndjson(client):
+    """Each result is one line with its scores, followed by a summary line"""
+    storage = get_evaluation_service().storage
+    storage.create_evaluation_run(
+        {
+            "id": "run-stream",
+            "test_case_ids": ["tc-1"],
+            "agent_endpoint_url": "http://agent",
+            "grader_ids": ["string-match"],
+            "status": "completed",
+            "created_at": "2026-01-01T00:00:00",
+        }
+    )
+    storage.create_evaluation_results_many(
+        [
+            {
+                "id": f"r-{i}",
+                "run_id": "run-stream",
+                "test_case_id": "tc-1",
+                "agent_response": "Paris",
+                "response_latency_ms": 10 * i,
+                "response_status": "success",
+            }
+            for i in range(3)
+        ]
+    )
+    storage.create_scores_many(
+        [
+            {
+                "id": f"s-{i}",
+                "result_id": f"r-{i}",
+                "grader_id": "string-match",
+                "passed": i != 1,
+                "score": 1.0,
+            }
+            for i in range(3)
+        ]
+    )
+
+    response = await client.get("/api/evaluations/run-stream/results/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["result", "result", "result", "summary"]
+    assert [line["data"]["id"] for line in lines[:3]] == ["r-0", "r-1", "r-2"]
+    assert [s["id"] for s in lines[1]["data"]["scores"]] == ["s-1"]
+    summary = lines[-1]["data"]
+    assert summary["results"]["total"] == 3
+    assert summary["scores"]["passed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_results_not_found(client):
+    response = await client.get("/api/evaluations/missing/results/stream")
+    assert response.status_code == 404
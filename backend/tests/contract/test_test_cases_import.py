@@ -0,0 +1,49 @@
+"""
+Contract tests for POST /api/test-cases/import
+"""
+import json
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_import_jsonl_stream(client):
+    async def body():
+        for i in range(3):
+            yield (json.dumps({"input": f"import q{i}", "expected_output": "a"}) + "\n").encode()
+        yield b'{"input": "import bad"}\n'
+
+    response = await client.post(
+        "/api/test-cases/import", content=body(), headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    report = response.json()["data"]
+    assert (report["imported"], report["failed"]) == (3, 1)
+    assert report["errors"][0]["line"] == 4
+    listed = await client.get("/api/test-cases", params={"limit": 100})
+    assert {"import q0", "import q1", "import q2"} <= {tc["input"] for tc in listed.json()["data"]}
+
+
+@pytest.mark.asyncio
+async def test_import_csv_by_content_type(client):
+    response = await client.post(
+        "/api/test-cases/import",
+        content=b"input,expected_output\ncsv q,csv a\n",
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["imported"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params,content",
+    [
+        ({"format": "xml"}, b"<cases/>"),
+        ({"format": "csv"}, b"question,answer\nq,a\n"),
+    ],
+)
+async def test_import_rejects_bad_format_or_header(client, params, content):
+    response = await client.post("/api/test-cases/import", params=params, content=content)
+    assert response.status_code == 400
@@ -29,3 +29,29 @@ async def test_list_test_cases_invalid_limit(client):
     """Test listing test cases with invalid limit"""
     response = await client.get("/api/test-cases?skip=0&limit=0")
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_list_test_cases_with_cursor(client):
+    """Test walking test cases with keyset pagination"""
+    for i in range(3):
+        await client.post("/api/test-cases", json={"input": f"q{i}", "expected_output": "a"})
+
+    response = await client.get("/api/test-cases?limit=2&sort=-created_at")
+    assert response.status_code == 200
+    first = response.json()
+    assert [tc["input"] for tc in first["data"]] == ["q2", "q1"]
+    assert first["next_cursor"]
+
+    response = await client.get(f"/api/test-cases?limit=2&cursor={first['next_cursor']}")
+    second = response.json()
+    assert second["data"][0]["input"] == "q0"
+
+
+@pytest.mark.asyncio
+async def test_list_test_cases_invalid_cursor(client):
+    """Test listing test cases with a malformed cursor or skip plus cursor"""
+    response = await client.get("/api/test-cases?cursor=bogus")
+    assert response.status_code == 400
+    response = await client.get("/api/test-cases?skip=5&sort=id")
+    assert response.status_code == 400
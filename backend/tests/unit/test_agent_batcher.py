@@ -0,0 +1,48 @@
+"""
+Unit tests for AgentBatcher
+"""
+import asyncio
+import pytest
+from src.services.agent_batcher import AgentBatcher
+
+
+def make_batcher(batch_size=3, max_wait=0.01, fail_batches=False):
+    """Build a batcher with recording senders"""
+    batches = []
+    singles = []
+
+    async def send_batch(inputs):
+        batches.append(list(inputs))
+        if fail_batches:
+            return {"status": "error", "error": "batch endpoint down"}
+        return {"status": "success", "responses": [i.upper() for i in inputs], "latency_ms": 5}
+
+    async def send_single(input_text):
+        singles.append(input_text)
+        return {"status": "success", "response": input_text.upper(), "latency_ms": 1}
+
+    return AgentBatcher(send_batch, send_single, batch_size, max_wait), batches, singles
+
+
+@pytest.mark.asyncio
+async def test_batches_by_size_and_wait():
+    """Full batches are sent immediately and the remainder after max_wait"""
+    batcher, batches, singles = make_batcher(batch_size=3)
+
+    results = await asyncio.gather(*(batcher.submit(f"q{i}") for i in range(7)))
+
+    assert [r["response"] for r in results] == [f"Q{i}" for i in range(7)]
+    assert batches == [["q0", "q1", "q2"], ["q3", "q4", "q5"], ["q6"]]
+    assert singles == []
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_single_calls():
+    """Inputs of a failed batch are retried one by one"""
+    batcher, batches, singles = make_batcher(batch_size=2, fail_batches=True)
+
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+
+    assert [r["response"] for r in results] == ["A", "B"]
+    assert batches == [["a", "b"]]
+    assert sorted(singles) == ["a", "b"]
@@ -0,0 +1,204 @@
+"""
+Unit tests for AgentClient
+"""
+import asyncio
+import json
+from collections import deque
+import httpx
+import pytest
+from src.services.agent_client import AgentClient
+
+
+def make_transport(handler):
+    """Build a mock transport that counts requests"""
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_call_agent_success():
+    """Successful calls return the agent response"""
+
+    def handler(request):
+        return httpx.Response(200, json={"response": "Paris"})
+
+    client = AgentClient(transport=make_transport(handler))
+    result = await client.call_agent("http://agent.test/evaluate", "Capital of France?")
+    await client.aclose()
+
+    assert result["status"] == "success"
+    assert result["response"] == "Paris"
+    assert result["latency_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_client_is_shared_per_endpoint():
+    """Calls to the same endpoint reuse one pooled client"""
+
+    def handler(request):
+        return httpx.Response(200, json={"response": "ok"})
+
+    client = AgentClient(transport=make_transport(handler))
+    first = client._get_client("http://agent.test/evaluate")
+    second = client._get_client("http://agent.test/other-path")
+    other = client._get_client("http://other.test/evaluate")
+
+    assert first is second
+    assert first is not other
+
+    await client.aclose()
+    assert first.is_closed
+    assert client._clients == {}
+
+
+@pytest.mark.asyncio
+async def test_call_agent_http_error():
+    """HTTP errors are reported as error results"""
+
+    def handler(request):
+        return httpx.Response(500, json={"detail": "boom"})
+
+    client = AgentClient(transport=make_transport(handler))
+    result = await client.call_agent("http://agent.test/evaluate", "input")
+    await client.aclose()
+
+    assert result["status"] == "error"
+    assert "500" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_call_agent_retries_transient_failures():
+    """A 503 blip is retried and the attempts are recorded"""
+    statuses = [503, 200]
+
+    def handler(request):
+        code = statuses.pop(0)
+        return httpx.Response(code, json={"response": "ok"})
+
+    client = AgentClient(transport=make_transport(handler), retry_backoff_base=0.001)
+    result = await client.call_agent("http://agent.test/evaluate", "input")
+    await client.aclose()
+
+    assert result["status"] == "success"
+    assert result["attempts"] == 2
+    assert len(result["attempt_latencies_ms"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_call_agent_gives_up_after_max_retries():
+    """Persistent connection failures end as an error after max_retries"""
+
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = AgentClient(transport=make_transport(handler), max_retries=2, retry_backoff_base=0.001)
+    result = await client.call_agent("http://agent.test/evaluate", "input")
+    await client.aclose()
+
+    assert result["status"] == "error"
+    assert result["attempts"] == 3
+
+
+@pytest.mark.asyncio
+async def test_call_agent_hedges_slow_requests():
+    """A request past the observed p95 is hedged and the faster answer wins"""
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={"response": "slow"})
+        return httpx.Response(200, json={"response": "fast"})
+
+    client = AgentClient(transport=make_transport(handler), hedging=True, hedge_min_samples=5)
+    client._latencies["http://agent.test/evaluate"] = deque([10] * 5)
+
+    result = await client.call_agent("http://agent.test/evaluate", "input")
+    await client.aclose()
+
+    assert result["status"] == "success"
+    assert result["response"] == "fast"
+    assert result["attempts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_awaits_the_losing_request():
+    """The slower hedged request is cancelled and finished, not left pending"""
+    cancelled = asyncio.Event()
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return httpx.Response(200, json={"response": "fast"})
+
+    client = AgentClient(transport=make_transport(handler), hedging=True, hedge_min_samples=5)
+    client._latencies["http://agent.test/evaluate"] = deque([10] * 5)
+
+    result = await client.call_agent("http://agent.test/evaluate", "input")
+    assert cancelled.is_set()
+    await client.aclose()
+
+    assert result["response"] == "fast"
+
+
+@pytest.mark.asyncio
+async def test_call_agent_stops_retrying_at_total_timeout():
+    """Timeouts are retried only while the call's total time allows it"""
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={"response": "late"})
+
+    client = AgentClient(
+        transport=make_transport(handler),
+        timeout=1,
+        total_timeout=0.15,
+        max_retries=5,
+        retry_backoff_base=0.001,
+    )
+    started = asyncio.get_running_loop().time()
+    result = await client.call_agent("http://agent.test/evaluate", "input")
+    elapsed = asyncio.get_running_loop().time() - started
+    await client.aclose()
+
+    assert result["status"] == "timeout"
+    assert elapsed < 0.5
+    assert len(calls) < 6
+
+
+@pytest.mark.asyncio
+async def test_call_agent_batch_splits_responses():
+    """Batch calls send all inputs and return responses in order"""
+
+    def handler(request):
+        inputs = json.loads(request.content)["inputs"]
+        return httpx.Response(200, json={"responses": [i.upper() for i in inputs]})
+
+    client = AgentClient(transport=make_transport(handler))
+    result = await client.call_agent_batch("http://agent.test/evaluate/batch", ["a", "b"])
+    await client.aclose()
+
+    assert result["status"] == "success"
+    assert result["responses"] == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_call_agent_batch_rejects_mismatched_responses():
+    """A batch response with the wrong number of items is an error"""
+
+    def handler(request):
+        return httpx.Response(200, json={"responses": ["only one"]})
+
+    client = AgentClient(transport=make_transport(handler))
+    result = await client.call_agent_batch("http://agent.test/evaluate/batch", ["a", "b"])
+    await client.aclose()
+
+    assert result["status"] == "error"
@@ -0,0 +1,245 @@
+"""
+Unit tests for the columnar AnalyticsStore
+"""
+import pytest
+import threading
+from src.services.analytics_store import AnalyticsStore, RunColumns
+from src.services.storage import InMemoryStorage
+from src.services.write_buffer import WriteBuffer
+
+
+def make_result(result_id, status="success", latency=100.0, test_case_id="tc-1"):
+    return {
+        "id": result_id,
+        "run_id": "run-a",
+        "test_case_id": test_case_id,
+        "response_status": status,
+        "response_latency_ms": latency,
+    }
+
+
+def make_score(score_id, result_id, grader_id, passed, score=None):
+    return {
+        "id": score_id,
+        "result_id": result_id,
+        "grader_id": grader_id,
+        "passed": passed,
+        "score": score if score is not None else (1.0 if passed else 0.0),
+    }
+
+
+def test_result_summary_matches_baseline_formula():
+    """Counts and avg latency match the per-record computation, plus percentiles"""
+    columns = RunColumns("run-a")
+    columns.append_results(
+        [
+            make_result("r1", latency=100.0),
+            make_result("r2", latency=300.0),
+            make_result("r3", status="error", latency=50.0),
+            make_result("r4", status="timeout", latency=None),
+        ]
+    )
+
+    summary = columns.result_summary()
+
+    assert summary["total"] == 4
+    assert summary["successful"] == 2
+    assert summary["failed"] == 1
+    assert summary["timeout"] == 1
+    # Sum of every recorded latency over the successful count
+    assert summary["avg_latency_ms"] == 225.0
+    assert summary["latency_percentiles_ms"]["p50"] == 200.0
+    assert summary["by_status"]["timeout"] == {"total": 1, "avg_latency_ms": None}
+
+
+def test_empty_run_summaries():
+    """A run with no records summarizes to zeros"""
+    columns = RunColumns("run-a")
+
+    assert columns.result_summary()["total"] == 0
+    assert columns.result_summary()["avg_latency_ms"] == 0
+    assert columns.result_summary()["latency_percentiles_ms"]["p99"] is None
+    assert columns.score_summary() == {
+        "total_scores": 0,
+        "passed": 0,
+        "failed": 0,
+        "by_grader": {},
+        "by_tag": {},
+    }
+
+
+def test_score_summary_groups_by_grader_and_tag():
+    """Scores are grouped by grader and by the tags of their results' test cases"""
+    tags = {"tc-1": ["geo", "easy"], "tc-2": ["geo"]}
+    columns = RunColumns("run-a")
+    columns.append_results(
+        [make_result("r1", test_case_id="tc-1"), make_result("r2", test_case_id="tc-2")],
+        lambda test_case_id: tags.get(test_case_id, []),
+    )
+    columns.append_scores(
+        [
+            make_score("s1", "r1", "string_match", True),
+            make_score("s2", "r1", "length", False, score=0.5),
+            make_score("s3", "r2", "string_match", False),
+            make_score("s4", "unknown", "string_match", True),
+        ]
+    )
+
+    summary = columns.score_summary()
+
+    assert summary["total_scores"] == 3
+    assert summary["passed"] == 1
+    assert summary["by_grader"]["string_match"] == {
+        "total": 2,
+        "passed": 1,
+        "failed": 1,
+        "mean_score": 0.5,
+    }
+    assert summary["by_grader"]["length"]["mean_score"] == 0.5
+    assert summary["by_tag"]["geo"] == {"results": 2, "total": 3, "passed": 1, "failed": 2}
+    assert summary["by_tag"]["easy"] == {"results": 1, "total": 2, "passed": 1, "failed": 1}
+
+
+def test_columns_grow_past_initial_capacity():
+    """Appending beyond the initial array capacity keeps every row"""
+    columns = RunColumns("run-a")
+    for start in range(0, 1000, 100):
+        columns.append_results([make_result(f"r{i}") for i in range(start, start + 100)])
+
+    assert columns.result_summary()["total"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_live_run_is_fed_by_write_buffer():
+    """Records flushed by a run's write buffer show up in its columns"""
+    storage = InMemoryStorage()
+    storage.create_test_case({"id": "tc-1", "tags": ["geo"]})
+    storage.create_evaluation_run({"id": "run-a", "status": "running"})
+    analytics = AnalyticsStore(storage)
+    columns = analytics.start_run("run-a")
+    buffer = WriteBuffer(
+        storage,
+        max_items=100,
+        max_wait=60,
+        on_flush=lambda results, scores: analytics.append(columns, results, scores),
+    )
+
+    buffer.add_result(make_result("r1"))
+    buffer.add_scores([make_score("s1", "r1", "string_match", True)])
+    assert analytics.get_run("run-a").result_summary()["total"] == 0
+
+    buffer.flush()
+
+    summary = analytics.get_run("run-a").score_summary()
+    assert summary["total_scores"] == 1
+    assert summary["by_tag"]["geo"]["passed"] == 1
+
+
+def test_append_uses_the_given_tags_without_reading_storage():
+    """A run that already holds its test cases passes their tags in"""
+    storage = InMemoryStorage()
+    storage.create_test_case({"id": "tc-1", "tags": ["stored"]})
+    analytics = AnalyticsStore(storage)
+    columns = analytics.start_run("run-a")
+
+    tags_for = AnalyticsStore.tags_in({"tc-1": {"id": "tc-1", "tags": ["held"]}})
+    analytics.append(columns, [make_result("r1")], [], tags_for)
+
+    assert list(columns.score_summary()["by_tag"]) == ["held"]
+
+
+def test_summaries_while_appending_from_another_thread():
+    """A summary built while a live run is appended to sees consistent columns"""
+    columns = RunColumns("run-a")
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                columns.result_summary()
+                columns.score_summary()
+            except Exception as e:  # pragma: no cover - what the lock prevents
+                errors.append(e)
+                return
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for batch in range(300):
+            ids = [f"r{batch}-{i}" for i in range(20)]
+            columns.append_results([make_result(result_id) for result_id in ids], lambda _: ["geo"])
+            columns.append_scores(
+                [make_score(f"s-{result_id}", result_id, "exact", True) for result_id in ids]
+            )
+    finally:
+        done.set()
+        reader.join()
+
+    assert errors == []
+    assert columns.result_summary()["total"] == 6000
+
+
+def test_built_from_storage_and_cached_once_finished():
+    """Other runs are read from storage; only finished runs are cached"""
+    storage = InMemoryStorage()
+    storage.create_evaluation_run({"id": "run-a", "status": "running"})
+    storage.create_evaluation_result(make_result("r1"))
+    analytics = AnalyticsStore(storage)
+
+    assert analytics.get_run("run-a").result_summary()["total"] == 1
+    storage.create_evaluation_result(make_result("r2"))
+    assert analytics.get_run("run-a").result_summary()["total"] == 2
+
+    storage.update_evaluation_run("run-a", {"status": "completed"})
+    assert analytics.get_run("run-a") is analytics.get_run("run-a")
+
+    analytics.invalidate("run-a")
+    storage.create_evaluation_result(make_result("r3"))
+    assert analytics.get_run("run-a").result_summary()["total"] == 3
+
+
+def test_cached_run_is_rebuilt_when_its_version_moves_on():
+    """A finished run changed by another worker (a new version) is read again"""
+    storage = InMemoryStorage()
+    storage.create_evaluation_run({"id": "run-a", "status": "completed"})
+    storage.create_evaluation_result(make_result("r1"))
+    analytics = AnalyticsStore(storage)
+    cached = analytics.get_run("run-a")
+    assert analytics.get_run("run-a") is cached
+
+    storage.create_evaluation_result(make_result("r2"))
+    storage.update_evaluation_run("run-a", {"stats": None})
+
+    assert analytics.get_run("run-a").result_summary()["total"] == 2
+
+
+def test_live_run_is_checked_once_finished():
+    """Live columns are stamped with the final version, then checked like built ones"""
+    storage = InMemoryStorage()
+    storage.create_evaluation_run({"id": "run-a", "status": "running"})
+    analytics = AnalyticsStore(storage)
+    live = analytics.start_run("run-a")
+    analytics.append(live, [make_result("r1")], [])
+    final = storage.update_evaluation_run("run-a", {"status": "completed"})
+    analytics.finish_run("run-a", final["version"])
+    assert analytics.get_run("run-a") is live
+
+    storage.create_evaluation_result(make_result("r1"))
+    storage.create_evaluation_result(make_result("r2"))
+    storage.update_evaluation_run("run-a", {"stats": None})
+
+    assert analytics.get_run("run-a") is not live
+    assert analytics.get_run("run-a").result_summary()["total"] == 2
+
+
+def test_evicts_least_recently_used_run():
+    """At most max_runs runs stay cached"""
+    analytics = AnalyticsStore(InMemoryStorage(), max_runs=2)
+    first = analytics.start_run("run-a")
+    analytics.start_run("run-b")
+    analytics.get_run("run-a")
+    analytics.start_run("run-c")
+
+    assert analytics.get_run("run-a") is first
+    assert "run-b" not in analytics._runs
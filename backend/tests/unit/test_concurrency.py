@@ -0,0 +1,71 @@
+"""
+Unit tests for the adaptive (AIMD) concurrency limiter
+"""
+import asyncio
+import pytest
+from src.services.concurrency import AdaptiveConcurrencyLimiter
+
+
+async def run_calls(limiter, count, status="success", latency_ms=10):
+    """Run count calls that all saturate the limiter"""
+
+    async def call():
+        await limiter.acquire()
+        await asyncio.sleep(0)
+        limiter.release(status, latency_ms)
+
+    await asyncio.gather(*(call() for _ in range(count)))
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_while_healthy():
+    """Successful calls at steady latency raise the limit additively"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=10)
+    await run_calls(limiter, 50)
+
+    assert 2 < limiter.current_limit <= 10
+    assert limiter.in_flight == 0
+    assert limiter.snapshot()["latency_ms"] == 10
+
+
+@pytest.mark.asyncio
+async def test_limit_backs_off_on_failures():
+    """Timeouts and errors cut the limit multiplicatively, down to the floor"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=16, min_limit=2)
+
+    await limiter.acquire()
+    limiter.release("timeout", 1000)
+    assert limiter.current_limit == 8
+
+    for _ in range(10):
+        limiter._last_decrease = 0.0
+        await limiter.acquire()
+        limiter.release("error", 5)
+    assert limiter.current_limit == 2
+    assert limiter.snapshot()["error_rate"] > 0.5
+
+
+@pytest.mark.asyncio
+async def test_limit_holds_when_latency_degrades():
+    """Successes well above the latency baseline don't grow the limit"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=10)
+    await run_calls(limiter, 2, latency_ms=10)
+    grown = limiter.limit
+
+    await run_calls(limiter, 30, latency_ms=500)
+    assert limiter.limit <= grown + 1
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_at_limit():
+    """Callers beyond the limit wait until a slot is released"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    limiter.release()
+    await asyncio.wait_for(waiter, timeout=1)
+    assert limiter.in_flight == 1
@@ -0,0 +1,476 @@
+"""
+Unit tests for EvaluationService
+"""
+import asyncio
+import threading
+import pytest
+from src.services.evaluation_service import EvaluationService
+from src.services.test_case_service import TestCaseService
+from src.services.storage_service import StorageService
+from src.services.storage import InMemoryStorage
+from src.services.concurrency import reset_concurrency_limiters
+from src.services.response_cache import AgentResponseCache
+from src.services.run_stats import RunStats
+from src.models.evaluation import EvaluationResult
+from src.models.score import Score
+
+
+class FakeAgentClient:
+    """Agent client stub that records how many calls are in flight"""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+
+    async def call_agent(self, endpoint_url: str, input_text: str):
+        self.calls.append(input_text)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Later inputs finish first to exercise result ordering
+            await asyncio.sleep(self.delay / (len(self.calls) + 1))
+        finally:
+            self.in_flight -= 1
+        if input_text == "boom":
+            return {"status": "error", "latency_ms": 1, "error": "agent failed"}
+        return {"status": "success", "response": input_text.upper(), "latency_ms": 1}
+
+
+@pytest.fixture
+def services():
+    """Create evaluation and test case services sharing one storage"""
+    StorageService.reset_storage()
+    reset_concurrency_limiters()
+    storage = StorageService.get_storage()
+    test_case_service = TestCaseService(storage)
+    evaluation_service = EvaluationService(storage, test_case_service)
+    evaluation_service.agent_client = FakeAgentClient()
+    return evaluation_service, test_case_service
+
+
+@pytest.mark.asyncio
+async def test_execute_evaluation_respects_max_concurrency(services):
+    """Agent calls run concurrently but never exceed the run's limit"""
+    evaluation_service, test_case_service = services
+    ids = [test_case_service.create_test_case(f"input {i}", f"INPUT {i}").id for i in range(20)]
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"], max_concurrency=4
+    )
+
+    completed = await evaluation_service.execute_evaluation(run.id)
+
+    agent = evaluation_service.agent_client
+    assert completed.status == "completed"
+    assert completed.result_count == 20
+    assert 1 < agent.max_in_flight <= 4
+
+
+@pytest.mark.asyncio
+async def test_execute_evaluation_preserves_test_case_order(services):
+    """Results are stored in test-case order regardless of completion order"""
+    evaluation_service, test_case_service = services
+    ids = [test_case_service.create_test_case(f"input {i}", f"INPUT {i}").id for i in range(10)]
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"], max_concurrency=10
+    )
+
+    await evaluation_service.execute_evaluation(run.id)
+
+    results = evaluation_service.get_evaluation_results(run.id)
+    assert [r.test_case_id for r in results] == ids
+
+
+@pytest.mark.asyncio
+async def test_results_are_graded_while_an_earlier_case_is_slow(services):
+    """A slow first case doesn't hold back grading of the cases that finished"""
+    evaluation_service, test_case_service = services
+    ids = [test_case_service.create_test_case("slow", "SLOW").id] + [
+        test_case_service.create_test_case(f"input {i}", f"INPUT {i}").id for i in range(5)
+    ]
+    graded = []
+    others_graded = asyncio.Event()
+    grade_results = evaluation_service.grading_service.grade_results
+
+    async def recording_grade_results(items, *args):
+        graded.extend(result["test_case_id"] for result, _ in items)
+        if set(ids[1:]) <= set(graded):
+            others_graded.set()
+        await grade_results(items, *args)
+
+    class SlowFirstAgent(FakeAgentClient):
+        async def call_agent(self, endpoint_url, input_text):
+            if input_text == "slow":
+                await asyncio.wait_for(others_graded.wait(), timeout=2)
+            return await super().call_agent(endpoint_url, input_text)
+
+    evaluation_service.grading_service.grade_results = recording_grade_results
+    evaluation_service.agent_client = SlowFirstAgent()
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"], max_concurrency=10
+    )
+
+    completed = await evaluation_service.execute_evaluation(run.id)
+
+    assert completed.status == "completed"
+    assert graded[-1] == ids[0]
+    results = evaluation_service.get_evaluation_results(run.id)
+    assert [r.test_case_id for r in results] == ids
+    assert len(evaluation_service.storage.list_all_scores(run.id)) == 6
+
+
+@pytest.mark.asyncio
+async def test_run_fails_when_grading_stage_dies(services, monkeypatch):
+    """A dead grading stage fails the run instead of blocking on a full queue"""
+    evaluation_service, test_case_service = services
+    monkeypatch.setattr("src.services.evaluation_service.GRADING_QUEUE_SIZE", 1)
+    ids = [test_case_service.create_test_case(f"input {i}", f"INPUT {i}").id for i in range(10)]
+
+    async def broken_grade_results(*args):
+        raise OSError("disk full")
+
+    evaluation_service.grading_service.grade_results = broken_grade_results
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"], max_concurrency=10
+    )
+
+    with pytest.raises(OSError, match="disk full"):
+        await asyncio.wait_for(evaluation_service.execute_evaluation(run.id), timeout=5)
+    assert evaluation_service.get_evaluation_run(run.id).status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_run_fails_when_storage_reports_failed_writes(services, monkeypatch):
+    """Results the backend failed to store fail the run instead of being lost silently"""
+    evaluation_service, test_case_service = services
+    ids = [test_case_service.create_test_case("input", "INPUT").id]
+
+    def failed_flush():
+        raise RuntimeError("1 SQLite write(s) failed")
+
+    monkeypatch.setattr(evaluation_service.storage, "flush", failed_flush)
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"]
+    )
+
+    with pytest.raises(RuntimeError, match="write"):
+        await evaluation_service.execute_evaluation(run.id)
+    assert evaluation_service.get_evaluation_run(run.id).status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_stream_evaluation_results_in_chunks(services):
+    """Streamed results match the stored ones and end with the run's summary"""
+    evaluation_service, test_case_service = services
+    ids = [
+        test_case_service.create_test_case(f"input {i}", f"INPUT {i}" if i % 3 else "no").id
+        for i in range(10)
+    ]
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"], max_concurrency=10
+    )
+    await evaluation_service.execute_evaluation(run.id)
+
+    records = list(evaluation_service.stream_evaluation_results(run.id, chunk_size=3))
+
+    assert [r["type"] for r in records] == ["result"] * 10 + ["summary"]
+    assert [r["data"]["test_case_id"] for r in records[:-1]] == ids
+    assert all(len(r["data"]["scores"]) == 1 for r in records[:-1])
+    columns = evaluation_service.analytics.get_run(run.id)
+    assert records[-1]["data"] == {
+        "results": columns.result_summary(),
+        "scores": columns.score_summary(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_execute_evaluation_isolates_failures(services):
+    """Missing test cases are skipped and agent errors are recorded per case"""
+    evaluation_service, test_case_service = services
+    ok_id = test_case_service.create_test_case("fine", "FINE").id
+    bad_id = test_case_service.create_test_case("boom", "BOOM").id
+    run = evaluation_service.create_evaluation_run(
+        [ok_id, "missing", bad_id], "http://agent.test/evaluate", ["string-match"]
+    )
+
+    completed = await evaluation_service.execute_evaluation(run.id)
+
+    results = evaluation_service.get_evaluation_results(run.id)
+    assert completed.result_count == 2
+    assert [r.response_status for r in results] == ["success", "error"]
+
+
+@pytest.mark.asyncio
+async def test_results_are_graded_while_agent_calls_are_in_flight(services):
+    """Scores for early results are stored before the slowest agent call returns"""
+    evaluation_service, test_case_service = services
+    storage = evaluation_service.storage
+    fast_id = test_case_service.create_test_case("fast", "FAST").id
+    slow_id = test_case_service.create_test_case("slow", "SLOW").id
+    release_slow = asyncio.Event()
+    scores_seen_early = []
+
+    class GatedAgentClient:
+        async def call_agent(self, endpoint_url, input_text):
+            if input_text == "slow":
+                await release_slow.wait()
+            return {"status": "success", "response": input_text.upper(), "latency_ms": 1}
+
+    evaluation_service.agent_client = GatedAgentClient()
+    run = evaluation_service.create_evaluation_run(
+        [fast_id, slow_id], "http://agent.test/evaluate", ["string-match"]
+    )
+
+    async def observe_then_release():
+        for _ in range(1000):
+            results = storage.list_evaluation_results(run.id)
+            if results and storage.list_scores(results[0]["id"]):
+                scores_seen_early.append(True)
+                break
+            await asyncio.sleep(0.001)
+        release_slow.set()
+
+    await asyncio.gather(evaluation_service.execute_evaluation(run.id), observe_then_release())
+
+    assert scores_seen_early == [True]
+    assert len(storage.list_all_scores(run.id)) == 2
+    assert evaluation_service.get_evaluation_run(run.id).status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_execute_evaluation_in_batch_mode(services):
+    """Batch mode groups agent calls and still stores one result per test case"""
+    evaluation_service, test_case_service = services
+    batches = []
+
+    class BatchAgentClient(FakeAgentClient):
+        async def call_agent_batch(self, endpoint_url, inputs):
+            batches.append(list(inputs))
+            return {"status": "success", "responses": [i.upper() for i in inputs], "latency_ms": 2}
+
+    evaluation_service.agent_client = BatchAgentClient()
+    ids = [test_case_service.create_test_case(f"input {i}", f"INPUT {i}").id for i in range(5)]
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"], batch_size=2, batch_max_wait_ms=5
+    )
+
+    completed = await evaluation_service.execute_evaluation(run.id)
+
+    results = evaluation_service.get_evaluation_results(run.id)
+    assert completed.result_count == 5
+    assert [r.test_case_id for r in results] == ids
+    assert all(r.agent_response == r.agent_response.upper() for r in results)
+    assert sorted(len(b) for b in batches) == [1, 2, 2]
+    assert evaluation_service.agent_client.calls == []
+
+
+@pytest.mark.asyncio
+async def test_duplicate_inputs_share_cached_agent_calls(services):
+    """With a pinned agent_version, identical inputs reach the agent once"""
+    evaluation_service, test_case_service = services
+    evaluation_service.response_cache = AgentResponseCache()
+    ids = [
+        test_case_service.create_test_case("same question", "SAME QUESTION").id for _ in range(3)
+    ]
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"], agent_version="build-42"
+    )
+
+    await evaluation_service.execute_evaluation(run.id)
+
+    results = evaluation_service.get_evaluation_results(run.id)
+    assert evaluation_service.agent_client.calls == ["same question"]
+    assert [r.cached for r in results] == [False, True, True]
+
+
+@pytest.mark.asyncio
+async def test_watch_run_follows_execution(services):
+    """Watching a run yields its record, stored results and scores, progress and status"""
+    evaluation_service, test_case_service = services
+    ids = [test_case_service.create_test_case(f"input {i}", f"INPUT {i}").id for i in range(3)]
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"]
+    )
+
+    watched = evaluation_service.watch_run(run.id, keepalive=5)
+    first = await watched.__anext__()  # subscribed and read the pending run
+    execution = asyncio.create_task(evaluation_service.execute_evaluation(run.id))
+
+    async def collect():
+        return [first] + [event async for event in watched]
+
+    events = await asyncio.wait_for(collect(), 5)
+    await execution
+
+    runs = [e["data"]["status"] for e in events if e["type"] == "run"]
+    assert runs == ["pending", "running", "completed"]
+    assert [e["data"]["test_case_id"] for e in events if e["type"] == "result"] == ids
+    assert len([e for e in events if e["type"] == "score"]) == 3
+    assert [e for e in events if e["type"] == "progress"][-1]["data"] == {
+        "results": 3,
+        "scores": 3,
+        "total": 3,
+    }
+    assert events[-1]["type"] == "run"
+
+
+@pytest.mark.asyncio
+async def test_execution_calls_storage_off_the_event_loop(monkeypatch):
+    """Record updates, bulk writes, stats saves and the final flush run in threads"""
+    monkeypatch.setattr("src.services.evaluation_service.RUN_STATS_SAVE_INTERVAL_S", 0)
+    calls = []
+
+    class RecordingStorage(InMemoryStorage):
+        pass
+
+    for name in (
+        "get_evaluation_run",
+        "update_evaluation_run",
+        "get_test_cases_many",
+        "create_evaluation_results_many",
+        "create_scores_many",
+        "flush",
+    ):
+
+        def recorded(self, *args, _name=name, **kwargs):
+            calls.append((_name, threading.get_ident()))
+            return getattr(InMemoryStorage, _name)(self, *args, **kwargs)
+
+        setattr(RecordingStorage, name, recorded)
+
+    reset_concurrency_limiters()
+    storage = RecordingStorage()
+    test_case_service = TestCaseService(storage)
+    evaluation_service = EvaluationService(storage, test_case_service)
+    evaluation_service.agent_client = FakeAgentClient()
+    ids = [test_case_service.create_test_case(f"input {i}", f"INPUT {i}").id for i in range(5)]
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"]
+    )
+    calls.clear()
+
+    await evaluation_service.execute_evaluation(run.id)
+
+    called = {name for name, _ in calls}
+    assert {"update_evaluation_run", "create_evaluation_results_many", "flush"} <= called
+    assert threading.get_ident() not in {thread for _, thread in calls}
+
+
+@pytest.mark.asyncio
+async def test_watch_run_follows_a_run_executing_elsewhere(services):
+    """A run written by another worker (no bus events) is followed through storage"""
+    evaluation_service, test_case_service = services
+    storage = evaluation_service.storage
+    ids = [test_case_service.create_test_case(f"input {i}", f"INPUT {i}").id for i in range(2)]
+    run = evaluation_service.create_evaluation_run(
+        ids, "http://agent.test/evaluate", ["string-match"]
+    )
+    events = []
+
+    async def collect():
+        async for event in evaluation_service.watch_run(run.id, keepalive=5, poll=0.01):
+            events.append(event)
+
+    watcher = asyncio.create_task(collect())
+    await asyncio.sleep(0.05)
+    # Another worker executes the run: it writes straight to the shared storage
+    storage.update_evaluation_run(run.id, {"status": "running"})
+    results = [
+        EvaluationResult(run_id=run.id, test_case_id=test_case_id, agent_response="x").to_dict()
+        for test_case_id in ids
+    ]
+    storage.create_evaluation_results_many(results)
+    await asyncio.sleep(0.05)
+    storage.create_scores_many(
+        [
+            Score(result_id=result["id"], grader_id="string-match", passed=False).to_dict()
+            for result in results
+        ]
+    )
+    storage.update_evaluation_run(run.id, {"status": "completed", "result_count": 2})
+    await asyncio.wait_for(watcher, 5)
+
+    assert all(event["id"] is None for event in events)
+    runs = [e["data"]["status"] for e in events if e["type"] == "run"]
+    assert runs == ["pending", "running", "completed"]
+    assert [e["data"]["id"] for e in events if e["type"] == "result"] == [
+        result["id"] for result in results
+    ]
+    assert len([e for e in events if e["type"] == "score"]) == 2
+    assert [e for e in events if e["type"] == "progress"][-1]["data"] == {
+        "results": 2,
+        "scores": 2,
+        "total": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_watch_runs_sees_runs_of_other_workers(services):
+    """Changes to runs made outside this worker come through as run events"""
+    evaluation_service, test_case_service = services
+    storage = evaluation_service.storage
+    run = evaluation_service.create_evaluation_run(
+        [test_case_service.create_test_case("a", "A").id],
+        "http://agent.test/evaluate",
+        ["string-match"],
+    )
+    events = evaluation_service.watch_runs(keepalive=5, poll=0.01)
+    first = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0.02)
+    storage.update_evaluation_run(run.id, {"status": "running"})
+    event = await asyncio.wait_for(first, 5)
+    await events.aclose()
+
+    assert event["id"] is None
+    assert event["run_id"] == run.id and event["data"]["status"] == "running"
+
+
+@pytest.mark.asyncio
+async def test_run_stats_are_kept_while_executing(services, monkeypatch):
+    """Stats are readable as soon as results are stored, and saved with the result count"""
+    monkeypatch.setattr("src.services.evaluation_service.RUN_STATS_SAVE_INTERVAL_S", 0)
+    evaluation_service, test_case_service = services
+    storage = evaluation_service.storage
+    fast_id = test_case_service.create_test_case("fast", "FAST").id
+    slow_id = test_case_service.create_test_case("slow", "nope").id
+    release_slow = asyncio.Event()
+    seen_mid_run = []
+
+    class GatedAgentClient:
+        async def call_agent(self, endpoint_url, input_text):
+            if input_text == "slow":
+                await release_slow.wait()
+            return {"status": "success", "response": input_text.upper(), "latency_ms": 7}
+
+    evaluation_service.agent_client = GatedAgentClient()
+    run = evaluation_service.create_evaluation_run(
+        [fast_id, slow_id], "http://agent.test/evaluate", ["string-match"]
+    )
+
+    async def observe_then_release():
+        for _ in range(1000):
+            record = storage.get_evaluation_run(run.id)
+            stats = record.get("stats")
+            if stats and stats["scores"]:
+                live = evaluation_service.get_run_stats(
+                    evaluation_service.get_evaluation_run(run.id)
+                )
+                seen_mid_run.append((record["result_count"], stats, live))
+                break
+            await asyncio.sleep(0.001)
+        release_slow.set()
+
+    await asyncio.gather(evaluation_service.execute_evaluation(run.id), observe_then_release())
+
+    result_count, stats, live = seen_mid_run[0]
+    assert (result_count, stats["results"], stats["passed"]) == (1, 1, 1)
+    assert live == stats
+    completed = evaluation_service.get_evaluation_run(run.id)
+    assert (
+        completed.stats
+        == RunStats.compute(
+            storage.list_evaluation_results(run.id), storage.list_all_scores(run.id)
+        ).to_dict()
+    )
+    assert completed.stats["by_grader"]["string-match"]["failed"] == 1
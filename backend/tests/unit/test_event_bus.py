@@ -0,0 +1,61 @@
+"""
+Unit tests for the run event bus
+"""
+import asyncio
+import threading
+import pytest
+from src.services.event_bus import RunEventBus
+
+
+@pytest.mark.asyncio
+async def test_events_reach_run_and_all_runs_subscribers():
+    """Run subscribers get every event of their run; all-runs ones only run-level events"""
+    bus = RunEventBus()
+    run_a = bus.subscribe("run-a")
+    everything = bus.subscribe()
+
+    bus.publish("run-a", "result", {"id": "r1"})
+    bus.publish("run-a", "progress", {"results": 1})
+    bus.publish("run-b", "run", {"status": "running"})
+
+    assert [(await run_a.get())["type"] for _ in range(2)] == ["result", "progress"]
+    assert run_a.queue.empty()
+    received = [await everything.get() for _ in range(2)]
+    assert [(e["run_id"], e["type"]) for e in received] == [("run-a", "progress"), ("run-b", "run")]
+    assert received[0]["id"] < received[1]["id"]
+
+    bus.unsubscribe(run_a)
+    assert not bus.has_subscribers("run-a", "result")
+    assert bus.has_subscribers("run-a", "progress")
+    bus.unsubscribe(everything)
+    assert not bus.has_subscribers("run-a", "progress")
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_told_to_resync():
+    """A full queue is dropped and replaced by a single resync event"""
+    bus = RunEventBus(queue_size=3)
+    subscription = bus.subscribe("run-a")
+
+    bus.publish_many("run-a", "result", [{"id": f"r{i}"} for i in range(5)])
+
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    assert [e["type"] for e in events] == ["resync", "result"]
+    assert events[1]["data"] == {"id": "r4"}
+    assert subscription.dropped == 3
+
+
+@pytest.mark.asyncio
+async def test_publish_from_another_thread():
+    """Events published off the subscriber's loop are handed over thread-safely"""
+    bus = RunEventBus()
+    subscription = bus.subscribe("run-a")
+
+    publisher = threading.Thread(target=bus.publish, args=("run-a", "score", {"id": "s1"}))
+    publisher.start()
+    publisher.join()
+
+    event = await asyncio.wait_for(subscription.get(), 1)
+    assert event["data"] == {"id": "s1"}
@@ -0,0 +1,104 @@
+"""
+Unit tests for grader executor backends
+"""
+import asyncio
+import time
+import pytest
+from src.services.grader_executor import create_grader_executor, run_grader
+
+
+def slow_or_fast_grader(grader_id, agent_response, expected_output):
+    """Worker function for tests: "hang" sleeps past any timeout"""
+    if agent_response == "hang":
+        time.sleep(30)
+    return run_grader(grader_id, agent_response, expected_output)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["thread", "process", "subprocess"])
+async def test_executor_grades_and_reports_cpu_time(backend):
+    """Every backend runs the grader and records per-grader stats"""
+    executor = create_grader_executor(backend, workers=1)
+    try:
+        result, cpu_seconds = await executor.grade("string-match", "Paris", "paris", timeout=30)
+    finally:
+        executor.shutdown()
+
+    assert result["passed"] is True
+    assert cpu_seconds >= 0
+    stats = executor.snapshot()
+    assert stats["backend"] == backend
+    assert stats["graders"]["string-match"]["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_subprocess_executor_kills_timed_out_worker():
+    """A grader past its timeout is killed and the worker replaced"""
+    executor = create_grader_executor("subprocess", workers=1, worker_fn=slow_or_fast_grader)
+    try:
+        hung_process = executor._all[0].process
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.grade("string-match", "hang", "x", timeout=2)
+
+        assert not hung_process.is_alive()
+        result, _ = await executor.grade("string-match", "ok", "OK", timeout=30)
+        assert result["passed"] is True
+        assert executor.snapshot()["graders"]["string-match"]["timeouts"] == 1
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_reports_grader_errors():
+    """Unknown graders surface as errors"""
+    executor = create_grader_executor("subprocess", workers=1)
+    try:
+        with pytest.raises(RuntimeError, match="not found"):
+            await executor.grade("missing-grader", "a", "b", timeout=30)
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["thread", "process", "subprocess"])
+async def test_executor_grades_batches(backend):
+    """grade_batch returns one result per response and counts each as a call"""
+    executor = create_grader_executor(backend, workers=1)
+    try:
+        results, _ = await executor.grade_batch(
+            "string-match", ["Paris", "Rome"], ["paris", "Madrid"], timeout=30
+        )
+    finally:
+        executor.shutdown()
+
+    assert [r["passed"] for r in results] == [True, False]
+    assert executor.snapshot()["graders"]["string-match"]["calls"] == 2
+
+
+def queued_grader(grader_id, agent_response, expected_output):
+    """Worker function for tests: "hang" sleeps past any timeout, "slow" takes 1s"""
+    if agent_response == "slow":
+        time.sleep(1)
+        return run_grader(grader_id, "ok", expected_output)
+    return slow_or_fast_grader(grader_id, agent_response, expected_output)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["process", "subprocess"])
+async def test_timeout_starts_when_a_worker_picks_up_the_grade(backend):
+    """A grade queued behind a hung one gets its full timeout and still finishes"""
+    executor = create_grader_executor(backend, workers=1, worker_fn=queued_grader)
+    try:
+        # Warm the worker so process start-up isn't part of the race
+        await executor.grade("string-match", "ok", "OK", timeout=30)
+        hung = asyncio.ensure_future(executor.grade("string-match", "hang", "x", timeout=2))
+        await asyncio.sleep(0.2)
+        queued = asyncio.ensure_future(executor.grade("string-match", "slow", "OK", timeout=2))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await hung
+        result, _ = await queued
+        assert result["passed"] is True
+        assert executor.snapshot()["graders"]["string-match"]["timeouts"] == 1
+    finally:
+        executor.shutdown()
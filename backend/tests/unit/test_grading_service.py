@@ -0,0 +1,114 @@
+"""
+Unit tests for GradingService, batch grading and the grader registry
+"""
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.graders.string_match import StringMatchGrader
+from src.services.grading_service import GradingService
+from src.services.grader_executor import ThreadGraderExecutor, run_grader
+from src.services.storage import InMemoryStorage
+from src.services.grader_service import get_grader_registry
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {},
+        {"case_sensitive": True},
+        {"normalize_whitespace": True},
+        {"case_sensitive": True, "normalize_whitespace": True},
+    ],
+)
+def test_string_match_grade_batch_matches_grade(config):
+    """The native batch path gives the same results as grade() per pair"""
+    grader = StringMatchGrader(config=config)
+    responses = ["Paris", "  paris ", "Rome", "PARIS"]
+    expected = ["paris", "paris", "paris", "Paris"]
+
+    assert grader.grade_batch(responses, expected) == [
+        grader.grade(r, e) for r, e in zip(responses, expected)
+    ]
+
+
+def _result(result_id, response, status="success"):
+    return {
+        "id": result_id,
+        "response_status": status,
+        "agent_response": response,
+    }
+
+
+@pytest.mark.asyncio
+async def test_grade_results_stores_one_score_per_result_and_grader():
+    """A chunk is graded in one batch per grader; failed agent calls are skipped"""
+    storage = InMemoryStorage()
+    service = GradingService(storage, executor=ThreadGraderExecutor())
+    metrics = service.new_grading_metrics()
+
+    await service.grade_results(
+        [
+            (_result("r1", "Paris"), "paris"),
+            (_result("r2", "x", "error"), "y"),
+            (_result("r3", "Rome"), "Madrid"),
+        ],
+        ["string-match"],
+        metrics,
+    )
+
+    assert metrics["successful_scores"] == 2
+    assert storage.list_scores("r1")[0]["passed"] is True
+    assert storage.list_scores("r2") == []
+    assert storage.list_scores("r3")[0]["passed"] is False
+
+
+def failing_batch(grader_id, agent_responses, expected_outputs):
+    """Batch worker for tests that always fails"""
+    raise RuntimeError("batch unavailable")
+
+
+@pytest.mark.asyncio
+async def test_grade_results_falls_back_to_single_grading():
+    """When a batch call fails, results are graded one at a time"""
+    storage = InMemoryStorage()
+    executor = ThreadGraderExecutor(run_grader, failing_batch)
+    service = GradingService(storage, executor=executor)
+    metrics = service.new_grading_metrics()
+
+    await service.grade_results(
+        [(_result("r1", "Paris"), "paris"), (_result("r2", "Rome"), "rome")],
+        ["string-match", "missing-grader"],
+        metrics,
+    )
+
+    assert metrics["successful_scores"] == 2
+    assert metrics["failed_scores"] == 2
+    assert [s["grader_id"] for s in storage.list_scores("r1")] == ["string-match"]
+
+
+def test_grader_registry_builds_each_config_once():
+    """Instances are shared per (id, config) and honour the declared config"""
+    registry = get_grader_registry()
+    registry.clear()
+
+    first = registry.get("string-match")
+    assert registry.get("string-match") is first
+    assert first.case_sensitive is False
+    strict = registry.get("string-match", {"case_sensitive": True})
+    assert strict is not first and strict.case_sensitive is True
+    assert registry.get("missing-grader") is None
+
+    snapshot = registry.snapshot()
+    assert [i["uses"] for i in snapshot["instances"]] == [2, 1]
+    assert all(i["build_ms"] >= 0 for i in snapshot["instances"])
+
+
+def test_grader_registry_counts_uses_across_threads_but_not_warmups():
+    """Concurrent gets are all counted; warm() builds without counting a use"""
+    registry = get_grader_registry()
+    registry.clear()
+    registry.warm(["string-match"])
+    assert registry.snapshot()["instances"][0]["uses"] == 0
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: registry.get("string-match"), range(2000)))
+    assert registry.snapshot()["instances"][0]["uses"] == 2000
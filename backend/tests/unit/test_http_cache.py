@@ -0,0 +1,36 @@
+"""
+Unit tests for the encoded response cache and ETag matching
+"""
+from starlette.requests import Request
+from src.api.http_cache import EncodedResponseCache, etag_matches, run_etag
+
+
+def request_with(if_none_match):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_etag_matching():
+    etag = run_etag({"id": "run-a", "version": 3})
+    assert etag == '"run-a.3"'
+    assert etag_matches(request_with('"run-a.3"'), etag)
+    assert etag_matches(request_with('"other", W/"run-a.3"'), etag)
+    assert etag_matches(request_with("*"), etag)
+    assert not etag_matches(request_with('"run-a.2"'), etag)
+    assert not etag_matches(request_with(None), etag)
+
+
+def test_cache_is_keyed_by_etag_and_bounded_by_size():
+    cache = EncodedResponseCache(max_bytes=10)
+    cache.put(("run", "a"), '"a.1"', b"aaaa")
+    assert cache.get(("run", "a"), '"a.1"') == b"aaaa"
+    # A newer version misses and replaces the older body
+    assert cache.get(("run", "a"), '"a.2"') is None
+    cache.put(("run", "a"), '"a.2"', b"AAAA")
+    cache.put(("run", "b"), '"b.1"', b"bbbb")
+    cache.put(("run", "c"), '"c.1"', b"cccc")
+
+    assert cache.get(("run", "a"), '"a.2"') is None  # least recently used, evicted
+    assert cache.get(("run", "c"), '"c.1"') == b"cccc"
+    cache.put(("run", "big"), '"big.1"', b"x" * 11)
+    assert cache.get(("run", "big"), '"big.1"') is None
@@ -0,0 +1,146 @@
+"""
+Unit tests for AgentResponseCache
+"""
+import asyncio
+import pytest
+from src.services.response_cache import AgentResponseCache
+
+
+def make_call(calls, status="success", delay=0.0):
+    """Build an agent call that records how often it runs"""
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return {"status": status, "response": "answer", "latency_ms": 7}
+
+    return call
+
+
+@pytest.mark.asyncio
+async def test_second_call_is_served_from_memory():
+    """Repeated keys hit the memory tier and are marked cached"""
+    cache = AgentResponseCache()
+    key = cache.make_key("http://agent.test", "v1", "question")
+    calls = []
+
+    first = await cache.get_or_call(key, make_call(calls))
+    second = await cache.get_or_call(key, make_call(calls))
+
+    assert len(calls) == 1
+    assert "cached" not in first
+    assert second["cached"] is True
+    assert second["response"] == "answer"
+
+
+@pytest.mark.asyncio
+async def test_hits_report_their_own_latency():
+    """A hit carries the lookup's latency and no attempts, not the original call's"""
+    cache = AgentResponseCache()
+    key = cache.make_key("http://agent.test", "v1", "question")
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        return {
+            "status": "success",
+            "response": "answer",
+            "latency_ms": 800,
+            "attempts": 2,
+            "attempt_latencies_ms": [500, 300],
+        }
+
+    await cache.get_or_call(key, slow_call)
+    hit = await cache.get_or_call(key, slow_call)
+
+    assert hit["cached"] is True
+    assert hit["latency_ms"] < 800
+    assert hit["attempts"] == 0
+    assert hit["attempt_latencies_ms"] == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_are_merged():
+    """Identical in-flight requests share one agent call"""
+    cache = AgentResponseCache()
+    key = cache.make_key("http://agent.test", "v1", "question")
+    calls = []
+
+    results = await asyncio.gather(
+        *(cache.get_or_call(key, make_call(calls, delay=0.01)) for _ in range(5))
+    )
+
+    assert len(calls) == 1
+    assert sum(1 for r in results if r.get("cached")) == 4
+    assert cache.stats["merged"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    """Only successful outcomes are cached"""
+    cache = AgentResponseCache()
+    key = cache.make_key("http://agent.test", "v1", "question")
+    calls = []
+
+    await cache.get_or_call(key, make_call(calls, status="error"))
+    await cache.get_or_call(key, make_call(calls, status="error"))
+
+    assert len(calls) == 2
+
+
+def test_key_depends_on_endpoint_version_and_input():
+    """Different endpoints, versions or inputs never share entries"""
+    base = AgentResponseCache.make_key("http://a", "v1", "q")
+    assert base == AgentResponseCache.make_key("http://a", "v1", "q")
+    assert base != AgentResponseCache.make_key("http://b", "v1", "q")
+    assert base != AgentResponseCache.make_key("http://a", "v2", "q")
+    assert base != AgentResponseCache.make_key("http://a", "v1", "q2")
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    """Entries written to disk are found by a new cache instance"""
+    key = AgentResponseCache.make_key("http://agent.test", "v1", "question")
+    calls = []
+
+    await AgentResponseCache(disk_dir=str(tmp_path)).get_or_call(key, make_call(calls))
+    restarted = AgentResponseCache(disk_dir=str(tmp_path))
+    result = await restarted.get_or_call(key, make_call(calls))
+
+    assert len(calls) == 1
+    assert result["cached"] is True
+    assert restarted.stats["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_and_evicted_entries_are_dropped(tmp_path):
+    """TTL expiry and the memory/disk size limits evict entries"""
+    calls = []
+    expired = AgentResponseCache(ttl_seconds=-1)
+    key = expired.make_key("http://agent.test", "v1", "q")
+    await expired.get_or_call(key, make_call(calls))
+    await expired.get_or_call(key, make_call(calls))
+    assert len(calls) == 2
+
+    small = AgentResponseCache(max_entries=2, disk_dir=str(tmp_path), disk_max_bytes=250)
+    for i in range(4):
+        await small.get_or_call(small.make_key("http://agent.test", "v1", f"q{i}"), make_call([]))
+    assert len(small._memory) == 2
+    assert small._disk_bytes <= 250
+    assert len(list(tmp_path.glob("*/*.json"))) == len(small._disk_index)
+
+
+@pytest.mark.asyncio
+async def test_merged_failures_are_not_marked_cached():
+    """Callers sharing a failed in-flight call get the error back unmarked"""
+    cache = AgentResponseCache()
+    key = cache.make_key("http://agent.test", "v1", "question")
+    calls = []
+
+    results = await asyncio.gather(
+        *(cache.get_or_call(key, make_call(calls, delay=0.01, status="error")) for _ in range(3))
+    )
+
+    assert len(calls) == 1
+    assert all(r["status"] == "error" for r in results)
+    assert not any(r.get("cached") for r in results)
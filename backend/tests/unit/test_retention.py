@@ -0,0 +1,172 @@
+"""
+Unit tests for run retention and the run archive
+"""
+from datetime import datetime, timedelta
+import time
+import pytest
+from src.services.storage import InMemoryStorage
+from src.services.durable_storage import DurableInMemoryStorage
+from src.services.run_archive import RunArchive
+from src.services.retention import RetentionPolicy, RetentionWorker
+from src.services.grading_service import GradingService
+
+
+def add_run(storage, run_id, created_at, status="completed", results=2, **fields):
+    storage.create_evaluation_run(
+        {
+            "id": run_id,
+            "status": status,
+            "created_at": created_at,
+            "test_case_ids": ["tc-1", "tc-2"],
+            **fields,
+        }
+    )
+    for i in range(results):
+        result_id = f"{run_id}-r{i}"
+        storage.create_evaluation_result(
+            {
+                "id": result_id,
+                "run_id": run_id,
+                "test_case_id": f"tc-{i + 1}",
+                "agent_response": f"answer {i}",
+                "response_status": "success",
+            }
+        )
+        storage.create_score(
+            {
+                "id": f"{result_id}-s",
+                "result_id": result_id,
+                "grader_id": "string-match",
+                "passed": i % 2 == 0,
+                "score": 1.0,
+                "details": {"actual": f"answer {i}"},
+            }
+        )
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return RunArchive(str(tmp_path / "archive"), cache_runs=2)
+
+
+def test_archived_run_reads_back_from_archive(archive):
+    """Archiving drops a run's records from memory but not from reads"""
+    storage = InMemoryStorage(archive=archive)
+    add_run(storage, "old", "2026-01-01T00:00:00")
+    add_run(storage, "new", "2026-01-02T00:00:00")
+    results = storage.list_evaluation_results("old")
+    scores = storage.list_all_scores("old")
+    history = storage.list_test_case_results("tc-1")
+
+    assert storage.archive_run("old") == 2
+    assert storage.archive_run("old") == 0
+
+    assert storage.get_evaluation_run("old")["archived_at"] is not None
+    assert "old" not in storage.results_by_run
+    assert "old-r0" not in storage.evaluation_results
+    assert archive.path("old").exists()
+    assert storage.list_evaluation_results("old") == results
+    assert storage.list_all_scores("old") == scores
+    assert storage.list_test_case_results("tc-1") == history
+    assert storage.list_evaluation_results_slice("old", 1, 5) == results[1:]
+    assert storage.list_scores_many("old", ["old-r1"])["old-r1"] == scores[1:]
+    # Other runs are untouched
+    assert len(storage.list_evaluation_results("new")) == 2
+
+
+def test_archive_survives_durable_restart(tmp_path):
+    """The archived flag is logged, so a reopened store still reads the archive"""
+    log_dir = str(tmp_path / "wal")
+    storage = DurableInMemoryStorage(
+        log_dir, fsync=False, archive=RunArchive(str(tmp_path / "archive"))
+    )
+    add_run(storage, "old", "2026-01-01T00:00:00")
+    results = storage.list_evaluation_results("old")
+    storage.archive_run("old")
+    storage.close()
+
+    reopened = DurableInMemoryStorage(
+        log_dir, fsync=False, archive=RunArchive(str(tmp_path / "archive"))
+    )
+    assert reopened.evaluation_results == {}
+    assert reopened.list_evaluation_results("old") == results
+    assert len(reopened.list_all_scores("old")) == 2
+    reopened.close()
+
+
+def test_policy_keeps_newest_runs_and_recent_runs():
+    now = datetime(2026, 3, 1)
+    runs = [  # newest first
+        {"id": "running", "status": "running", "created_at": "2026-02-28T00:00:00"},
+        {"id": "recent", "status": "completed", "completed_at": now - timedelta(days=1)},
+        {"id": "failed", "status": "failed", "created_at": "2026-02-27T00:00:00Z"},
+        {"id": "stale", "status": "completed", "completed_at": "2026-01-01T00:00:00"},
+        {
+            "id": "done",
+            "status": "completed",
+            "created_at": "2026-01-01",
+            "archived_at": "2026-01-02",
+        },
+    ]
+
+    assert RetentionPolicy(max_runs=2).select(runs, now) == ["failed", "stale"]
+    assert RetentionPolicy(max_age_days=7).select(runs, now) == ["stale"]
+    assert RetentionPolicy(max_runs=10, max_age_days=1.5).select(runs, now) == ["failed", "stale"]
+    assert not RetentionPolicy().enabled
+    assert RetentionPolicy().select(runs, now) == []
+
+
+def test_worker_archives_in_background(archive):
+    storage = InMemoryStorage(archive=archive)
+    for day in range(1, 5):
+        add_run(storage, f"run-{day}", f"2026-01-0{day}T00:00:00")
+    add_run(storage, "live", "2026-01-01T12:00:00", status="running")
+
+    worker = RetentionWorker(storage, RetentionPolicy(max_runs=2), interval=0.01).start()
+    try:
+        deadline = time.monotonic() + 5
+        while worker.archived_runs < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+
+    archived = {r["id"] for r in storage.list_evaluation_runs(0, 10) if r.get("archived_at")}
+    assert archived == {"run-1", "run-2"}
+    assert worker.run_once() == 0
+    assert len(storage.list_evaluation_results("run-1")) == 2
+
+
+def test_archive_cache_is_bounded(archive):
+    for run_id in ("a", "b", "c"):
+        archive.write(run_id, [{"id": run_id}], [])
+    for run_id in ("a", "b", "c"):
+        assert archive.load(run_id).results == [{"id": run_id}]
+    assert list(archive._loaded) == ["b", "c"]
+    assert archive.load("missing").results == []
+    with pytest.raises(ValueError):
+        archive.path("../escape")
+
+
+def test_test_case_history_does_not_evict_cached_runs(archive):
+    """Scanning archived runs for a test case reads past the archive's cache"""
+    storage = InMemoryStorage(archive=archive)
+    for run_id in ("a", "b", "c", "d"):
+        add_run(storage, run_id, "2026-01-01T00:00:00")
+        storage.archive_run(run_id)
+    storage.list_evaluation_results("a")
+    cached = list(archive._loaded)
+
+    assert len(storage.list_test_case_results("tc-1")) == 4
+    assert list(archive._loaded) == cached
+
+
+@pytest.mark.asyncio
+async def test_archived_runs_are_not_regraded(archive):
+    """Re-grading an archived run is refused instead of writing orphan scores"""
+    storage = InMemoryStorage(archive=archive)
+    add_run(storage, "old", "2026-01-01T00:00:00")
+    storage.archive_run("old")
+
+    with pytest.raises(ValueError, match="archived"):
+        await GradingService(storage).grade_evaluation_run("old")
+    assert storage.scores == {}
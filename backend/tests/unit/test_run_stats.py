@@ -0,0 +1,58 @@
+"""
+Unit tests for running run aggregates
+"""
+from src.services.run_stats import RunStats
+
+
+RESULTS = [
+    {"id": "r1", "response_status": "success", "response_latency_ms": 120},
+    {"id": "r2", "response_status": "success", "response_latency_ms": 80},
+    {"id": "r3", "response_status": "timeout", "response_latency_ms": None},
+    {"id": "r4", "response_status": "error", "response_latency_ms": 300},
+]
+SCORES = [
+    {"result_id": "r1", "grader_id": "string-match", "passed": True, "score": 1.0},
+    {"result_id": "r1", "grader_id": "length", "passed": False, "score": 0.25},
+    {"result_id": "r2", "grader_id": "string-match", "passed": False, "score": 0.0},
+    {"result_id": "r2", "grader_id": "length", "passed": True, "score": None},
+]
+
+
+def test_aggregates():
+    stats = RunStats.compute(RESULTS, SCORES).to_dict()
+
+    assert stats["results"] == 4
+    assert stats["by_status"] == {"success": 2, "timeout": 1, "error": 1}
+    assert (stats["latency_sum_ms"], stats["latency_count"]) == (500, 3)
+    assert (stats["latency_min_ms"], stats["latency_max_ms"]) == (80, 300)
+    assert stats["avg_latency_ms"] == 166.67
+    assert (stats["scores"], stats["passed"], stats["failed"]) == (4, 2, 2)
+    assert stats["by_grader"]["string-match"] == {
+        "total": 2,
+        "passed": 1,
+        "failed": 1,
+        "score_sum": 1.0,
+        "score_count": 2,
+        "mean_score": 0.5,
+    }
+    assert stats["by_grader"]["length"]["mean_score"] == 0.25
+
+
+def test_incremental_updates_match_full_recompute():
+    """Batches added one at a time, across a save and restore, equal one recompute"""
+    stats = RunStats()
+    stats.add_results(RESULTS[:1])
+    stats.add_scores(SCORES[:2])
+    stats = RunStats.from_dict(stats.to_dict())
+    stats.add_results(RESULTS[1:])
+    stats.add_scores(SCORES[2:])
+
+    assert stats.to_dict() == RunStats.compute(RESULTS, SCORES).to_dict()
+
+
+def test_empty_run():
+    stats = RunStats().to_dict()
+    assert stats["results"] == 0
+    assert stats["avg_latency_ms"] is None
+    assert stats["latency_min_ms"] is None
+    assert stats["by_grader"] == {}
@@ -0,0 +1,148 @@
+"""
+Unit tests for the storage daemon and RemoteStorage
+"""
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+import pytest
+from src.services.storage import InMemoryStorage
+from src.services.remote_storage import RemoteStorage
+from src.services.storage_daemon import (
+    StorageDaemon,
+    _StorageServer,
+    daemon_alive,
+    ensure_daemon,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Run by each worker process: writes its own test cases, then reads the parent's
+WORKER_SCRIPT = """
+import sys
+from src.services.remote_storage import RemoteStorage
+
+socket_path, worker, count = sys.argv[1], sys.argv[2], int(sys.argv[3])
+storage = RemoteStorage(socket_path)
+for i in range(count):
+    storage.create_test_case({"id": f"tc-{worker}-{i}", "input": "q", "expected_output": "a"})
+    storage.update_evaluation_run("run-shared", {f"worker-{worker}": i})
+assert storage.get_test_case("tc-parent")["input"] == "from parent"
+storage.close()
+"""
+
+
+@pytest.fixture
+def socket_path():
+    """A short socket path (Unix socket paths are limited to ~100 bytes)"""
+    socket_dir = tempfile.mkdtemp(prefix="eg-")
+    yield f"{socket_dir}/storage.sock"
+    shutil.rmtree(socket_dir)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    daemon = StorageDaemon(socket_path, InMemoryStorage()).start()
+    yield daemon
+    daemon.shutdown()
+
+
+def test_worker_processes_share_one_store(daemon):
+    """Writes from every worker process are visible to all of them"""
+    workers, per_worker = 4, 50
+    storage = RemoteStorage(daemon.socket_path)
+    storage.create_test_case({"id": "tc-parent", "input": "from parent", "expected_output": "a"})
+    storage.create_evaluation_run({"id": "run-shared", "created_at": "2026-01-01"})
+
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, daemon.socket_path, str(w), str(per_worker)],
+            cwd=BACKEND_DIR,
+        )
+        for w in range(workers)
+    ]
+    assert [p.wait(timeout=30) for p in processes] == [0] * workers
+
+    assert len(storage.list_test_cases(0, 1000)) == workers * per_worker + 1
+    run = storage.get_evaluation_run("run-shared")
+    assert all(run[f"worker-{w}"] == per_worker - 1 for w in range(workers))
+    storage.close()
+
+
+def test_remote_errors_are_raised_in_the_client(daemon):
+    """Exceptions in the daemon reach the caller; only storage methods are served"""
+    storage = RemoteStorage(daemon.socket_path)
+    with pytest.raises(AttributeError):
+        storage._call("close")
+    with pytest.raises(TypeError):
+        storage._call("get_test_case")
+    # The connection is still usable afterwards
+    assert storage.get_test_case("missing") is None
+    storage.close()
+
+
+def test_client_reports_missing_daemon(socket_path):
+    with pytest.raises(ConnectionError):
+        RemoteStorage(socket_path)
+
+
+def test_stale_socket_is_replaced(socket_path):
+    """A socket file left by a crashed daemon doesn't block a new one"""
+    Path(socket_path).touch()
+    daemon = StorageDaemon(socket_path, InMemoryStorage()).start()
+    try:
+        assert daemon_alive(socket_path)
+        with pytest.raises(RuntimeError):
+            StorageDaemon(socket_path, InMemoryStorage())
+    finally:
+        daemon.shutdown()
+    assert not os.path.exists(socket_path)
+
+
+def test_socket_is_owner_only_from_the_moment_it_is_bound(socket_path, monkeypatch):
+    """No other user can connect between binding the socket and serving it"""
+    modes = []
+    bind = _StorageServer.server_bind
+
+    def server_bind(self):
+        bind(self)
+        modes.append(stat.S_IMODE(os.stat(socket_path).st_mode))
+
+    monkeypatch.setattr(_StorageServer, "server_bind", server_bind)
+    previous = os.umask(0o002)
+    try:
+        daemon = StorageDaemon(socket_path, InMemoryStorage()).start()
+    finally:
+        os.umask(previous)
+    daemon.shutdown()
+
+    assert modes and modes[0] & 0o077 == 0
+
+
+def test_ensure_daemon_starts_exactly_one(socket_path):
+    """Workers starting together start a single daemon between them"""
+    started = []
+    callers = [
+        threading.Thread(target=lambda: started.append(ensure_daemon(socket_path, "memory")))
+        for _ in range(3)
+    ]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+
+    processes = [p for p in started if p is not None]
+    assert len(processes) == 1
+    try:
+        storage = RemoteStorage(socket_path)
+        storage.create_test_case({"id": "tc-1", "input": "q", "expected_output": "a"})
+        assert storage.get_test_case("tc-1")["input"] == "q"
+        storage.close()
+    finally:
+        processes[0].terminate()
+        assert processes[0].wait(timeout=10) == 0
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,88 @@
+"""
+Unit tests for bulk test case import
+"""
+import json
+import pytest
+from src.services.storage import InMemoryStorage
+from src.services.test_case_import import TestCaseImport
+
+
+def feed_in_pieces(importer, body: bytes, size: int):
+    """Feed an upload the way it arrives: in arbitrary pieces"""
+    for start in range(0, len(body), size):
+        importer.feed(body[start : start + size])
+    return importer.finish()
+
+
+@pytest.mark.parametrize("piece", [1, 7, 4096])
+def test_jsonl_import_across_chunk_boundaries(piece):
+    storage = InMemoryStorage()
+    lines = [
+        json.dumps({"input": f"q{i}", "expected_output": f"a{i}", "tags": ["bulk"]})
+        for i in range(25)
+    ]
+    body = ("\n".join(lines) + "\n\n").encode()
+
+    report = feed_in_pieces(TestCaseImport(storage, "jsonl", chunk_size=10), body, piece)
+
+    assert report == {"imported": 25, "failed": 0, "errors": [], "errors_truncated": False}
+    test_cases = storage.list_test_cases(0, 100)
+    assert sorted(tc["input"] for tc in test_cases) == sorted(f"q{i}" for i in range(25))
+    assert all(tc["tags"] == ["bulk"] and tc["id"] for tc in test_cases)
+
+
+def test_jsonl_rows_failing_to_parse_or_validate_are_reported():
+    storage = InMemoryStorage()
+    body = "\n".join(
+        [
+            '{"input": "q1", "expected_output": "a1"}',
+            '{"input": "q2"',
+            '["not", "an", "object"]',
+            '{"input": "", "expected_output": "a4"}',
+            '{"input": "q5", "expected_output": "a5", "id": "ignored"}',
+        ]
+    ).encode()
+
+    report = feed_in_pieces(TestCaseImport(storage, "jsonl"), body, 16)
+
+    assert (report["imported"], report["failed"]) == (2, 3)
+    assert [error["line"] for error in report["errors"]] == [2, 3, 4]
+    assert report["errors"][0]["error"].startswith("Invalid JSON")
+    assert report["errors"][2]["error"].startswith("input:")
+    assert "ignored" not in {tc["id"] for tc in storage.list_test_cases(0, 10)}
+
+
+def test_csv_import_with_quoted_newlines_and_tags():
+    storage = InMemoryStorage()
+    body = (
+        "\ufeffinput,expected_output,description,tags\r\n"
+        "What is 2+2?,4,,math; basic\r\n"
+        '"Say ""hi""\non two lines",hi,greeting,\r\n'
+        "only one field\r\n"
+        "Capital of France?,Paris,geo,geography"
+    ).encode()
+
+    report = feed_in_pieces(TestCaseImport(storage, "csv"), body, 5)
+
+    assert (report["imported"], report["failed"]) == (3, 1)
+    assert report["errors"] == [{"line": 5, "error": "Expected 4 fields, got 1"}]
+    by_input = {tc["input"]: tc for tc in storage.list_test_cases(0, 10)}
+    assert by_input["What is 2+2?"]["tags"] == ["math", "basic"]
+    assert by_input["What is 2+2?"]["description"] is None
+    assert by_input['Say "hi"\non two lines']["description"] == "greeting"
+
+
+def test_csv_header_must_name_required_columns():
+    importer = TestCaseImport(InMemoryStorage(), "csv")
+    with pytest.raises(ValueError, match="expected_output"):
+        importer.feed(b"input,answer\nq,a\n")
+
+
+def test_errors_reported_are_capped():
+    body = b"\n".join(b"not json" for _ in range(5))
+
+    importer = TestCaseImport(InMemoryStorage(), "jsonl", max_errors=2)
+    importer.feed(body)
+    report = importer.finish()
+
+    assert (report["failed"], len(report["errors"]), report["errors_truncated"]) == (5, 2, True)
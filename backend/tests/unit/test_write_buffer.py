@@ -0,0 +1,152 @@
+"""
+Unit tests for WriteBuffer
+"""
+import asyncio
+import pytest
+from src.services.storage import InMemoryStorage
+from src.services.write_buffer import InOrderResults, WriteBuffer
+
+
+def make_result(result_id):
+    return {"id": result_id, "run_id": "run-a", "test_case_id": "tc-1"}
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_full():
+    """Buffered records are written in one bulk call once max_items is reached"""
+    storage = InMemoryStorage()
+    buffer = WriteBuffer(storage, max_items=3, max_wait=60)
+
+    buffer.add_result(make_result("r1"))
+    buffer.add_scores([{"id": "s1", "result_id": "r1"}])
+    assert storage.list_evaluation_results("run-a") == []
+
+    buffer.add_result(make_result("r2"))
+    await buffer.drain()
+
+    assert buffer.pending == 0
+    assert buffer.flushes == 1
+    assert [r["id"] for r in storage.list_evaluation_results("run-a")] == ["r1", "r2"]
+    assert [s["id"] for s in storage.list_all_scores("run-a")] == ["s1"]
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_max_wait():
+    """A partly filled buffer is written once its oldest record has waited max_wait"""
+    storage = InMemoryStorage()
+    buffer = WriteBuffer(storage, max_items=100, max_wait=0.01)
+
+    buffer.add_result(make_result("r1"))
+    await asyncio.sleep(0.05)
+
+    assert buffer.pending == 0
+    assert storage.get_evaluation_result("r1") is not None
+
+
+def test_writes_immediately_without_event_loop():
+    """Outside an event loop there is no timer, so records are written at once"""
+    storage = InMemoryStorage()
+    buffer = WriteBuffer(storage, max_items=100, max_wait=60)
+
+    buffer.add_result(make_result("r1"))
+
+    assert buffer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_records():
+    """Records that couldn't be written stay buffered for the next flush"""
+
+    class FlakyStorage(InMemoryStorage):
+        fail = True
+
+        def create_evaluation_results_many(self, results):
+            if self.fail:
+                raise RuntimeError("disk full")
+            return super().create_evaluation_results_many(results)
+
+    storage = FlakyStorage()
+    buffer = WriteBuffer(storage, max_items=100, max_wait=60)
+    buffer.add_result(make_result("r1"))
+
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert buffer.pending == 1
+
+    storage.fail = False
+    buffer.flush()
+    assert storage.get_evaluation_result("r1") is not None
+
+
+def test_in_order_results_hold_later_results_and_their_scores():
+    """Results are handed on in position order, each ahead of its scores"""
+    storage = InMemoryStorage()
+    in_order = InOrderResults(WriteBuffer(storage, max_wait=0))
+
+    in_order.add_result(2, make_result("r2"))
+    in_order.add_scores([{"id": "s2", "result_id": "r2"}])
+    in_order.skip(1)
+    assert storage.list_evaluation_results("run-a") == []
+    assert in_order.held == 1
+
+    in_order.add_result(0, make_result("r0"))
+    in_order.add_scores([{"id": "s0", "result_id": "r0"}])
+
+    assert [r["id"] for r in storage.list_evaluation_results("run-a")] == ["r0", "r2"]
+    assert sorted(s["id"] for s in storage.list_all_scores("run-a")) == ["s0", "s2"]
+    assert in_order.held == 0
+
+
+@pytest.mark.asyncio
+async def test_writes_happen_off_the_event_loop_in_order():
+    """On a loop, batches and queued calls are written in a worker thread, in order"""
+    import threading
+
+    class RecordingStorage(InMemoryStorage):
+        threads = set()
+
+        def create_evaluation_results_many(self, results):
+            self.threads.add(threading.get_ident())
+            return super().create_evaluation_results_many(results)
+
+    storage = RecordingStorage()
+    calls = []
+    buffer = WriteBuffer(storage, max_items=1, max_wait=60)
+    buffer.add_result(make_result("r1"))
+    buffer.write_later(lambda: calls.append(len(storage.list_evaluation_results("run-a"))))
+    buffer.add_result(make_result("r2"))
+    await buffer.drain()
+
+    assert threading.get_ident() not in storage.threads
+    assert calls == [1]
+    assert [r["id"] for r in storage.list_evaluation_results("run-a")] == ["r1", "r2"]
+
+
+@pytest.mark.asyncio
+async def test_in_order_results_bound_the_hold_behind_a_slow_result():
+    """Work past the window waits for the oldest position instead of piling up"""
+    storage = InMemoryStorage()
+    in_order = InOrderResults(WriteBuffer(storage, max_wait=60), window=3)
+    head = asyncio.Event()
+    most_held = 0
+
+    async def produce(position):
+        nonlocal most_held
+        await in_order.admit(position)
+        if position == 0:
+            await head.wait()
+        in_order.add_result(position, make_result(f"r{position}"))
+        most_held = max(most_held, in_order.held)
+
+    producers = [asyncio.create_task(produce(position)) for position in range(10)]
+    await asyncio.sleep(0.01)
+    assert in_order.held == 2  # positions 1 and 2; 3 and later wait for admission
+
+    head.set()
+    await asyncio.gather(*producers)
+    await in_order.buffer.drain()
+
+    assert most_held <= 3
+    assert [r["id"] for r in storage.list_evaluation_results("run-a")] == [
+        f"r{position}" for position in range(10)
+    ]
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { apiClient } from '../services/api';
+import { applyRunEvent, followRunDetails } from '../services/runEvents';
 
 export default function EvaluationProgress() {
   const [evaluations, setEvaluations] = useState([]);
@@ -10,10 +11,24 @@ export default function EvaluationProgress() {
 
   useEffect(() => {
     fetchEvaluations();
-    const interval = setInterval(fetchEvaluations, 2000); // Poll every 2 seconds
-    return () => clearInterval(interval);
+    // Runs are updated from pushed events rather than polled
+    return apiClient.subscribeEvaluations(handleRunEvent);
   }, []);
 
+  // Results and scores of the selected run arrive as they are stored
+  useEffect(() => {
+    if (!selectedRunId) return undefined;
+    return followRunDetails(selectedRunId, setRunDetails, () => fetchRunDetails(selectedRunId));
+  }, [selectedRunId]);
+
+  const handleRunEvent = (event) => {
+    if (event.type === 'resync') {
+      fetchEvaluations();
+    } else {
+      setEvaluations((runs) => applyRunEvent(runs, event));
+    }
+  };
+
   const fetchEvaluations = async () => {
     try {
       const response = await apiClient.listEvaluations(0, 50);
@@ -26,8 +41,12 @@ export default function EvaluationProgress() {
     }
   };
 
-  const handleSelectRun = async (runId) => {
+  const handleSelectRun = (runId) => {
     setSelectedRunId(runId);
+    fetchRunDetails(runId);
+  };
+
+  const fetchRunDetails = async (runId) => {
     try {
       const response = await apiClient.getEvaluationResults(runId);
       setRunDetails(response.data);
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { apiClient } from '../services/api';
+import { applyRunEvent, followRunDetails } from '../services/runEvents';
 
 export default function ResultsViewer() {
   const [evaluations, setEvaluations] = useState([]);
@@ -11,10 +12,24 @@ export default function ResultsViewer() {
 
   useEffect(() => {
     fetchEvaluations();
-    const interval = setInterval(fetchEvaluations, 3000);
-    return () => clearInterval(interval);
+    // Runs are updated from pushed events rather than polled
+    return apiClient.subscribeEvaluations(handleRunEvent);
   }, []);
 
+  // Results and scores of the selected run arrive as they are stored
+  useEffect(() => {
+    if (!selectedRun) return undefined;
+    return followRunDetails(selectedRun.id, setRunDetails, () => fetchRunDetails(selectedRun.id));
+  }, [selectedRun?.id]);
+
+  const handleRunEvent = (event) => {
+    if (event.type === 'resync') {
+      fetchEvaluations();
+    } else {
+      setEvaluations((runs) => applyRunEvent(runs, event));
+    }
+  };
+
   const fetchEvaluations = async () => {
     try {
       const response = await apiClient.listEvaluations(0, 50);
@@ -27,10 +42,14 @@ export default function ResultsViewer() {
     }
   };
 
-  const handleSelectRun = async (run) => {
+  const handleSelectRun = (run) => {
     setSelectedRun(run);
+    fetchRunDetails(run.id);
+  };
+
+  const fetchRunDetails = async (runId) => {
     try {
-      const response = await apiClient.getEvaluationResults(run.id);
+      const response = await apiClient.getEvaluationResults(runId);
       setRunDetails(response.data);
     } catch (err) {
       setError(err.message);
@@ -4,6 +4,8 @@
 
 const API_BASE_URL = '/api';
 
+export const FINISHED_STATUSES = ['completed', 'failed'];
+
 class APIClient {
   async request(method, endpoint, data = null) {
     const url = `${API_BASE_URL}${endpoint}`;
@@ -66,6 +68,28 @@ class APIClient {
     return this.request('GET', `/evaluations/${id}/results`);
   }
 
+  // Evaluation events (Server-Sent Events), returning a function that unsubscribes
+  subscribeEvaluations(onEvent) {
+    return this.subscribe('/evaluations/events', onEvent);
+  }
+
+  subscribeEvaluationEvents(id, onEvent) {
+    const unsubscribe = this.subscribe(`/evaluations/${id}/events`, (event) => {
+      onEvent(event);
+      // The server ends the stream once the run is finished; don't reconnect
+      if (event.type === 'run' && FINISHED_STATUSES.includes(event.data.status)) {
+        unsubscribe();
+      }
+    });
+    return unsubscribe;
+  }
+
+  subscribe(endpoint, onEvent) {
+    const source = new EventSource(`${API_BASE_URL}${endpoint}`);
+    source.onmessage = (message) => onEvent(JSON.parse(message.data));
+    return () => source.close();
+  }
+
   // Graders API
   async listGraders() {
     return this.request('GET', '/graders');
@@ -0,0 +1,77 @@
+/**
+ * Apply pushed evaluation events to component state
+ */
+
+import { apiClient, FINISHED_STATUSES } from './api';
+
+const SUMMARY_COUNTERS = {
+  success: 'successful',
+  error: 'failed',
+  timeout: 'timeout',
+};
+
+// Add or update a run from a 'run' event, and follow its result count from 'progress' events
+export function applyRunEvent(runs, event) {
+  if (event.type === 'run') {
+    if (!runs.some((run) => run.id === event.run_id)) {
+      return [event.data, ...runs];
+    }
+    return runs.map((run) => (run.id === event.run_id ? { ...run, ...event.data } : run));
+  }
+  if (event.type === 'progress') {
+    return runs.map((run) =>
+      run.id === event.run_id ? { ...run, result_count: event.data.results } : run
+    );
+  }
+  return runs;
+}
+
+// Append results and their scores from 'result' and 'score' events to a run's details
+// (latency averages are left to the full results fetched once the run finishes)
+export function applyResultEvent(details, event) {
+  if (!details) return details;
+
+  if (event.type === 'result') {
+    const result = event.data;
+    if (details.results.some((r) => r.id === result.id)) return details;
+    const summary = details.summary && { ...details.summary, total: details.summary.total + 1 };
+    const counter = SUMMARY_COUNTERS[result.response_status];
+    if (summary && counter) summary[counter] += 1;
+    return { ...details, results: [...details.results, { ...result, scores: [] }], summary };
+  }
+
+  if (event.type === 'score') {
+    const score = event.data;
+    return {
+      ...details,
+      results: details.results.map((r) =>
+        r.id === score.result_id && !(r.scores || []).some((s) => s.id === score.id)
+          ? { ...r, scores: [...(r.scores || []), score] }
+          : r
+      ),
+    };
+  }
+
+  return details;
+}
+
+// Keep a run's details current from its event stream, calling refetch when they
+// must be re-read: the run finished (for the final summary) or events were missed
+export function followRunDetails(runId, setRunDetails, refetch) {
+  let lastStatus = null;
+  return apiClient.subscribeEvaluationEvents(runId, (event) => {
+    if (event.type === 'run') {
+      // The first event is the run as it is now, already covered by the caller's fetch
+      const finished =
+        lastStatus !== null &&
+        lastStatus !== event.data.status &&
+        FINISHED_STATUSES.includes(event.data.status);
+      lastStatus = event.data.status;
+      if (finished) refetch();
+    } else if (event.type === 'resync') {
+      refetch();
+    } else {
+      setRunDetails((details) => applyResultEvent(details, event));
+    }
+  });
+}
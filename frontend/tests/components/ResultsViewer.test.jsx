@@ -1,5 +1,5 @@
 import { describe, it, expect, beforeEach, vi } from 'vitest';
-import { render, screen, fireEvent, waitFor } from '@testing-library/react';
+import { render, screen, fireEvent, waitFor, act } from '@testing-library/react';
 import ResultsViewer from './ResultsViewer';
 import * as apiClient from '../services/api';
 
@@ -220,4 +220,54 @@ describe('ResultsViewer', () => {
       expect(mockRevokeObjectURL).toHaveBeenCalled();
     });
   });
+
+  it('appends results pushed over the event stream', async () => {
+    let pushEvent;
+    apiClient.apiClient.listEvaluations.mockResolvedValue({
+      data: [{ id: '123abc', status: 'running', result_count: 0 }],
+    });
+    apiClient.apiClient.getEvaluationResults.mockResolvedValue({
+      data: {
+        summary: { total: 0, successful: 0, failed: 0, timeout: 0, avg_latency_ms: 0 },
+        results: [],
+      },
+    });
+    apiClient.apiClient.subscribeEvaluationEvents.mockImplementation((id, onEvent) => {
+      pushEvent = onEvent;
+      return vi.fn();
+    });
+
+    const { container } = render(<ResultsViewer />);
+
+    await waitFor(() => {
+      fireEvent.click(screen.getByText('123abc...'));
+    });
+
+    await waitFor(() => {
+      expect(apiClient.apiClient.subscribeEvaluationEvents).toHaveBeenCalledWith(
+        '123abc',
+        expect.any(Function)
+      );
+      expect(screen.getByText('Results: 123abc...')).toBeInTheDocument();
+    });
+
+    act(() => {
+      pushEvent({
+        type: 'result',
+        run_id: '123abc',
+        data: {
+          id: 'r1',
+          test_case_id: 'tc1',
+          agent_response: 'Hello',
+          response_status: 'success',
+          response_latency_ms: 120,
+        },
+      });
+      pushEvent({ type: 'score', run_id: '123abc', data: { id: 's1', result_id: 'r1', passed: true } });
+    });
+
+    const rows = container.querySelectorAll('.results-table tbody tr');
+    expect(rows.length).toBe(1);
+    expect(screen.getByText('1/1 ✓')).toBeInTheDocument();
+  });
 });